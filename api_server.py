@@ -0,0 +1,291 @@
+"""
+Headless HTTP API over ridership_tracker_api, so the dashboard and other clients can share one warm data process.
+
+    python api_server.py    # serves on CMRL_API_HOST:CMRL_API_PORT (default 127.0.0.1:8000), revalidates every CMRL_API_REFRESH_SECONDS
+
+Endpoints (all GET) :
+    /datasets                           every dataset with its row count, date range and data fingerprint
+    /datasets/<name>/dates              dates the dataset has rows for
+    /datasets/<name>/on/<YYYY-MM-DD>    rows of one date (the get_*_on_date getters)
+    /datasets/<name>/on?dates=a,b,...   rows of many dates in one response (the get_*_on_dates getters)
+    /datasets/<name>/query              range / filter query, parameters as in ridership_tracker_api.query :
+                                        start, end, stations=SCC,SAE, lines=1,2, hours=8-10, directions=UP, columns=Date,Total
+    /stations, /stations/<code>         station code -> name lookups
+    /stations/<code>/history            one station over time : dataset=ridership_station|parking_station, start, end, columns
+
+Tables are sent as compact JSON ({"columns": [...], "data": [[...], ...]}) or, with ?format=arrow or
+Accept: application/vnd.apache.arrow.stream, as an Arrow IPC stream (needs pyarrow).
+Every response carries an ETag derived from the data fingerprint, so If-None-Match revalidations get a 304
+and a CDN can cache responses until the data changes. Bodies are gzipped for clients that accept it and
+built responses are kept in an in-process LRU cache.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from ridership_tracker_api import (
+    CACHE_TTL_SECONDS,
+    DATA_SOURCE_REL_PATHS,
+    STATION_CODE_TO_NAME,
+    LRUCache,
+    get_aggregate_parking_on_date,
+    get_aggregate_parking_on_dates,
+    get_aggregate_ridership_on_date,
+    get_aggregate_ridership_on_dates,
+    get_available_dates,
+    get_data_fingerprint,
+    get_data_version,
+    get_hourly_parking_on_date,
+    get_hourly_parking_on_dates,
+    get_hourly_ridership_on_date,
+    get_hourly_ridership_on_dates,
+    get_phpdt_ridership_on_date,
+    get_phpdt_ridership_on_dates,
+    get_station_history,
+    get_station_parking_on_date,
+    get_station_parking_on_dates,
+    get_station_ridership_on_date,
+    get_station_ridership_on_dates,
+    load_data_sources,
+    query,
+    refresh_data_sources,
+)
+
+try:
+    import pyarrow as pa
+except ImportError:  # JSON only without pyarrow
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+API_HOST = os.environ.get("CMRL_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("CMRL_API_PORT", 8000))
+API_MAX_AGE_SECONDS = int(os.environ.get("CMRL_API_MAX_AGE_SECONDS", 60))  # Cache-Control max-age for clients / CDNs
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("CMRL_RESPONSE_CACHE_MB", 64)) * 1024 ** 2
+GZIP_MIN_BYTES = 1024  # smaller bodies aren't worth compressing
+# how often the data is revalidated, floored so CMRL_CACHE_TTL_SECONDS=0 ("always revalidate") doesn't spin
+API_REFRESH_SECONDS = max(int(os.environ.get("CMRL_API_REFRESH_SECONDS", CACHE_TTL_SECONDS)), 60)
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+JSON_MEDIA_TYPE = "application/json"
+
+DATE_GETTERS = {
+    "ridership_daily": get_aggregate_ridership_on_date,
+    "ridership_hourly": get_hourly_ridership_on_date,
+    "ridership_station": get_station_ridership_on_date,
+    "parking_daily": get_aggregate_parking_on_date,
+    "parking_hourly": get_hourly_parking_on_date,
+    "parking_station": get_station_parking_on_date,
+    "phpdt_daily": get_phpdt_ridership_on_date,
+}
+
+DATES_GETTERS = {
+    "ridership_daily": get_aggregate_ridership_on_dates,
+    "ridership_hourly": get_hourly_ridership_on_dates,
+    "ridership_station": get_station_ridership_on_dates,
+    "parking_daily": get_aggregate_parking_on_dates,
+    "parking_hourly": get_hourly_parking_on_dates,
+    "parking_station": get_station_parking_on_dates,
+    "phpdt_daily": get_phpdt_ridership_on_dates,
+}
+
+# (etag, gzipped) -> (content type, body, content encoding)
+_RESPONSES = LRUCache(RESPONSE_CACHE_MAX_BYTES)
+
+
+class NotFound(Exception):
+    pass
+
+
+# request parsing
+def _list_param(params, key, cast=str):
+    if key not in params:
+        return None
+    return [cast(value.strip()) for value in params[key].split(",") if value.strip()]
+
+
+def _hours_param(params):
+    if "hours" not in params:
+        return None
+    first, _, last = params["hours"].partition("-")
+    return int(first), int(last or first)
+
+
+def _date_param(date):
+    return pd.Timestamp(date).strftime("%Y-%m-%d")  # ValueError on junk -> 400
+
+
+def _dataset(name):
+    if name not in DATA_SOURCE_REL_PATHS:
+        raise NotFound(f"Unknown dataset {name!r}, expected one of {list(DATA_SOURCE_REL_PATHS)}")
+    return name
+
+
+# routes : each returns (etag seed, build) so cached / unchanged responses are answered without building
+def _datasets_summary():
+    summary = []
+    for name in DATA_SOURCE_REL_PATHS:
+        dates = get_available_dates(name)
+        summary.append({
+            "name": name,
+            "rows": get_data_version(name)[1],
+            "first_date": dates[0].strftime("%Y-%m-%d") if len(dates) else None,
+            "last_date": dates[-1].strftime("%Y-%m-%d") if len(dates) else None,
+            "fingerprint": get_data_fingerprint(name),
+        })
+    return summary
+
+
+def _route(path, params):
+    parts = [urllib.parse.unquote(part) for part in path.strip("/").split("/") if part]
+
+    if parts == ["datasets"]:
+        return "|".join(get_data_fingerprint(name) for name in DATA_SOURCE_REL_PATHS), _datasets_summary
+    if parts == ["stations"]:
+        return "stations", lambda: STATION_CODE_TO_NAME
+    if len(parts) == 2 and parts[0] == "stations":
+        code = parts[1].upper()
+        if code not in STATION_CODE_TO_NAME:
+            raise NotFound(f"Unknown station code {code!r}")
+        return "stations", lambda: {"code": code, "name": STATION_CODE_TO_NAME[code]}
+    if len(parts) == 3 and parts[0] == "stations" and parts[2] == "history":
+        code = parts[1].upper()
+        dataset = _dataset(params.get("dataset", "ridership_station"))
+        kwargs = {
+            "start": _date_param(params["start"]) if "start" in params else None,
+            "end": _date_param(params["end"]) if "end" in params else None,
+            "columns": _list_param(params, "columns"),
+            "dataset": dataset,
+        }
+        return get_data_fingerprint(dataset), lambda: get_station_history(code, **kwargs)
+
+    if len(parts) >= 3 and parts[0] == "datasets":
+        name = _dataset(parts[1])
+        seed = get_data_fingerprint(name)
+        if parts[2:] == ["dates"]:
+            return seed, lambda: [date.strftime("%Y-%m-%d") for date in get_available_dates(name)]
+        if parts[2:] == ["on"]:
+            dates = _list_param(params, "dates", _date_param) or []
+            return seed, lambda: DATES_GETTERS[name](dates)
+        if len(parts) == 4 and parts[2] == "on":
+            date = _date_param(parts[3])
+            return seed, lambda: DATE_GETTERS[name](date)
+        if parts[2:] == ["query"]:
+            kwargs = {
+                "start": _date_param(params["start"]) if "start" in params else None,
+                "end": _date_param(params["end"]) if "end" in params else None,
+                "stations": _list_param(params, "stations", str.upper),
+                "lines": _list_param(params, "lines", int),
+                "hours": _hours_param(params),
+                "directions": _list_param(params, "directions", str.upper),
+                "columns": _list_param(params, "columns"),
+            }
+            return seed, lambda: query(name, **kwargs)
+
+    raise NotFound(f"No endpoint at {path}")
+
+
+# response encoding
+def _encode(payload, fmt):
+    if not isinstance(payload, pd.DataFrame):
+        return JSON_MEDIA_TYPE, json.dumps(payload, separators=(",", ":")).encode()
+    if fmt == "arrow":
+        if pa is None:
+            raise ValueError("Arrow responses need pyarrow")
+        table = pa.Table.from_pandas(payload, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return ARROW_MEDIA_TYPE, sink.getvalue().to_pybytes()
+    return JSON_MEDIA_TYPE, payload.to_json(orient="split", index=False, date_format="iso").encode()
+
+
+def _render(build, fmt, use_gzip):
+    content_type, body = _encode(build(), fmt)
+    if use_gzip and len(body) >= GZIP_MIN_BYTES:
+        return content_type, gzip.compress(body, compresslevel=6), "gzip"
+    return content_type, body, None
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for clients making many requests
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        fmt = params.get("format") or ("arrow" if ARROW_MEDIA_TYPE in self.headers.get("Accept", "") else "json")
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        try:
+            seed, build = _route(url.path, params)
+            etag = '"' + hashlib.sha1(f"{seed}|{url.path}|{sorted(params.items())}|{fmt}".encode()).hexdigest()[:20] + '"'
+            if etag in self.headers.get("If-None-Match", ""):
+                self._send(304, None, b"", {"ETag": etag})
+                return
+            content_type, body, encoding = _RESPONSES.get_or_build(
+                (etag, use_gzip), lambda: _render(build, fmt, use_gzip)
+            )
+        except NotFound as e:
+            self._send_error(404, str(e))
+            return
+        except (ValueError, KeyError) as e:
+            self._send_error(400, str(e))
+            return
+        except Exception as e:  # e.g. a dataset that can't be fetched right now
+            logger.exception("Serving %s failed", self.path)
+            self._send_error(503, f"{type(e).__name__}: {e}")
+            return
+
+        headers = {"ETag": etag}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        self._send(200, content_type, body, headers)
+
+    def _send_error(self, status, message):
+        self._send(status, JSON_MEDIA_TYPE, json.dumps({"error": message}).encode(), {"Cache-Control": "no-store"})
+
+    def _send(self, status, content_type, body, headers):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        headers = {"Cache-Control": f"public, max-age={API_MAX_AGE_SECONDS}", "Vary": "Accept, Accept-Encoding", **headers}
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info("%s %s", self.address_string(), format % args)
+
+
+def _refresh_loop():
+    # new data changes the fingerprints, so ETags change and stale responses age out of the cache
+    while True:
+        time.sleep(API_REFRESH_SECONDS)
+        try:
+            refresh_data_sources()
+        except Exception:
+            logger.exception("Refreshing data sources failed")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    for name, error in load_data_sources().items():
+        logger.warning("%s unavailable : %s", name, error)
+    threading.Thread(target=_refresh_loop, daemon=True, name="cmrl-refresh").start()
+
+    server = ThreadingHTTPServer((API_HOST, API_PORT), ApiHandler)
+    logger.info("Serving the ridership API on http://%s:%s", API_HOST, API_PORT)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
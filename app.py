@@ -9,7 +9,14 @@ This platform provides historical analysis and visualizations of metro ridership
 
 **Navigate using the sidebar to explore:**
 - **CMRL Historical Dashboard** - Official dashboard replicas with historical data (WIP)
-- **Heatmap Analysis** - Station and corridor heatmap visualizations (TODO)
+- **Station Heatmap** - Station x date ridership heatmap over any date range
+- **PHPDT Flow Map** - Animated UP / DOWN peak hour flows on the network map for any date
+- **Case Study Comparisons** - Station ridership and PHPDT before vs after the Egmore, Vadapalani and St Thomas Mount events
+- **Station History** - Daily ridership or parking of any single station over its whole history
+- **Weekday vs Weekend** - Average hourly ridership and parking curves per day of week, special days excluded
+- **Commuters vs Casual** - Card (commuter) vs QR (casual) rider shares over time, by hour and per station
+- **Weather vs Ridership** - Relative ridership on rainy and hot days, underground vs elevated and multimodal stations
+- **Heatmap Analysis** - Corridor heatmap visualizations (TODO)
 - **Trends & Forecasting** - Trend analysis and predictions (TODO)
 
 Select a page from the sidebar to begin or scroll down to learn more about this project.
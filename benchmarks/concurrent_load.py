@@ -0,0 +1,86 @@
+"""
+Cold start of all seven sources, one after another vs load_data_sources(), against a local HTTP stand-in.
+
+The stand-in serves the locally cached tracker CSVs with LATENCY_SECONDS added to every response and makes
+FAILING_SOURCE answer 503, so the run also shows that one failed file is reported instead of raised.
+Every mode runs in a fresh interpreter with an empty cache dir. Usage : python benchmarks/concurrent_load.py
+"""
+import functools
+import http.server
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ridership_tracker_api as api
+
+LATENCY_SECONDS = 0.5
+FAILING_SOURCE = "phpdt_daily"
+
+
+class _SlowHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        time.sleep(LATENCY_SECONDS)
+        if self.path.lstrip("/") == api.DATA_SOURCE_REL_PATHS[FAILING_SOURCE]:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def _child(mode):
+    start = time.perf_counter()
+    if mode == "sequential":
+        failures = {}
+        for name in api.DATA_SOURCE_REL_PATHS:
+            try:
+                api.DATA_SOURCES[name]
+            except Exception as e:
+                failures[name] = e
+    else:
+        failures = api.load_data_sources()
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed:.2f} {','.join(sorted(failures)) or '-'}")
+
+
+def main():
+    for rel_path in api.DATA_SOURCE_REL_PATHS.values():
+        api.fetch_csv_to_cache(rel_path)
+
+    handler = functools.partial(_SlowHandler, directory=api.CACHE_DIR)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"{'mode':<12}{'load (s)':>10}  failed")
+    for mode in ["sequential", "concurrent"]:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = dict(
+                os.environ,
+                CMRL_BASE_URL=f"http://127.0.0.1:{server.server_port}/",
+                CMRL_CACHE_DIR=cache_dir,
+                CMRL_OFFLINE="0",
+            )
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", mode],
+                capture_output=True, text=True, check=True, env=env,
+            ).stdout.split()
+        elapsed, failed = out
+        print(f"{mode:<12}{elapsed:>10}  {failed}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        _child(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,61 @@
+"""
+Time the LTTB and min/max downsamplers on synthetic multi-year hourly ridership.
+
+Usage : python benchmarks/downsampling.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from downsampling import downsample, point_budget
+
+YEARS = [1, 3, 5]
+STATIONS = 41
+REPEATS = 5
+
+
+def synthetic_hourly(years, seed=0):
+    # daily double peak + weekly cycle + slow growth + noise, roughly the shape of the real hourly data
+    rng = np.random.default_rng(seed)
+    x = pd.date_range("2024-01-01", periods=years * 365 * 24, freq="h")
+    hour = x.hour.to_numpy()
+    dow = x.dayofweek.to_numpy()
+    peaks = np.exp(-((hour - 9) ** 2) / 4) + 0.9 * np.exp(-((hour - 18) ** 2) / 5)
+    weekly = np.where(dow >= 5, 0.6, 1.0)
+    growth = np.linspace(1.0, 1.0 + 0.15 * years, len(x))
+    y = 15000 * peaks * weekly * growth + rng.normal(0, 400, len(x))
+    return x, np.clip(y, 0, None).astype(np.int64)
+
+
+def _time(fn):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n_out = point_budget()
+    print(f"point budget per trace : {n_out}")
+    print(f"{'series':<28}{'points':>10}{'lttb (ms)':>12}{'minmax (ms)':>13}")
+    for years in YEARS:
+        x, y = synthetic_hourly(years)
+        lttb = _time(lambda: downsample(x, y, n_out, method="lttb"))
+        minmax = _time(lambda: downsample(x, y, n_out, method="minmax"))
+        print(f"{f'{years}y hourly, 1 trace':<28}{len(y):>10}{lttb * 1000:>12.2f}{minmax * 1000:>13.2f}")
+
+        # every station as its own trace, as a station history chart would draw
+        lttb = _time(lambda: [downsample(x, y, n_out, method="lttb") for _ in range(STATIONS)])
+        minmax = _time(lambda: [downsample(x, y, n_out, method="minmax") for _ in range(STATIONS)])
+        print(f"{f'{years}y hourly, {STATIONS} traces':<28}{len(y) * STATIONS:>10}{lttb * 1000:>12.2f}{minmax * 1000:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Per-dataset memory of the typed frames vs read_csv's default dtypes (see get_memory_report).
+
+Usage : python benchmarks/memory_report.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ridership_tracker_api as api
+
+
+def main():
+    failures = api.load_data_sources()
+    report = api.get_memory_report([name for name in api.DATA_SOURCE_REL_PATHS if name not in failures])
+    print(report.to_string(index=False))
+    default_mb, compact_mb = report["Default MB"].sum(), report["Compact MB"].sum()
+    print(f"\ntotal : {default_mb:.2f} MB -> {compact_mb:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
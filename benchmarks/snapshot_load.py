@@ -0,0 +1,59 @@
+"""
+Compare cold load time and peak RSS of the tracker CSVs vs the typed Arrow snapshots.
+
+Each measurement runs in a fresh interpreter so peak RSS isn't shared between runs.
+Snapshots are built first if missing. Usage : python benchmarks/snapshot_load.py
+"""
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ridership_tracker_api as api
+
+
+def _child(mode, name):
+    import pandas as pd
+
+    start = time.perf_counter()
+    if mode == "csv":
+        csv_path, _ = api.fetch_csv_to_cache(api.DATA_SOURCE_REL_PATHS[name])
+        df = pd.read_csv(csv_path)
+    elif mode == "csv_typed":
+        csv_path, _ = api.fetch_csv_to_cache(api.DATA_SOURCE_REL_PATHS[name])
+        with open(csv_path, "rb") as f:
+            df = api._read_csv_bytes(name, f.read())
+    else:
+        df = api.load_snapshot(name)
+    elapsed = time.perf_counter() - start
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    frame_mb = df.memory_usage(deep=True).sum() / 1024 ** 2
+    print(f"{elapsed:.4f} {peak_rss_mb:.1f} {frame_mb:.1f}")
+
+
+def main():
+    if api.feather is None:
+        sys.exit("pyarrow is required for snapshots")
+    for name in api.DATA_SOURCE_REL_PATHS:
+        if api.load_snapshot(name, columns=["Date"]) is None:
+            api.build_snapshots([name])
+
+    print(f"{'dataset':<20}{'mode':<12}{'load (s)':>10}{'peak RSS (MB)':>15}{'frame (MB)':>12}")
+    for name in api.DATA_SOURCE_REL_PATHS:
+        for mode in ["csv", "csv_typed", "snapshot"]:
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", mode, name],
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+            elapsed, rss, frame = out
+            print(f"{name:<20}{mode:<12}{elapsed:>10}{rss:>15}{frame:>12}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3])
+    else:
+        main()
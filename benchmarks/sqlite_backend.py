@@ -0,0 +1,57 @@
+"""
+Compare the pandas and sqlite backends : peak RSS of a worker and latency of the date getters / query().
+
+Each backend runs in a fresh interpreter (CMRL_BACKEND set per child) so peak RSS isn't shared between runs.
+The sqlite database is built first if missing. Usage : python benchmarks/sqlite_backend.py
+"""
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ridership_tracker_api as api
+
+REPEATS = 20
+
+
+def _child():
+    dates = api.get_available_dates("ridership_station")
+    recent = [date.strftime("%Y-%m-%d") for date in dates[-REPEATS:]]
+
+    start = time.perf_counter()
+    for date in recent:
+        api.get_station_ridership_on_date(date)
+    on_date_ms = (time.perf_counter() - start) / len(recent) * 1000
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        api.query("ridership_station", start=recent[0], end=recent[-1], stations=["SCC", "SAE"], columns=["Date", "Station", "Total"])
+    query_ms = (time.perf_counter() - start) / REPEATS * 1000
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{on_date_ms:.2f} {query_ms:.2f} {peak_rss_mb:.1f}")
+
+
+def main():
+    if not os.path.exists(api.SQLITE_PATH):
+        api.sync_sqlite_database()
+
+    print(f"{'backend':<10}{'on date (ms)':>14}{'query (ms)':>12}{'peak RSS (MB)':>15}")
+    for backend in ["pandas", "sqlite"]:
+        out = subprocess.run(
+            [sys.executable, __file__, "--child"],
+            capture_output=True, text=True, check=True,
+            env=dict(os.environ, CMRL_BACKEND=backend),
+        ).stdout.split()
+        on_date, query, rss = out
+        print(f"{backend:<10}{on_date:>14}{query:>12}{rss:>15}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "--child":
+        _child()
+    else:
+        main()
@@ -0,0 +1,173 @@
+"""
+Before / after comparisons of station ridership and PHPDT around the README case-study events.
+
+Every station (or PHPDT segment) is compared in one vectorized pass over the dense station x date matrices
+of the heatmap engine and the segment-aligned PHPDT corridors, with days that have no row left out. Results are cached per
+(event, window, data version).
+"""
+import numpy as np
+import pandas as pd
+
+from ridership_tracker_api import (
+    PHPDT_LINE_STATIONS,
+    cached_derived,
+    get_phpdt_corridor,
+    get_station_heatmap,
+    get_station_name_from_code,
+    query,
+)
+
+# events from the README case studies. "start" / "end" bound the event itself (end == start for openings),
+# "stations" are the ones the case study is about
+CASE_STUDY_EVENTS = {
+    "egmore_redevelopment": {
+        "title": "Egmore railway station redevelopment",
+        "start": "2026-02-22",
+        "end": "2026-04-05",
+        "stations": ["SEG", "SCC", "SNP"],
+        "note": "Reduced MRTS schedules (204 -> 160 trains a day). The Vadapalani reach opened during the works.",
+    },
+    "vadapalani_reach": {
+        "title": "Poonamallee-Porur-Vadapalani reach opening",
+        "start": "2026-03-01",
+        "end": "2026-03-01",
+        "stations": ["SVA", "SKO", "SGU"],
+        "note": "Opening date approximate (expected early March 2026), adjust once confirmed.",
+    },
+    "st_thomas_mount_mrts": {
+        "title": "Velachery - St Thomas Mount suburban extension",
+        "start": "2026-03-10",
+        "end": "2026-03-10",
+        "stations": ["SMM", "SAL"],
+        "note": "Opening date approximate (expected around 10 March 2026, pending CMRS clearance).",
+    },
+}
+
+# "during" compares the weeks before the event with its first weeks, "after" with the weeks after it ended
+CASE_STUDY_PHASES = ["during", "after"]
+
+
+def get_case_study_windows(event, weeks=2, phase="during"):
+    """((before_start, before_end), (after_start, after_end)) inclusive Timestamps for an event."""
+    if phase not in CASE_STUDY_PHASES:
+        raise ValueError(f"Unknown phase {phase!r}, expected one of {CASE_STUDY_PHASES}")
+    spec = CASE_STUDY_EVENTS[event]
+    start = pd.Timestamp(spec["start"])
+    after_start = start if phase == "during" else pd.Timestamp(spec["end"]) + pd.Timedelta(days=1)
+    window = pd.Timedelta(weeks=weeks)
+    day = pd.Timedelta(days=1)
+    return (start - window, start - day), (after_start, after_start + window - day)
+
+
+def _window_stats(matrix, dates, windows):
+    """
+    Windowed means and deltas for every row of an (entities x dates) matrix at once, NaN marking days an
+    entity has no row for. Means are taken over the days each row actually has, so a missing day doesn't
+    count as 0 riders. The day-of-week matched means average per weekday means over the weekdays that row
+    has in both windows, so a window with an extra weekend (or a missing day) doesn't bias the comparison.
+    """
+    (before_start, before_end), (after_start, after_end) = windows
+    in_before = ((dates >= before_start) & (dates <= before_end)).astype(np.float64)
+    in_after = ((dates >= after_start) & (dates <= after_end)).astype(np.float64)
+    dow = dates.dayofweek.to_numpy()
+    matrix = np.asarray(matrix, dtype=np.float64)
+    present = ~np.isnan(matrix)
+    values = np.where(present, matrix, 0.0)
+
+    # (entities, 7) per weekday sums and day counts per window
+    dow_onehot = (dow[:, None] == np.arange(7)[None, :]).astype(np.float64)
+    before_dow_days = (present * in_before) @ dow_onehot
+    after_dow_days = (present * in_after) @ dow_onehot
+    before_days = before_dow_days.sum(axis=1)
+    after_days = after_dow_days.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        before_dow = (values * in_before) @ dow_onehot / before_dow_days
+        after_dow = (values * in_after) @ dow_onehot / after_dow_days
+        before = (values * in_before).sum(axis=1) / before_days
+        after = (values * in_after).sum(axis=1) / after_days
+        # weekdays this row has in both windows
+        matched = (before_dow_days > 0) & (after_dow_days > 0)
+        matched_days = matched.sum(axis=1)
+        before_matched = np.where(matched, before_dow, 0).sum(axis=1) / matched_days
+        after_matched = np.where(matched, after_dow, 0).sum(axis=1) / matched_days
+
+        return pd.DataFrame({
+            "Before": before,
+            "After": after,
+            "Delta": after - before,
+            "Delta %": np.where(before > 0, 100 * (after - before) / before, np.nan),
+            "Before (DOW matched)": before_matched,
+            "After (DOW matched)": after_matched,
+            "DOW Delta": after_matched - before_matched,
+            "DOW Delta %": np.where(before_matched > 0, 100 * (after_matched - before_matched) / before_matched, np.nan),
+            "Before Days": before_days.astype(np.int64),
+            "After Days": after_days.astype(np.int64),
+        })
+
+
+def _station_presence(heatmap, column, start, end):
+    # True where a (Line, Station) has a row with a value on a date, the heatmap itself is 0-filled
+    rows = query("ridership_station", start=start, end=end, columns=["Date", "Line", "Station", column])
+    rows = rows[rows[column].notna()]
+    row_pos = heatmap.index.get_indexer(pd.MultiIndex.from_arrays([rows["Line"].to_numpy(), rows["Station"].astype(str).to_numpy()]))
+    col_pos = heatmap.columns.get_indexer(pd.DatetimeIndex(rows["Date"]))
+    found = (row_pos >= 0) & (col_pos >= 0)
+    present = np.zeros(heatmap.shape, dtype=bool)
+    present[row_pos[found], col_pos[found]] = True
+    return present
+
+
+def _build_station_case_study(event, weeks, phase, column):
+    windows = get_case_study_windows(event, weeks, phase)
+    start, end = windows[0][0], windows[1][1]
+    heatmap = get_station_heatmap(column, start=start, end=end)
+    matrix = np.where(_station_presence(heatmap, column, start, end), heatmap.to_numpy(), np.nan)
+    stats = _window_stats(matrix, heatmap.columns, windows)
+    stats.insert(0, "Line", heatmap.index.get_level_values("Line").to_numpy())
+    stats.insert(1, "Station", heatmap.index.get_level_values("Station").to_numpy())
+    stats.insert(2, "Station_Name", stats["Station"].map(get_station_name_from_code))
+    stats["Focus"] = stats["Station"].isin(CASE_STUDY_EVENTS[event]["stations"])
+    # stations without a single rider in either window (not open yet / closed) say nothing about the event
+    return stats[(stats["Before"] > 0) | (stats["After"] > 0)].reset_index(drop=True)
+
+
+def _build_phpdt_case_study(event, weeks, phase):
+    windows = get_case_study_windows(event, weeks, phase)
+    frames = []
+    for line_num in PHPDT_LINE_STATIONS:
+        # NaN for segments without a row on a date, so they don't count as an empty train
+        corridor = get_phpdt_corridor(line_num, start=windows[0][0], end=windows[1][1], fill_value=np.nan)
+        if corridor.empty:
+            continue
+        # the corridor is date-major with one row per segment, so each direction reshapes to (dates, segments)
+        segments = corridor.drop_duplicates("Position")
+        dates = pd.DatetimeIndex(corridor["Date"].unique())
+        for direction in ["UP", "DOWN"]:
+            matrix = corridor[direction].to_numpy().reshape(len(dates), len(segments)).T
+            stats = _window_stats(matrix, dates, windows)
+            stats.insert(0, "Line", line_num)
+            stats.insert(1, "Direction", direction)
+            stats.insert(2, "Position", segments["Position"].to_numpy())
+            stats.insert(3, "Segment", segments[f"{direction} Label"].to_numpy())
+            frames.append(stats)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def get_station_case_study(event, weeks=2, phase="during", column="Total"):
+    """
+    Station ridership `weeks` before vs `weeks` into (phase="during") or after (phase="after") an event.
+    One row per (Line, Station) with plain and day-of-week matched window means, deltas and a Focus flag
+    for the stations the case study is about.
+    """
+    return cached_derived(
+        "ridership_station", "case_study", (event, weeks, phase, column),
+        lambda: _build_station_case_study(event, weeks, phase, column),
+    )
+
+
+def get_phpdt_case_study(event, weeks=2, phase="during"):
+    """PHPDT per (Line, Direction, segment) before vs after an event, same statistics as get_station_case_study."""
+    return cached_derived(
+        "phpdt_daily", "case_study", (event, weeks, phase),
+        lambda: _build_phpdt_case_study(event, weeks, phase),
+    )
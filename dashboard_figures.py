@@ -0,0 +1,507 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from downsampling import DEFAULT_CHART_WIDTH_PX, downsample
+from ridership_tracker_api import (
+    CACHE_DIR,
+    LRUCache,
+    PHPDT_LINE_STATIONS,
+    build_phpdt_corridor,
+    get_data_fingerprint,
+    get_data_version,
+    get_phpdt_corridor,
+    get_hourly_parking_for_display,
+    get_hourly_ridership_for_display,
+    get_phpdt_bar_color,
+    get_phpdt_ridership_on_date,
+    get_station_name_from_code,
+    get_station_parking_for_display,
+    get_station_ridership_for_display,
+    get_station_heatmap,
+    query,
+)
+
+line_colors = px.colors.qualitative.Bold
+
+LINE_NAMES = {1: "Line 01 - Blue", 2: "Line 02 - Green"}
+LINE_BAR_COLORS = {1: "#1f77b4", 2: "#2ca02c"}
+PHPDT_DISPLAY_MODES = ["Bars + Lines", "Bars only", "Lines only"]
+
+
+def _add_outlined_lines(fig, x, frame, columns, hovertemplate, width_px=DEFAULT_CHART_WIDTH_PX):
+    # black outline under every coloured line so overlapping series stay readable
+    for idx, col in enumerate(columns):
+        # long series are reduced to what the chart width can show before they go to the browser
+        trace_x, trace_y = downsample(x, frame[col], width_px=width_px)
+        fig.add_trace(
+            go.Scatter(
+                x=trace_x,
+                y=trace_y,
+                mode="lines",
+                name=col,
+                line=dict(shape="spline", color="black", width=3.5),
+                hoverinfo="skip",
+                showlegend=False,
+            )
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=trace_x,
+                y=trace_y,
+                mode="lines",
+                name=col,
+                line=dict(shape="spline", color=line_colors[idx % len(line_colors)], width=2.5),
+                hovertemplate=hovertemplate.format(name=col),
+            )
+        )
+
+
+def _sorted_by_total(frame, exclude):
+    # series sorted by their total over the frame (descending) so the legend reads biggest first
+    columns = [col for col in frame.columns if col not in exclude]
+    return sorted(columns, key=lambda x: frame[x].sum(), reverse=True)
+
+
+def _hourly_figure(frame, total_col, total_name, exclude, yaxis_title):
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            x=frame["Time_dt"],
+            y=frame[total_col],
+            name=total_name,
+            marker_color="lightgray",
+            opacity=0.7,
+            hovertemplate=f"<b>{total_name}</b>: %{{y}}<extra></extra>",
+        )
+    )
+    _add_outlined_lines(fig, frame["Time_dt"], frame, _sorted_by_total(frame, exclude), "<b>{name}</b>: %{{y}}<extra></extra>")
+    fig.update_layout(
+        xaxis_title="Time of Day",
+        yaxis_title=yaxis_title,
+        xaxis_tickformat="%H:%M",
+        hovermode="x unified",
+        legend=dict(
+            orientation="h",
+            yanchor="top",
+            y=-0.15,
+            xanchor="center",
+            x=0.5,
+        ),
+        height=600,
+        margin=dict(t=80, b=120),
+    )
+    return fig
+
+
+def _station_figure(line_data, line_num, total_col, total_name, exclude, yaxis_title):
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            x=line_data["Station_Display"],
+            y=line_data[total_col],
+            name=total_name,
+            marker_color=LINE_BAR_COLORS[line_num],
+            opacity=0.7,
+            hovertemplate="Total: %{y}<extra></extra>",
+        )
+    )
+    _add_outlined_lines(fig, line_data["Station_Display"], line_data, _sorted_by_total(line_data, exclude), "{name}: %{{y}}<extra></extra>")
+    fig.update_layout(
+        title_text=LINE_NAMES[line_num],
+        yaxis_title=yaxis_title,
+        hovermode="x unified",
+        xaxis=dict(tickangle=30),
+        legend=dict(
+            x=1.02,
+            y=1,
+            xanchor="left",
+            yanchor="top",
+        ),
+        height=600,
+        margin=dict(t=90, b=150, r=250),
+    )
+    return fig
+
+
+def build_hourly_ridership_figure(date_str):
+    ridership_day = get_hourly_ridership_for_display(date_str)
+    if ridership_day.empty:
+        return None
+    return _hourly_figure(
+        ridership_day, "Total", "Total Passengers",
+        ["Date", "Hour", "Time_dt", "HourOfDay", "Total"], "Number of Passengers",
+    )
+
+
+def build_station_ridership_figure(date_str, line_num):
+    station_day = get_station_ridership_for_display(date_str)
+    line_data = station_day[station_day["Line"] == line_num]
+    if line_data.empty:
+        return None
+    return _station_figure(
+        line_data, line_num, "Total", "Total Passengers",
+        ["Date", "Line", "Station", "Station_Name", "Station_Display", "Total"], "Number of Passengers",
+    )
+
+
+def build_hourly_parking_figure(date_str):
+    parking_hourly = get_hourly_parking_for_display(date_str)
+    if parking_hourly.empty:
+        return None
+    return _hourly_figure(
+        parking_hourly, "Total Vehicles", "Total Vehicles",
+        ["Date", "Hour", "Time_dt", "HourOfDay", "Total Vehicles", "General Parking"], "Number of Vehicles",
+    )
+
+
+def build_station_parking_figure(date_str, line_num):
+    station_parking = get_station_parking_for_display(date_str)
+    line_data = station_parking[station_parking["Line"] == line_num]
+    if line_data.empty:
+        return None
+    return _station_figure(
+        line_data, line_num, "Total Vehicles", "Total Vehicles",
+        ["Date", "Line", "Station", "Station_Name", "Station_Display", "Total Vehicles", "General Parking", "eightWheeler"],
+        "Number of Vehicles",
+    )
+
+
+def build_phpdt_figure(date_str, line_num, display_mode="Bars + Lines"):
+    phpdt_day = get_phpdt_ridership_on_date(date_str)
+    line_phpdt = phpdt_day[phpdt_day["Line"] == line_num]
+    if line_phpdt.empty:
+        return None
+
+    show_bars = display_mode in ["Bars + Lines", "Bars only"]
+    show_lines = display_mode in ["Bars + Lines", "Lines only"]
+    line_showlegend = display_mode == "Lines only"
+
+    # Separate UP and DOWN directions
+    up_data = line_phpdt[line_phpdt["Direction"] == "UP"]
+    down_data = line_phpdt[line_phpdt["Direction"] == "DOWN"]
+
+    # Get station order for this line
+    station_order = PHPDT_LINE_STATIONS.get(line_num, [])
+    station_names = [get_station_name_from_code(code) for code in station_order]
+    station_display = [f"{name} ({code})" for name, code in zip(station_names, station_order)]
+    line_start_name = station_names[0] if station_names else ""
+    line_end_name = station_names[-1] if station_names else ""
+    line_start_code = station_order[0] if station_order else ""
+    line_end_code = station_order[-1] if station_order else ""
+
+    # Corridor data aligned to the station order, bars sit between station i and i+1
+    # UP labels show the forward direction, DOWN labels the reverse
+    corridor = build_phpdt_corridor(line_phpdt, line_num)
+    bar_positions = corridor["Position"].tolist()
+    up_corridor_values = corridor["UP"].tolist()
+    down_corridor_values = corridor["DOWN"].tolist()
+    up_corridor_labels = corridor["UP Label"].tolist()
+    down_corridor_labels = corridor["DOWN Label"].tolist()
+
+    # Get peak hours
+    up_peak_hour = f"{up_data['Start Hour'].values[0]}-{up_data['End Hour'].values[0]}" if not up_data.empty else "N/A"
+    down_peak_hour = f"{down_data['Start Hour'].values[0]}-{down_data['End Hour'].values[0]}" if not down_data.empty else "N/A"
+
+    fig_phpdt = go.Figure()
+
+    up_legend_name = f"UP ({up_peak_hour}) ({line_start_code}-{line_end_code})"
+    down_legend_name = f"DOWN ({down_peak_hour}) ({line_end_code}-{line_start_code})"
+
+    # UP / DOWN bars (positioned between stations)
+    if show_bars:
+        fig_phpdt.add_trace(
+            go.Bar(
+                x=bar_positions,
+                y=up_corridor_values,
+                name=up_legend_name,
+                marker_color=get_phpdt_bar_color(line_num, "UP"),
+                hovertemplate="<b>%{customdata}</b><br>UP Passengers: %{y}<br>Peak: " + up_peak_hour + "<extra></extra>",
+                customdata=up_corridor_labels,
+                legendgroup="up",
+                showlegend=True,
+            )
+        )
+        fig_phpdt.add_trace(
+            go.Bar(
+                x=bar_positions,
+                y=down_corridor_values,
+                name=down_legend_name,
+                marker_color=get_phpdt_bar_color(line_num, "DOWN"),
+                hovertemplate="<b>%{customdata}</b><br>DOWN Passengers: %{y}<br>Peak: " + down_peak_hour + "<extra></extra>",
+                customdata=down_corridor_labels,
+                legendgroup="down",
+                showlegend=True,
+            )
+        )
+
+    # Smooth lines tracing the bars (no extra legend entries)
+    if show_lines:
+        fig_phpdt.add_trace(
+            go.Scatter(
+                x=bar_positions,
+                y=up_corridor_values,
+                mode="lines",
+                name=up_legend_name,
+                line=dict(shape="spline", color=get_phpdt_bar_color(line_num, "UP"), width=2),
+                hovertemplate="<b>%{customdata}</b><br>UP Passengers: %{y}<br>Peak: " + up_peak_hour + "<extra></extra>",
+                customdata=up_corridor_labels,
+                showlegend=line_showlegend,
+                legendgroup="up",
+            )
+        )
+        fig_phpdt.add_trace(
+            go.Scatter(
+                x=bar_positions,
+                y=down_corridor_values,
+                mode="lines",
+                name=down_legend_name,
+                line=dict(shape="spline", color=get_phpdt_bar_color(line_num, "DOWN"), width=2),
+                hovertemplate="<b>%{customdata}</b><br>DOWN Passengers: %{y}<br>Peak: " + down_peak_hour + "<extra></extra>",
+                customdata=down_corridor_labels,
+                showlegend=line_showlegend,
+                legendgroup="down",
+            )
+        )
+
+    # Set x-axis to show station names at integer positions
+    station_positions = list(range(len(station_names)))
+
+    fig_phpdt.update_layout(
+        title_text=f"Line {line_num} - {'Blue' if line_num == 1 else 'Green'} Line between {line_start_name} and {line_end_name}",
+        yaxis_title="Peak Hour Passengers",
+        yaxis=dict(autorange=True, rangemode="tozero"),
+        barmode="group",
+        hovermode="x unified",
+        xaxis=dict(
+            type="linear",
+            tickmode="array",
+            tickvals=station_positions,
+            ticktext=station_display,
+            tickangle=30,
+            zeroline=False,
+            range=[-0.5, len(station_positions) - 0.5],
+        ),
+        legend=dict(
+            orientation="h",
+            x=0.5,
+            xanchor="center",
+            y=-0.3,
+            yanchor="top",
+        ),
+        height=600,
+        margin=dict(t=90, b=200, r=40, l=40),
+    )
+    return fig_phpdt
+
+
+# playback : one animated figure per date range, every frame built up front and shipped with the figure
+PLAYBACK_FRAME_MS = 400
+
+
+def _playback_figure(x, dates, series, title, yaxis_title):
+    """
+    Animated grouped bar chart stepping through `dates`. series maps trace name -> (color, (dates x len(x)) matrix).
+    Frames only carry the y values, the browser plays them without a server round trip per date.
+    """
+    labels = [date.strftime("%Y-%m-%d") for date in dates]
+    fig = go.Figure(
+        data=[go.Bar(x=x, y=matrix[0], name=name, marker_color=color) for name, (color, matrix) in series.items()],
+        frames=[
+            go.Frame(data=[go.Bar(y=matrix[i]) for _, matrix in series.values()], name=label, layout=dict(title_text=f"{title} · {label}"))
+            for i, label in enumerate(labels)
+        ],
+    )
+    y_max = max(float(np.nanmax(matrix)) for _, matrix in series.values())
+    frame_args = {"mode": "immediate", "frame": {"duration": PLAYBACK_FRAME_MS, "redraw": True}, "transition": {"duration": 0}}
+    fig.update_layout(
+        title_text=f"{title} · {labels[0]}",
+        yaxis=dict(title=yaxis_title, range=[0, y_max * 1.05 or 1]),  # fixed so bars can be compared across frames
+        barmode="group",
+        height=600,
+        margin=dict(t=90, b=150),
+        updatemenus=[dict(
+            type="buttons",
+            direction="left",
+            x=0, y=-0.25, xanchor="left", yanchor="top",
+            buttons=[
+                dict(label="▶ Play", method="animate", args=[None, {**frame_args, "fromcurrent": True}]),
+                dict(label="⏸ Pause", method="animate", args=[[None], {**frame_args, "frame": {"duration": 0, "redraw": False}}]),
+            ],
+        )],
+        sliders=[dict(
+            active=0,
+            x=0.12, y=-0.2, len=0.88, xanchor="left", yanchor="top",
+            currentvalue=dict(prefix="Date : "),
+            steps=[dict(label=label, method="animate", args=[[label], frame_args]) for label in labels],
+        )],
+    )
+    return fig
+
+
+def set_playback_speed(fig, frame_ms):
+    """Change the frame duration of a playback figure dict from get_figure, so speed changes don't rebuild it."""
+    for button in fig["layout"]["updatemenus"][0]["buttons"][:1]:
+        button["args"][1]["frame"]["duration"] = frame_ms
+    return fig
+
+
+def build_station_ridership_playback(start_str, end_str, line_num):
+    # the heatmap engine already holds station x date matrices, each column is one frame
+    heatmap = get_station_heatmap("Total", start=start_str, end=end_str, lines=[line_num])
+    heatmap = heatmap[heatmap.sum(axis=1) > 0]
+    if heatmap.empty or heatmap.columns.empty:
+        return None
+    codes = heatmap.index.get_level_values("Station")
+    x = [f"{get_station_name_from_code(code)} ({code})" for code in codes]
+    fig = _playback_figure(
+        x, heatmap.columns, {"Total Passengers": (LINE_BAR_COLORS.get(line_num, "#1f77b4"), heatmap.to_numpy().T)},
+        LINE_NAMES.get(line_num, f"Line {line_num:02d}"), "Number of Passengers",
+    )
+    fig.update_layout(xaxis=dict(tickangle=30), showlegend=False)
+    return fig
+
+
+def build_hourly_ridership_playback(start_str, end_str):
+    hourly = query("ridership_hourly", start=start_str, end=end_str, columns=["Date", "Hour", "Total"])
+    if hourly.empty:
+        return None
+    # dates x hour slots in one pivot, slots missing on a date are 0
+    matrix = hourly.pivot_table(index="Date", columns="Hour", values="Total", aggfunc="sum", fill_value=0, observed=True)
+    matrix = matrix[sorted(matrix.columns)]
+    fig = _playback_figure(
+        [str(hour) for hour in matrix.columns], matrix.index, {"Total Passengers": ("lightgray", matrix.to_numpy())},
+        "Hourly Passenger Flow", "Number of Passengers",
+    )
+    fig.update_layout(xaxis_title="Time of Day", showlegend=False)
+    return fig
+
+
+def build_phpdt_playback(start_str, end_str, line_num):
+    corridor = get_phpdt_corridor(line_num, start=start_str, end=end_str)
+    if corridor.empty:
+        return None
+    # the corridor is date-major with one row per segment
+    dates = pd.DatetimeIndex(corridor["Date"].unique())
+    n_segments = len(corridor) // len(dates)
+    series = {
+        direction: (get_phpdt_bar_color(line_num, direction), corridor[direction].to_numpy().reshape(len(dates), n_segments))
+        for direction in ["UP", "DOWN"]
+    }
+    fig = _playback_figure(corridor["Position"].to_numpy()[:n_segments], dates, series, f"Line {line_num} PHPDT", "Peak Hour Passengers")
+    station_order = PHPDT_LINE_STATIONS.get(line_num, [])
+    fig.update_layout(xaxis=dict(
+        type="linear",
+        tickmode="array",
+        tickvals=list(range(len(station_order))),
+        ticktext=[f"{get_station_name_from_code(code)} ({code})" for code in station_order],
+        tickangle=30,
+        range=[-0.5, len(station_order) - 0.5],
+    ))
+    return fig
+
+
+# figure kind -> (builder, data source it is derived from)
+FIGURE_BUILDERS = {
+    "hourly_ridership": (build_hourly_ridership_figure, "ridership_hourly"),
+    "station_ridership": (build_station_ridership_figure, "ridership_station"),
+    "hourly_parking": (build_hourly_parking_figure, "parking_hourly"),
+    "station_parking": (build_station_parking_figure, "parking_station"),
+    "phpdt": (build_phpdt_figure, "phpdt_daily"),
+    # playback kinds take the start date in place of the date, then the end date
+    "station_ridership_playback": (build_station_ridership_playback, "ridership_station"),
+    "hourly_ridership_playback": (build_hourly_ridership_playback, "ridership_hourly"),
+    "phpdt_playback": (build_phpdt_playback, "phpdt_daily"),
+}
+
+
+# figure cache : serialised figures in memory (LRU by size) and optionally as JSON files on disk
+FIGURE_CACHE_MAX_BYTES = int(os.environ.get("CMRL_FIGURE_CACHE_MB", 128)) * 1024 ** 2
+FIGURE_DISK_CACHE = os.environ.get("CMRL_FIGURE_DISK_CACHE", "0") == "1"
+FIGURE_CACHE_DIR = os.path.join(CACHE_DIR, "figures")
+
+_FIGURES = LRUCache(FIGURE_CACHE_MAX_BYTES)
+_NO_FIGURE = "null"  # cached marker for dates without data
+
+
+def _figure_disk_path(kind, date_str, args, fingerprint):
+    key = json.dumps([kind, date_str, list(args), fingerprint])
+    return os.path.join(FIGURE_CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+
+def _build_figure_json(kind, date_str, args):
+    builder, source = FIGURE_BUILDERS[kind]
+    disk_path = _figure_disk_path(kind, date_str, args, get_data_fingerprint(source)) if FIGURE_DISK_CACHE else None
+    if disk_path is not None and os.path.exists(disk_path):
+        with open(disk_path) as f:
+            return f.read()
+
+    fig = builder(date_str, *args)
+    fig_json = pio.to_json(fig, validate=False) if fig is not None else _NO_FIGURE
+    if disk_path is not None:
+        os.makedirs(FIGURE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(fig_json)
+        os.replace(tmp_path, disk_path)
+    return fig_json
+
+
+def get_figure(kind, date_str, *args):
+    """
+    Plotly figure (as a dict st.plotly_chart accepts) of a given kind for a date, None if there is no data.
+    Extra args are passed to the builder (line number, PHPDT display mode). Figures are cached per
+    (kind, date, args, data version), so revisiting a date skips data wrangling and figure building.
+    """
+    _, source = FIGURE_BUILDERS[kind]
+    key = (kind, date_str, args, get_data_version(source))
+    fig_json = _FIGURES.get_or_build(key, lambda: _build_figure_json(kind, date_str, args))
+    return json.loads(fig_json)
+
+
+def _figure_requests(date_str, display_mode):
+    # every figure the historical dashboard shows for one date
+    requests = [("hourly_ridership", date_str), ("hourly_parking", date_str)]
+    for line_num in LINE_NAMES:
+        requests += [
+            ("station_ridership", date_str, line_num),
+            ("station_parking", date_str, line_num),
+            ("phpdt", date_str, line_num, display_mode),
+        ]
+    return requests
+
+
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="figure-prefetch")
+_PREFETCHING = set()
+_PREFETCH_LOCK = threading.Lock()
+
+
+def _prefetch(request):
+    try:
+        get_figure(*request)
+    except Exception:  # a failed prefetch just means the figure gets built on demand
+        pass
+    finally:
+        with _PREFETCH_LOCK:
+            _PREFETCHING.discard(request)
+
+
+def prefetch_neighbouring_figures(date_str, display_mode="Bars + Lines", days=1):
+    """Build and cache the figures of the `days` dates before and after date_str in a background thread."""
+    date = pd.Timestamp(date_str)
+    for offset in range(1, days + 1):
+        for neighbour in [date + pd.Timedelta(days=offset), date - pd.Timedelta(days=offset)]:
+            for request in _figure_requests(neighbour.strftime("%Y-%m-%d"), display_mode):
+                with _PREFETCH_LOCK:
+                    if request in _PREFETCHING:
+                        continue
+                    _PREFETCHING.add(request)
+                _PREFETCH_POOL.submit(_prefetch, request)
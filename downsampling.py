@@ -0,0 +1,108 @@
+"""
+Server-side downsampling of long time series before they are sent to the browser.
+
+Both methods return the indices of the points to keep, so any column aligned with x / y
+(hover text, customdata) can be downsampled the same way.
+"""
+import numpy as np
+import pandas as pd
+
+# default chart width when the real one isn't known (a wide-layout streamlit chart)
+DEFAULT_CHART_WIDTH_PX = 1400
+# points per horizontal pixel, more than ~2 can't be told apart on screen
+POINTS_PER_PX = 2
+# never downsample below this many points per trace
+MIN_POINTS = 200
+
+
+def _as_float(values):
+    # datetimes become int64 nanoseconds so areas / extremes can be computed on them
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return values.astype(np.float64)
+
+
+def point_budget(width_px=DEFAULT_CHART_WIDTH_PX, points_per_px=POINTS_PER_PX, n_traces=1):
+    """Points a single trace may keep for a chart `width_px` wide shared by `n_traces` traces."""
+    return max(MIN_POINTS, int(width_px * points_per_px) // max(n_traces, 1))
+
+
+def minmax_indices(y, n_out):
+    """
+    Indices keeping the min and max of n_out // 2 equal-width buckets (plus first / last point).
+    Fully vectorized, preserves peaks exactly, a good fit for spiky hourly counts.
+    """
+    y = _as_float(y)
+    n = len(y)
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+
+    n_buckets = (n_out - 2) // 2
+    bucket = (np.arange(n - 2) * n_buckets) // (n - 2)
+    # sort by (bucket, y): the first row of a bucket is its min, the last row its max
+    order = np.lexsort((y[1:-1], bucket))
+    sorted_bucket = bucket[order]
+    firsts = np.flatnonzero(np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]])
+    lasts = np.r_[firsts[1:] - 1, len(order) - 1]
+    keep = np.concatenate([[0], order[firsts] + 1, order[lasts] + 1, [n - 1]])
+    return np.unique(keep)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: per bucket keep the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket. Preserves the visual shape of the series.
+    The bucket loop is sequential by nature, the work inside each bucket is vectorized.
+    """
+    x = _as_float(x)
+    y = _as_float(y)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    # means of every bucket up front, bucket i + 1 is the "next" bucket of bucket i
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    mean_x = np.append(sums_x / sizes, x[n - 1])
+    mean_y = np.append(sums_y / sizes, y[n - 1])
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        areas = np.abs((ax - mean_x[i + 1]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (mean_y[i + 1] - ay))
+        a = lo + int(np.argmax(areas))
+        keep[i + 1] = a
+    return keep
+
+
+DOWNSAMPLERS = {
+    "lttb": lambda x, y, n_out: lttb_indices(x, y, n_out),
+    "minmax": lambda x, y, n_out: minmax_indices(y, n_out),
+}
+
+
+def downsample(x, y, n_out=None, width_px=DEFAULT_CHART_WIDTH_PX, method="lttb"):
+    """
+    (x, y) reduced to at most n_out points (by default the point budget of a `width_px` wide chart).
+    Series already within budget are returned unchanged. NaN points are dropped first.
+    """
+    n_out = n_out or point_budget(width_px)
+    x_values = x.to_numpy() if isinstance(x, (pd.Series, pd.Index)) else np.asarray(x)
+    y_values = y.to_numpy() if isinstance(y, (pd.Series, pd.Index)) else np.asarray(y)
+    if len(y_values) <= n_out:
+        return x_values, y_values
+
+    valid = ~np.isnan(_as_float(y_values))
+    if not valid.all():
+        x_values, y_values = x_values[valid], y_values[valid]
+    # labels (e.g. station names) have no distance, fall back to their positions
+    numeric_x = x_values if x_values.dtype.kind in "iufM" else np.arange(len(x_values))
+    keep = DOWNSAMPLERS[method](numeric_x, y_values, n_out)
+    return x_values[keep], y_values[keep]
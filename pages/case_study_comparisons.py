@@ -0,0 +1,119 @@
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from case_studies import (
+    CASE_STUDY_EVENTS,
+    get_case_study_windows,
+    get_phpdt_case_study,
+    get_station_case_study,
+)
+from ridership_tracker_api import PAYMENT_METHOD_DISPLAY_NAMES, format_number
+
+
+def _per_day(value):
+    # NaN when a station has no day in a window, or the windows share no weekday
+    return "N/A" if pd.isna(value) else format_number(round(value))
+
+
+st.set_page_config(page_title="Case Study Comparisons", layout="wide")
+
+st.title("Case Study Comparisons")
+
+col1, col2, col3, col4 = st.columns([3, 1, 1, 2])
+with col1:
+    event = st.selectbox("Event", list(CASE_STUDY_EVENTS), format_func=lambda key: CASE_STUDY_EVENTS[key]["title"])
+with col2:
+    weeks = st.slider("Weeks", min_value=1, max_value=8, value=2)
+spec = CASE_STUDY_EVENTS[event]
+with col3:
+    # openings have no "after" distinct from "during"
+    phase = st.radio("Compare", ["during", "after"], horizontal=True) if spec["end"] != spec["start"] else "during"
+with col4:
+    metric = st.selectbox(
+        "Metric",
+        ["Total"] + list(PAYMENT_METHOD_DISPLAY_NAMES),
+        format_func=lambda col: "Total Passengers" if col == "Total" else PAYMENT_METHOD_DISPLAY_NAMES[col],
+    )
+
+(before_start, before_end), (after_start, after_end) = get_case_study_windows(event, weeks, phase)
+st.caption(
+    f"{spec['note']}  \nBefore : {before_start:%d %b %Y} – {before_end:%d %b %Y} · "
+    f"{'During' if phase == 'during' else 'After'} : {after_start:%d %b %Y} – {after_end:%d %b %Y}"
+)
+
+try:
+    stations = get_station_case_study(event, weeks, phase, metric)
+except KeyError:
+    st.warning(f"No {metric} data in the station ridership archive.")
+    st.stop()
+
+if stations.empty or stations["Before Days"].max() == 0 or stations["After Days"].max() == 0:
+    st.warning("Not enough station ridership data around this event yet.")
+    st.stop()
+
+# headline numbers for the stations the case study is about
+st.subheader("Focus stations")
+focus = stations[stations["Focus"]]
+for col, (_, row) in zip(st.columns(max(len(focus), 1)), focus.iterrows()):
+    with col:
+        st.metric(
+            f"{row['Station_Name']} ({row['Station']})",
+            _per_day(row["After (DOW matched)"]),
+            delta=None if pd.isna(row["DOW Delta %"])
+            else f"{row['DOW Delta %']:+.1f}% vs {_per_day(row['Before (DOW matched)'])} / day",
+        )
+
+st.markdown("---")
+st.subheader("Change per station")
+st.caption(
+    "Mean daily ridership over the days each station has data for, "
+    "each weekday weighted equally so both windows have the same day-of-week mix."
+)
+
+ordered = stations.sort_values("DOW Delta %")
+fig = go.Figure(
+    go.Bar(
+        x=ordered["DOW Delta %"],
+        y=[f"L{line:02d} · {name}" for line, name in zip(ordered["Line"], ordered["Station_Name"])],
+        orientation="h",
+        marker_color=["#e45756" if focus else ("#54a24b" if delta >= 0 else "#9e9e9e")
+                      for focus, delta in zip(ordered["Focus"], ordered["DOW Delta %"].fillna(0))],
+        customdata=ordered[["Before (DOW matched)", "After (DOW matched)"]].to_numpy(),
+        hovertemplate="<b>%{y}</b><br>%{x:+.1f}%<br>%{customdata[0]:,.0f} → %{customdata[1]:,.0f} / day<extra></extra>",
+    )
+)
+fig.update_layout(height=max(500, 20 * len(ordered)), margin=dict(t=20, b=40, l=220), xaxis_title="Change (%)")
+st.plotly_chart(fig, use_container_width=True)
+
+with st.expander("Station table"):
+    st.dataframe(stations.drop(columns=["Focus"]).round(1), use_container_width=True, hide_index=True)
+
+st.markdown("---")
+st.subheader("PHPDT change per segment")
+
+phpdt = get_phpdt_case_study(event, weeks, phase)
+if phpdt.empty:
+    st.warning("No PHPDT data around this event yet.")
+else:
+    for line_num, line_phpdt in phpdt.groupby("Line"):
+        fig = go.Figure()
+        for direction, color in [("UP", "#4c78a8"), ("DOWN", "#f58518")]:
+            rows = line_phpdt[line_phpdt["Direction"] == direction]
+            fig.add_trace(go.Bar(
+                x=rows["Position"],
+                y=rows["DOW Delta %"],
+                name=direction,
+                marker_color=color,
+                customdata=rows[["Segment", "Before (DOW matched)", "After (DOW matched)"]].to_numpy(),
+                hovertemplate="<b>%{customdata[0]}</b><br>%{y:+.1f}%<br>%{customdata[1]:,.0f} → %{customdata[2]:,.0f}<extra></extra>",
+            ))
+        fig.update_layout(
+            title=f"Line {line_num:02d}",
+            barmode="group",
+            yaxis_title="Change (%)",
+            xaxis=dict(showticklabels=False),
+            height=380,
+            margin=dict(t=50, b=20),
+        )
+        st.plotly_chart(fig, use_container_width=True)
@@ -1,45 +1,76 @@
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
 
+from dashboard_figures import (
+    PHPDT_DISPLAY_MODES,
+    PLAYBACK_FRAME_MS,
+    get_figure,
+    prefetch_neighbouring_figures,
+    set_playback_speed,
+)
 from ridership_tracker_api import (
-    DATA_SOURCES,
+    CACHE_TTL_SECONDS,
+    LOAD_ERRORS,
+    get_available_dates,
+    load_data_sources,
+    refresh_data_sources,
     get_aggregate_ridership_on_date,
-    get_hourly_ridership_on_date,
     get_station_ridership_on_date,
     get_aggregate_parking_on_date,
-    get_hourly_parking_on_date,
     get_station_parking_on_date,
     get_phpdt_ridership_on_date,
-    get_station_name_from_code,
     format_number,
     get_payment_methods_for_display,
     get_payment_method_color,
     get_parking_methods_for_display,
     get_parking_method_color,
-    get_phpdt_bar_color,
     PAYMENT_METHOD_DISPLAY_NAMES,
     PARKING_COLUMN_DISPLAY_NAMES,
-    PHPDT_LINE_STATIONS,
     COLOR_SCHEME,
 )
 
 
 st.set_page_config(page_title="CMRL Historical Dashboard", layout="wide")
 
-line_colors = px.colors.qualitative.Bold
 
-hourly_all = DATA_SOURCES["ridership_hourly"].copy()
-hourly_all["Date"] = pd.to_datetime(hourly_all["Date"], errors="coerce")
-hourly_all = hourly_all.dropna(subset=["Date"])
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def refresh_data():
+    # runs at most once per TTL for the whole app process, not once per session / rerun
+    return refresh_data_sources()
+
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, show_spinner="Loading data...")
+def load_data():
+    # fetches and parses every source in parallel, ones that failed are retried once the TTL expires
+    return load_data_sources()
+
+
+def source_unavailable(name, readable_date):
+    # a source that failed to load only blanks its own section
+    if name not in LOAD_ERRORS:
+        return False
+    st.warning(f"{name} could not be loaded ({LOAD_ERRORS[name]}), no data for {readable_date}.")
+    return True
 
-if hourly_all.empty:
+
+load_data()
+refresh_data()
+
+if LOAD_ERRORS:
+    st.warning(f"Some data could not be loaded : {', '.join(sorted(LOAD_ERRORS))}. The rest of the dashboard still works.")
+if "ridership_hourly" in LOAD_ERRORS:
     st.error("No data available.")
     st.stop()
 
-min_date = hourly_all["Date"].min().date()
-max_date = hourly_all["Date"].max().date()
+# sorted unique dates from the API's date index
+hourly_dates = get_available_dates("ridership_hourly")
+
+if hourly_dates.empty:
+    st.error("No data available.")
+    st.stop()
+
+min_date = hourly_dates[0].date()
+max_date = hourly_dates[-1].date()
 
 if "selected_date" not in st.session_state:
     st.session_state.selected_date = max_date
@@ -62,7 +93,7 @@ with col2:
 selected_date_str = st.session_state.selected_date.strftime("%Y-%m-%d") # for api calls
 readable_date = pd.to_datetime(selected_date_str).strftime("%A, %B %d, %Y") # for text displaying
 
-tab_ridership, tab_parking, tab_phpdt = st.tabs(["Ridership", "Parking", "PHPDT"])
+tab_ridership, tab_parking, tab_phpdt, tab_playback = st.tabs(["Ridership", "Parking", "PHPDT", "Playback"])
 
 # RIDERSHIP TAB
 with tab_ridership:
@@ -71,7 +102,7 @@ with tab_ridership:
     st.subheader(f"Daily Statistics")
     st.caption(f"{readable_date}")
     
-    agg_data = get_aggregate_ridership_on_date(selected_date_str)
+    agg_data = pd.DataFrame() if source_unavailable("ridership_daily", readable_date) else get_aggregate_ridership_on_date(selected_date_str)
     
     if not agg_data.empty:
         total_passengers = int(agg_data["Total"].values[0])
@@ -117,7 +148,7 @@ with tab_ridership:
 <p style='color: white; font-size: 0.95em; margin: 0 0 8px 0;'>{display_name}</p>
 <p style='color: {method_color}; font-size: 2em; font-weight: bold; margin: 0;'>{format_number(value)}</p>
 </div>""", unsafe_allow_html=True)
-    else:
+    elif "ridership_daily" not in LOAD_ERRORS:
         st.warning(f"No daily aggregate data for {readable_date}.")
 
 
@@ -126,85 +157,9 @@ with tab_ridership:
     st.subheader(f"Hourly Passenger Flow")
     st.caption(f"{readable_date}")
 
-    ridership_day = get_hourly_ridership_on_date(selected_date_str).copy()
-
-    if not ridership_day.empty:
-        ridership_day["Time_dt"] = pd.to_datetime(
-            ridership_day["Hour"], format="%H:%M", errors="coerce"
-        )
-        ridership_day = (
-            ridership_day.dropna(subset=["Time_dt"])
-            .sort_values("Time_dt")
-            .reset_index(drop=True)
-        )
-
-        payment_methods = [
-            col
-            for col in ridership_day.columns
-            if col not in ["Date", "Hour", "Time_dt", "Total"]
-        ]
-        
-        payment_methods_sorted = sorted(
-            payment_methods,
-            key=lambda x: ridership_day[x].sum(),
-            reverse=True
-        )
-
-        fig_hourly = go.Figure()
-
-        fig_hourly.add_trace(
-            go.Bar(
-                x=ridership_day["Time_dt"],
-                y=ridership_day["Total"],
-                name="Total Passengers",
-                marker_color="lightgray",
-                opacity=0.7,
-                hovertemplate="<b>Total Passengers</b>: %{y}<extra></extra>",
-            )
-        )
-
-        for idx, method in enumerate(payment_methods_sorted):
-            # Black outline
-            fig_hourly.add_trace(
-                go.Scatter(
-                    x=ridership_day["Time_dt"],
-                    y=ridership_day[method],
-                    mode="lines",
-                    name=method,
-                    line=dict(shape="spline", color="black", width=3.5),
-                    hoverinfo="skip",
-                    showlegend=False,
-                )
-            )
-            # Colored line on top
-            fig_hourly.add_trace(
-                go.Scatter(
-                    x=ridership_day["Time_dt"],
-                    y=ridership_day[method],
-                    mode="lines",
-                    name=method,
-                    line=dict(shape="spline", color=line_colors[idx % len(line_colors)], width=2.5),
-                    hovertemplate=f"<b>{method}</b>: %{{y}}<extra></extra>",
-                )
-            )
-
-        fig_hourly.update_layout(
-            # title_text="",
-            xaxis_title="Time of Day",
-            yaxis_title="Number of Passengers",
-            xaxis_tickformat="%H:%M",
-            hovermode="x unified",
-            legend=dict(
-                orientation="h",
-                yanchor="top",
-                y=-0.15,
-                xanchor="center",
-                x=0.5,
-            ),
-            height=600,
-            margin=dict(t=80, b=120),
-        )
+    fig_hourly = get_figure("hourly_ridership", selected_date_str)
 
+    if fig_hourly is not None:
         st.plotly_chart(fig_hourly, width="stretch")
     else:
         st.warning(f"No hourly ridership data for {readable_date}.")
@@ -215,102 +170,31 @@ with tab_ridership:
     st.subheader(f"Station-wise Passenger Flow")
     st.caption(f"{readable_date}")
 
-    station_day = get_station_ridership_on_date(selected_date_str).copy()
-
-    if not station_day.empty:
-        for line_num, line_name, bar_color in [(1, "Line 01 - Blue", "#1f77b4"), (2, "Line 02 - Green", "#2ca02c")]:
-            line_data = station_day[station_day["Line"] == line_num].copy()
-
-            if not line_data.empty:
-                line_data["Station_Name"] = line_data["Station"].apply(get_station_name_from_code)
-                line_data["Station_Display"] = line_data["Station_Name"] + " (" + line_data["Station"] + ")"
-                
-                payment_methods_station = [
-                    col
-                    for col in line_data.columns
-                    if col not in ["Date", "Line", "Station", "Station_Name", "Station_Display", "Total"]
-                ]
-                
-                # Sort payment methods by total ridership (descending)
-                payment_methods_station_sorted = sorted(
-                    payment_methods_station,
-                    key=lambda x: line_data[x].sum(),
-                    reverse=True
-                )
-
-                fig_station = go.Figure()
-
-                fig_station.add_trace(
-                    go.Bar(
-                        x=line_data["Station_Display"],
-                        y=line_data["Total"],
-                        name="Total Passengers",
-                        marker_color=bar_color,
-                        opacity=0.7,
-                        hovertemplate="Total: %{y}<extra></extra>",
-                    )
-                )
-
-                for idx, method in enumerate(payment_methods_station_sorted):
-                    # Black outline
-                    fig_station.add_trace(
-                        go.Scatter(
-                            x=line_data["Station_Display"],
-                            y=line_data[method],
-                            mode="lines",
-                            name=method,
-                            line=dict(shape="spline", color="black", width=3.5),
-                            hoverinfo="skip",
-                            showlegend=False,
-                        )
-                    )
-                    # Colored line on top
-                    fig_station.add_trace(
-                        go.Scatter(
-                            x=line_data["Station_Display"],
-                            y=line_data[method],
-                            mode="lines",
-                            name=method,
-                            line=dict(shape="spline", color=line_colors[idx % len(line_colors)], width=2.5),
-                            hovertemplate=method + ": %{y}<extra></extra>",
-                        )
-                    )
-
-                fig_station.update_layout(
-                    title_text=f"{line_name}",
-                    # xaxis_title="Station",
-                    yaxis_title="Number of Passengers",
-                    hovermode="x unified",
-                    xaxis=dict(tickangle=30),
-                    legend=dict(
-                        x=1.02,
-                        y=1,
-                        xanchor="left",
-                        yanchor="top",
-                    ),
-                    height=600,
-                    margin=dict(t=90, b=150, r=250),
-                )
-
+    if source_unavailable("ridership_station", readable_date):
+        pass
+    elif not get_station_ridership_on_date(selected_date_str).empty:
+        for line_num in [1, 2]:
+            fig_station = get_figure("station_ridership", selected_date_str, line_num)
+            if fig_station is not None:
                 st.plotly_chart(fig_station, width="stretch")
     else:
         st.warning(f"No station-wise ridership data for {readable_date}.")
 
+
     # PARKING TAB
     with tab_parking:
         # Daily Stats
         st.subheader(f"Daily Statistics")
         st.caption(f"{readable_date}")
         
-        parking_data = get_aggregate_parking_on_date(selected_date_str)
+        parking_data = pd.DataFrame() if source_unavailable("parking_daily", readable_date) else get_aggregate_parking_on_date(selected_date_str)
         
         if not parking_data.empty:
             total_vehicles = int(parking_data["Total Vehicles"].values[0])
             
-            # split by fuel type
-            # Note: threeWheeler is combined 3 & 4-wheelers, so 3-wheeler = threeWheeler - fourWheeler
+            # split by fuel type (threeWheeler is already 3-wheelers only, the API splits out the 4-wheelers)
             four_wheeler = int(parking_data["fourWheeler"].values[0])
-            three_wheeler = int(parking_data["threeWheeler"].values[0]) - four_wheeler
+            three_wheeler = int(parking_data["threeWheeler"].values[0])
             two_wheeler = int(parking_data["twoWheeler"].values[0])
             six_wheeler = int(parking_data["sixWheeler"].values[0])
             eight_wheeler = int(parking_data["eightWheeler"].values[0])
@@ -359,175 +243,30 @@ with tab_ridership:
 <p style='color: white; font-size: 0.95em; margin: 0 0 8px 0;'>{display_name}</p>
 <p style='color: {method_color}; font-size: 2em; font-weight: bold; margin: 0;'>{format_number(value)}</p>
 </div>""", unsafe_allow_html=True)
-        else:
+        elif "parking_daily" not in LOAD_ERRORS:
             st.warning(f"No daily parking data for {readable_date}.")
 
         st.markdown("---")
         st.subheader(f"Hourly Parking")
         st.caption(f"{readable_date}")
 
-        parking_hourly = get_hourly_parking_on_date(selected_date_str).copy()
-
-        if not parking_hourly.empty:
-            parking_hourly["Time_dt"] = pd.to_datetime(
-                parking_hourly["Hour"], format="%H:%M", errors="coerce"
-            )
-            parking_hourly = (
-                parking_hourly.dropna(subset=["Time_dt"])
-                .sort_values("Time_dt")
-                .reset_index(drop=True)
-            )
-
-            vehicle_types = [
-                col
-                for col in parking_hourly.columns
-                if col not in ["Date", "Hour", "Time_dt", "Total Vehicles", "General Parking"]
-            ]
-            
-            vehicle_types_sorted = sorted(
-                vehicle_types,
-                key=lambda x: parking_hourly[x].sum(),
-                reverse=True
-            )
-
-            fig_parking_hourly = go.Figure()
-
-            fig_parking_hourly.add_trace(
-                go.Bar(
-                    x=parking_hourly["Time_dt"],
-                    y=parking_hourly["Total Vehicles"],
-                    name="Total Vehicles",
-                    marker_color="lightgray",
-                    opacity=0.7,
-                    hovertemplate="<b>Total Vehicles</b>: %{y}<extra></extra>",
-                )
-            )
-
-            for idx, vehicle_type in enumerate(vehicle_types_sorted):
-                # Black outline
-                fig_parking_hourly.add_trace(
-                    go.Scatter(
-                        x=parking_hourly["Time_dt"],
-                        y=parking_hourly[vehicle_type],
-                        mode="lines",
-                        name=vehicle_type,
-                        line=dict(shape="spline", color="black", width=3.5),
-                        hoverinfo="skip",
-                        showlegend=False,
-                    )
-                )
-                # Colored line on top
-                fig_parking_hourly.add_trace(
-                    go.Scatter(
-                        x=parking_hourly["Time_dt"],
-                        y=parking_hourly[vehicle_type],
-                        mode="lines",
-                        name=vehicle_type,
-                        line=dict(shape="spline", color=line_colors[idx % len(line_colors)], width=2.5),
-                        hovertemplate=f"<b>{vehicle_type}</b>: %{{y}}<extra></extra>",
-                    )
-                )
-
-            fig_parking_hourly.update_layout(
-                xaxis_title="Time of Day",
-                yaxis_title="Number of Vehicles",
-                xaxis_tickformat="%H:%M",
-                hovermode="x unified",
-                legend=dict(
-                    orientation="h",
-                    yanchor="top",
-                    y=-0.15,
-                    xanchor="center",
-                    x=0.5,
-                ),
-                height=600,
-                margin=dict(t=80, b=120),
-            )
+        fig_parking_hourly = None if source_unavailable("parking_hourly", readable_date) else get_figure("hourly_parking", selected_date_str)
 
+        if fig_parking_hourly is not None:
             st.plotly_chart(fig_parking_hourly, use_container_width=True)
-        else:
+        elif "parking_hourly" not in LOAD_ERRORS:
             st.warning(f"No hourly parking data for {readable_date}.")
 
         st.markdown("---")
         st.subheader("Station-wise Parking")
         st.caption(f"{readable_date}")
 
-        station_parking = get_station_parking_on_date(selected_date_str).copy()
-
-        if not station_parking.empty:
-            for line_num, line_name, bar_color in [("01", "Line 01 - Blue", "#1f77b4"), ("02", "Line 02 - Green", "#2ca02c")]:
-                line_data = station_parking[station_parking["Line"].astype(str).str.zfill(2) == line_num].copy()
-
-                if not line_data.empty:
-                    line_data["Station_Name"] = line_data["Station"].apply(get_station_name_from_code)
-                    line_data["Station_Display"] = line_data["Station_Name"] + " (" + line_data["Station"] + ")"
-                    
-                    vehicle_types_station = [
-                        col
-                        for col in line_data.columns
-                        if col not in ["Date", "Line", "Station", "Station_Name", "Station_Display", "Total Vehicles", "General Parking", "Eight Wheleer"]
-                    ]
-                    
-                    # Sort vehicle types by total parking (descending)
-                    vehicle_types_station_sorted = sorted(
-                        vehicle_types_station,
-                        key=lambda x: line_data[x].sum(),
-                        reverse=True
-                    )
-
-                    fig_station_parking = go.Figure()
-
-                    fig_station_parking.add_trace(
-                        go.Bar(
-                            x=line_data["Station_Display"],
-                            y=line_data["Total Vehicles"],
-                            name="Total Vehicles",
-                            marker_color=bar_color,
-                            opacity=0.7,
-                            hovertemplate="Total: %{y}<extra></extra>",
-                        )
-                    )
-
-                    for idx, vehicle_type in enumerate(vehicle_types_station_sorted):
-                        # Black outline
-                        fig_station_parking.add_trace(
-                            go.Scatter(
-                                x=line_data["Station_Display"],
-                                y=line_data[vehicle_type],
-                                mode="lines",
-                                name=vehicle_type,
-                                line=dict(shape="spline", color="black", width=3.5),
-                                hoverinfo="skip",
-                                showlegend=False,
-                            )
-                        )
-                        # Colored line on top
-                        fig_station_parking.add_trace(
-                            go.Scatter(
-                                x=line_data["Station_Display"],
-                                y=line_data[vehicle_type],
-                                mode="lines",
-                                name=vehicle_type,
-                                line=dict(shape="spline", color=line_colors[idx % len(line_colors)], width=2.5),
-                                hovertemplate=vehicle_type + ": %{y}<extra></extra>",
-                            )
-                        )
-
-                    fig_station_parking.update_layout(
-                        title_text=f"{line_name}",
-                        yaxis_title="Number of Vehicles",
-                        hovermode="x unified",
-                        xaxis=dict(tickangle=30),
-                        legend=dict(
-                            x=1.02,
-                            y=1,
-                            xanchor="left",
-                            yanchor="top",
-                        ),
-                        height=600,
-                        margin=dict(t=90, b=150, r=250),
-                    )
-
+        if source_unavailable("parking_station", readable_date):
+            pass
+        elif not get_station_parking_on_date(selected_date_str).empty:
+            for line_num in [1, 2]:
+                fig_station_parking = get_figure("station_parking", selected_date_str, line_num)
+                if fig_station_parking is not None:
                     st.plotly_chart(fig_station_parking, use_container_width=True)
         else:
             st.warning(f"No station-wise parking data for {readable_date}.")
@@ -539,168 +278,63 @@ with tab_ridership:
 
         display_mode = st.radio(
             "Display",
-            ["Bars + Lines", "Bars only", "Lines only"],
+            PHPDT_DISPLAY_MODES,
             index=0,
             horizontal=True,
             help="Switch between bar view, line view, or both for PHPDT",
         )
 
-        show_bars = display_mode in ["Bars + Lines", "Bars only"]
-        show_lines = display_mode in ["Bars + Lines", "Lines only"]
-        line_showlegend = display_mode == "Lines only"
-
-        phpdt_day = get_phpdt_ridership_on_date(selected_date_str)
-
-        if phpdt_day.empty:
+        if source_unavailable("phpdt_daily", readable_date):
+            pass
+        elif get_phpdt_ridership_on_date(selected_date_str).empty:
             st.warning(f"No PHPDT data available for {readable_date}.")
         else:
-            # Process each line
             for line_num in [1, 2]:
-                line_phpdt = phpdt_day[phpdt_day["Line"] == line_num].copy()
-
-                if line_phpdt.empty:
-                    continue
-
-                # Separate UP and DOWN directions
-                up_data = line_phpdt[line_phpdt["Direction"] == "UP"].copy()
-                down_data = line_phpdt[line_phpdt["Direction"] == "DOWN"].copy()
-
-                # Get station order for this line
-                station_order = PHPDT_LINE_STATIONS.get(line_num, [])
-                station_names = [get_station_name_from_code(code) for code in station_order]
-                station_display = [f"{name} ({code})" for name, code in zip(station_names, station_order)]
-                line_start_name = station_names[0] if station_names else ""
-                line_end_name = station_names[-1] if station_names else ""
-                line_start_code = station_order[0] if station_order else ""
-                line_end_code = station_order[-1] if station_order else ""
-
-                # Build corridor data - SEPARATE labels for UP and DOWN
-                bar_positions = []  # x position for bars (between stations)
-                up_corridor_values = []
-                down_corridor_values = []
-                up_corridor_labels = []  # UP shows forward direction
-                down_corridor_labels = []  # DOWN shows reverse direction
-
-                for i in range(len(station_order) - 1):
-                    from_station = station_order[i]
-                    to_station = station_order[i + 1]
-
-                    # Bar position is between station i and i+1
-                    bar_pos = i + 0.5
-                    bar_positions.append(bar_pos)
-
-                    # UP corridor: from_station → to_station
-                    up_label = f"{station_names[i]} → {station_names[i + 1]}"
-                    up_row = up_data[(up_data["Start Station"] == from_station) & (up_data["End Station"] == to_station)]
-                    up_val = up_row["PHPDT"].values[0] if not up_row.empty else 0
-                    up_corridor_values.append(up_val)
-                    up_corridor_labels.append(up_label)
-
-                    # DOWN corridor: to_station → from_station (REVERSED!)
-                    down_label = f"{station_names[i + 1]} → {station_names[i]}"  # Reverse for DOWN
-                    down_row = down_data[(down_data["Start Station"] == to_station) & (down_data["End Station"] == from_station)]
-                    down_val = down_row["PHPDT"].values[0] if not down_row.empty else 0
-                    down_corridor_values.append(down_val)
-                    down_corridor_labels.append(down_label)
-
-                # Get peak hours
-                up_peak_hour = f"{up_data['Start Hour'].values[0]}-{up_data['End Hour'].values[0]}" if not up_data.empty else "N/A"
-                down_peak_hour = f"{down_data['Start Hour'].values[0]}-{down_data['End Hour'].values[0]}" if not down_data.empty else "N/A"
-
-                # Create Plotly figure
-                fig_phpdt = go.Figure()
-
-                # Add UP direction bars (positioned between stations)
-                up_legend_name = f"UP ({up_peak_hour}) ({line_start_code}-{line_end_code})"
-                down_legend_name = f"DOWN ({down_peak_hour}) ({line_end_code}-{line_start_code})"
-
-                if show_bars:
-                    fig_phpdt.add_trace(
-                        go.Bar(
-                            x=bar_positions,
-                            y=up_corridor_values,
-                            name=up_legend_name,
-                            marker_color=get_phpdt_bar_color(line_num, "UP"),
-                            hovertemplate="<b>%{customdata}</b><br>UP Passengers: %{y}<br>Peak: " + up_peak_hour + "<extra></extra>",
-                            customdata=up_corridor_labels,
-                            legendgroup="up",
-                            showlegend=True,
-                        )
-                    )
-
-                # Add DOWN direction bars (positioned between stations)
-                if show_bars:
-                    fig_phpdt.add_trace(
-                        go.Bar(
-                            x=bar_positions,
-                            y=down_corridor_values,
-                            name=down_legend_name,
-                            marker_color=get_phpdt_bar_color(line_num, "DOWN"),
-                            hovertemplate="<b>%{customdata}</b><br>DOWN Passengers: %{y}<br>Peak: " + down_peak_hour + "<extra></extra>",
-                            customdata=down_corridor_labels,
-                            legendgroup="down",
-                            showlegend=True,
-                        )
-                    )
-
-                # Smooth lines tracing the bars (no extra legend entries)
-                if show_lines:
-                    fig_phpdt.add_trace(
-                        go.Scatter(
-                            x=bar_positions,
-                            y=up_corridor_values,
-                            mode="lines",
-                            name=up_legend_name,
-                            line=dict(shape="spline", color=get_phpdt_bar_color(line_num, "UP"), width=2),
-                            hovertemplate="<b>%{customdata}</b><br>UP Passengers: %{y}<br>Peak: " + up_peak_hour + "<extra></extra>",
-                            customdata=up_corridor_labels,
-                            showlegend=line_showlegend,
-                            legendgroup="up",
-                        )
-                    )
-
-                if show_lines:
-                    fig_phpdt.add_trace(
-                        go.Scatter(
-                            x=bar_positions,
-                            y=down_corridor_values,
-                            mode="lines",
-                            name=down_legend_name,
-                            line=dict(shape="spline", color=get_phpdt_bar_color(line_num, "DOWN"), width=2),
-                            hovertemplate="<b>%{customdata}</b><br>DOWN Passengers: %{y}<br>Peak: " + down_peak_hour + "<extra></extra>",
-                            customdata=down_corridor_labels,
-                            showlegend=line_showlegend,
-                            legendgroup="down",
-                        )
-                    )
-
-                # Set x-axis to show station names at integer positions
-                station_positions = list(range(len(station_names)))
-                
-                fig_phpdt.update_layout(
-                    title_text=f"Line {line_num} - {'Blue' if line_num == 1 else 'Green'} Line between {line_start_name} and {line_end_name}",
-                    yaxis_title="Peak Hour Passengers",
-                    yaxis=dict(autorange=True, rangemode="tozero"),
-                    barmode="group",
-                    hovermode="x unified",
-                    xaxis=dict(
-                        type="linear",
-                        tickmode="array",
-                        tickvals=station_positions,
-                        ticktext=station_display,
-                        tickangle=30,
-                        zeroline=False,
-                        range=[-0.5, len(station_positions) - 0.5],
-                    ),
-                    legend=dict(
-                        orientation="h",
-                        x=0.5,
-                        xanchor="center",
-                        y=-0.3,
-                        yanchor="top",
-                    ),
-                    height=600,
-                    margin=dict(t=90, b=200, r=40, l=40),
-                )
-
-                st.plotly_chart(fig_phpdt, use_container_width=True)
+                fig_phpdt = get_figure("phpdt", selected_date_str, line_num, display_mode)
+                if fig_phpdt is not None:
+                    st.plotly_chart(fig_phpdt, use_container_width=True)
+
+# PLAYBACK TAB
+with tab_playback:
+    st.subheader("Historical Playback")
+    st.caption("Every frame of the range is built in one pass and played in the browser.")
+
+    PLAYBACK_MAX_DAYS = 180
+    PLAYBACK_VIEWS = {
+        "Station-wise ridership": ("station_ridership_playback", "ridership_station", True),
+        "Hourly ridership": ("hourly_ridership_playback", "ridership_hourly", False),
+        "PHPDT": ("phpdt_playback", "phpdt_daily", True),
+    }
+
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 2])
+    with col1:
+        playback_range = st.date_input(
+            "Range",
+            value=(max(min_date, st.session_state.selected_date - pd.Timedelta(days=29)), st.session_state.selected_date),
+            min_value=min_date,
+            max_value=max_date,
+        )
+    with col2:
+        playback_view = st.selectbox("View", list(PLAYBACK_VIEWS))
+    kind, source, per_line = PLAYBACK_VIEWS[playback_view]
+    with col3:
+        playback_line = st.radio("Line", [1, 2], horizontal=True, disabled=not per_line)
+    with col4:
+        frame_ms = st.slider("Milliseconds per day", min_value=100, max_value=1500, value=PLAYBACK_FRAME_MS, step=50)
+
+    if len(playback_range) != 2:
+        st.info("Select a start and end date.")
+    elif (playback_range[1] - playback_range[0]).days + 1 > PLAYBACK_MAX_DAYS:
+        st.warning(f"Pick a range of at most {PLAYBACK_MAX_DAYS} days.")
+    elif not source_unavailable(source, "the selected range"):
+        start_str, end_str = (date.strftime("%Y-%m-%d") for date in playback_range)
+        args = (end_str, playback_line) if per_line else (end_str,)
+        with st.spinner("Building frames..."):
+            fig_playback = get_figure(kind, start_str, *args)
+        if fig_playback is not None:
+            st.plotly_chart(set_playback_speed(fig_playback, frame_ms), use_container_width=True)
+        else:
+            st.warning("No data for the selected range.")
+
+# warm the cache for stepping to the previous / next day
+prefetch_neighbouring_figures(selected_date_str, display_mode)
@@ -0,0 +1,135 @@
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from downsampling import downsample
+from rider_segments import (
+    RIDER_SEGMENT_NAMES,
+    get_rider_segments,
+    get_station_segment_ranking,
+)
+from ridership_tracker_api import COLOR_SCHEME, format_number, get_available_dates
+
+
+st.set_page_config(page_title="Commuters vs Casual", layout="wide")
+
+SEGMENT_COLORS = {"Commuter": COLOR_SCHEME["singara"], "Casual": COLOR_SCHEME["qr"], "Other": "#808080"}
+ROLLING_DAYS = 7
+
+daily_dates = get_available_dates("ridership_daily")
+
+if daily_dates.empty:
+    st.error("No data available.")
+    st.stop()
+
+min_date = daily_dates[0].date()
+max_date = daily_dates[-1].date()
+
+st.title("Commuters vs Casual Riders")
+st.caption(
+    "Approximated through payment modes : Singara (NCMC), closed-loop cards and the Smart Value Pass count as commuters, "
+    "QR tickets as casual riders, tokens and other cards as other. Total QR and ONDC QR are aggregates and left out."
+)
+
+col1, col2 = st.columns([2, 3])
+with col1:
+    date_range = st.date_input(
+        "Date range",
+        value=(max(min_date, (pd.Timestamp(max_date) - pd.Timedelta(days=90)).date()), max_date),
+        min_value=min_date,
+        max_value=max_date,
+    )
+with col2:
+    segment = st.radio("Rank stations by", RIDER_SEGMENT_NAMES[:2], horizontal=True, format_func=lambda s: f"{s} share")
+
+if len(date_range) != 2:
+    st.info("Select a start and end date.")
+    st.stop()
+start, end = (pd.Timestamp(date) for date in date_range)
+
+daily = get_rider_segments("ridership_daily", start, end).set_index("Date")
+if daily.empty:
+    st.warning("No ridership data in the selected range.")
+    st.stop()
+
+riders = daily[RIDER_SEGMENT_NAMES].sum()
+cols = st.columns(len(RIDER_SEGMENT_NAMES))
+for col, name in zip(cols, RIDER_SEGMENT_NAMES):
+    with col:
+        st.metric(f"{name} / day", format_number(round(riders[name] / len(daily))), delta=f"{100 * riders[name] / riders.sum():.1f}% of riders", delta_color="off")
+
+# share of every segment over time
+fig = go.Figure()
+for name in RIDER_SEGMENT_NAMES:
+    share = daily[f"{name} %"].rolling(ROLLING_DAYS, min_periods=1).mean()
+    x, y = downsample(daily.index, share)
+    fig.add_trace(go.Scatter(
+        x=x, y=y, mode="lines", name=name, stackgroup="share", line=dict(width=0.5, color=SEGMENT_COLORS[name]),
+        hovertemplate=f"{name} : %{{y:.1f}}%<extra></extra>",
+    ))
+fig.update_layout(
+    title_text=f"Share of riders ({ROLLING_DAYS}-day average)",
+    yaxis=dict(title="Share (%)", range=[0, 100]),
+    hovermode="x unified",
+    legend=dict(orientation="h", yanchor="top", y=-0.15, xanchor="center", x=0.5),
+    height=450,
+    margin=dict(t=60, b=100),
+)
+st.plotly_chart(fig, use_container_width=True)
+
+# average hourly riders per segment, weekdays and weekends apart
+st.subheader("Hourly pattern")
+hourly = get_rider_segments("ridership_hourly", start, end)
+if hourly.empty:
+    st.warning("No hourly ridership data in the selected range.")
+else:
+    hourly = hourly.assign(Weekend=hourly["Date"].dt.dayofweek >= 5)
+    for col, (weekend, label) in zip(st.columns(2), [(False, "Weekdays"), (True, "Weekends")]):
+        rows = hourly[hourly["Weekend"] == weekend]
+        if rows.empty:
+            continue
+        means = rows.groupby("HourOfDay")[RIDER_SEGMENT_NAMES].mean()
+        fig_hourly = go.Figure()
+        for name in RIDER_SEGMENT_NAMES:
+            fig_hourly.add_trace(go.Scatter(
+                x=[f"{hour:02d}:00" for hour in means.index], y=means[name], mode="lines+markers", name=name,
+                line=dict(color=SEGMENT_COLORS[name], width=2.5),
+                hovertemplate=f"{name} : %{{y:,.0f}}<extra></extra>",
+            ))
+        fig_hourly.update_layout(
+            title_text=label, yaxis_title="Riders / hour", hovermode="x unified", height=400,
+            legend=dict(orientation="h", yanchor="top", y=-0.2, xanchor="center", x=0.5), margin=dict(t=50, b=80),
+        )
+        with col:
+            st.plotly_chart(fig_hourly, use_container_width=True)
+
+# stations ranked by segment share over the whole range
+st.subheader(f"Stations by {segment.lower()} share")
+ranking = get_station_segment_ranking(start, end, segment)
+if ranking.empty:
+    st.warning("No station ridership data in the selected range.")
+    st.stop()
+
+ordered = ranking.iloc[::-1]
+fig_rank = go.Figure()
+for name in RIDER_SEGMENT_NAMES:
+    fig_rank.add_trace(go.Bar(
+        x=ordered[f"{name} %"],
+        y=[f"{station_name} ({code})" for station_name, code in zip(ordered["Station_Name"], ordered["Station"])],
+        name=name,
+        orientation="h",
+        marker_color=SEGMENT_COLORS[name],
+        customdata=ordered[f"{name} / day"],
+        hovertemplate=f"<b>%{{y}}</b><br>{name} : %{{x:.1f}}% · %{{customdata:,.0f}} / day<extra></extra>",
+    ))
+fig_rank.update_layout(
+    barmode="stack",
+    xaxis=dict(title="Share (%)", range=[0, 100]),
+    height=max(500, 22 * len(ordered)),
+    margin=dict(t=20, b=40, l=240),
+    legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="center", x=0.5),
+)
+st.plotly_chart(fig_rank, use_container_width=True)
+
+with st.expander("Station table"):
+    st.dataframe(ranking.round(1), use_container_width=True, hide_index=True)
@@ -0,0 +1,116 @@
+import folium
+import pandas as pd
+import streamlit as st
+from folium.plugins import AntPath
+from streamlit_folium import st_folium
+
+from dashboard_figures import LINE_BAR_COLORS, LINE_NAMES
+from ridership_tracker_api import (
+    PHPDT_LINE_STATIONS,
+    STATION_COORDINATES,
+    format_number,
+    get_available_dates,
+    get_phpdt_bar_color,
+    get_phpdt_corridor,
+    get_phpdt_segment_paths,
+    get_station_name_from_code,
+)
+
+
+st.set_page_config(page_title="PHPDT Flow Map", layout="wide")
+
+MAP_CENTER = (13.06, 80.235)
+MIN_WEIGHT_PX = 2
+MAX_WEIGHT_PX = 14
+
+
+@st.cache_resource(show_spinner=False)
+def base_map():
+    # tiles, track lines and station markers never change, built once per app process
+    fmap = folium.Map(location=MAP_CENTER, zoom_start=12, tiles="cartodbpositron", control_scale=True)
+    for line_num, codes in PHPDT_LINE_STATIONS.items():
+        folium.PolyLine(
+            [STATION_COORDINATES[code] for code in codes if code in STATION_COORDINATES],
+            color=LINE_BAR_COLORS.get(line_num, "#808080"),
+            weight=3,
+            opacity=0.35,
+            tooltip=LINE_NAMES.get(line_num),
+        ).add_to(fmap)
+    for code, location in STATION_COORDINATES.items():
+        folium.CircleMarker(
+            location,
+            radius=4,
+            color="#333333",
+            fill=True,
+            fill_opacity=1,
+            tooltip=f"{get_station_name_from_code(code)} ({code})",
+        ).add_to(fmap)
+    return fmap
+
+
+def flow_layer(date_str):
+    # the only part rebuilt per date : one AntPath per segment and direction, weighted by that day's PHPDT
+    corridors = {line_num: get_phpdt_corridor(line_num, start=date_str, end=date_str) for line_num in PHPDT_LINE_STATIONS}
+    day_max = max([int(corridor[["UP", "DOWN"]].to_numpy().max()) for corridor in corridors.values() if not corridor.empty] or [0])
+    layer = folium.FeatureGroup(name="PHPDT")
+    if day_max == 0:
+        return layer, day_max
+
+    for line_num, corridor in corridors.items():
+        if corridor.empty:
+            continue
+        paths = get_phpdt_segment_paths(line_num)
+        flows = corridor.set_index("Position")
+        for direction in ["UP", "DOWN"]:
+            for position, label, path in zip(paths["Position"], paths[f"{direction} Label"], paths[f"{direction} Path"]):
+                value = int(flows.at[position, direction])
+                if value <= 0:
+                    continue
+                AntPath(
+                    path,
+                    weight=MIN_WEIGHT_PX + (MAX_WEIGHT_PX - MIN_WEIGHT_PX) * value / day_max,
+                    color=get_phpdt_bar_color(line_num, direction),
+                    pulse_color="#ffffff",
+                    delay=800,
+                    opacity=0.9,
+                    tooltip=f"{label} ({direction}) : {format_number(value)}",
+                ).add_to(layer)
+    return layer, day_max
+
+
+phpdt_dates = get_available_dates("phpdt_daily")
+
+if phpdt_dates.empty:
+    st.error("No data available.")
+    st.stop()
+
+st.title("PHPDT Flow Map")
+
+col1, _ = st.columns([1, 4])
+with col1:
+    selected = st.date_input(
+        "Date",
+        value=phpdt_dates[-1].date(),
+        min_value=phpdt_dates[0].date(),
+        max_value=phpdt_dates[-1].date(),
+    )
+date_str = pd.Timestamp(selected).strftime("%Y-%m-%d")
+
+layer, day_max = flow_layer(date_str)
+if day_max == 0:
+    st.warning(f"No PHPDT data for {pd.Timestamp(selected):%A, %B %d, %Y}.")
+
+st.caption(
+    f"Peak hour passengers per direction, path width scaled to the day's busiest segment ({format_number(day_max)}). "
+    "Ants move in the direction of travel. Station locations are approximate."
+)
+
+# the base map stays mounted in the browser, a date change only swaps the flow layer
+st_folium(
+    base_map(),
+    feature_group_to_add=layer,
+    key="phpdt_flow_map",
+    height=720,
+    use_container_width=True,
+    returned_objects=[],
+)
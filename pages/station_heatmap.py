@@ -0,0 +1,94 @@
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from ridership_tracker_api import (
+    PAYMENT_METHOD_DISPLAY_NAMES,
+    get_available_dates,
+    get_station_heatmap,
+    get_station_name_from_code,
+)
+
+
+st.set_page_config(page_title="Station Ridership Heatmap", layout="wide")
+
+# ranges longer than this (in days) are shown weekly / monthly unless the user picks a resolution
+AUTO_WEEKLY_DAYS = 120
+AUTO_MONTHLY_DAYS = 540
+
+station_dates = get_available_dates("ridership_station")
+
+if station_dates.empty:
+    st.error("No data available.")
+    st.stop()
+
+min_date = station_dates[0].date()
+max_date = station_dates[-1].date()
+
+st.title("Station-wise Ridership Heatmap")
+
+col1, col2, col3 = st.columns([2, 2, 2])
+with col1:
+    date_range = st.date_input(
+        "Date range",
+        value=(max(min_date, (pd.Timestamp(max_date) - pd.Timedelta(days=60)).date()), max_date),
+        min_value=min_date,
+        max_value=max_date,
+    )
+with col2:
+    metric_options = ["Total"] + list(PAYMENT_METHOD_DISPLAY_NAMES)
+    metric = st.selectbox(
+        "Metric",
+        metric_options,
+        format_func=lambda col: "Total Passengers" if col == "Total" else PAYMENT_METHOD_DISPLAY_NAMES[col],
+    )
+with col3:
+    resolution = st.radio("Resolution", ["Auto", "Daily", "Weekly", "Monthly"], horizontal=True)
+
+lines = st.multiselect("Lines", [1, 2], default=[1, 2], format_func=lambda x: f"Line {x:02d}")
+
+if len(date_range) != 2:
+    st.info("Select a start and end date.")
+    st.stop()
+
+start, end = date_range
+n_days = (end - start).days + 1
+if resolution == "Auto":
+    freq = "M" if n_days > AUTO_MONTHLY_DAYS else "W" if n_days > AUTO_WEEKLY_DAYS else "D"
+else:
+    freq = {"Daily": "D", "Weekly": "W", "Monthly": "M"}[resolution]
+
+try:
+    heatmap = get_station_heatmap(metric, start=start, end=end, freq=freq, lines=lines)
+except KeyError:
+    st.warning(f"No {metric} data in the station ridership archive.")
+    st.stop()
+
+# drop stations that have no ridership at all in the window (e.g. not yet open)
+heatmap = heatmap[heatmap.sum(axis=1) > 0]
+
+if heatmap.empty:
+    st.warning("No station-wise ridership data for the selected range.")
+    st.stop()
+
+y_labels = [f"L{line:02d} · {get_station_name_from_code(code)} ({code})" for line, code in heatmap.index]
+x_format = {"D": "%d %b %Y", "W": "Week of %d %b %Y", "M": "%b %Y"}[freq]
+
+fig = go.Figure(
+    go.Heatmap(
+        z=heatmap.to_numpy(),
+        x=heatmap.columns,
+        y=y_labels,
+        colorscale="YlOrRd",
+        colorbar=dict(title="Passengers" if freq == "D" else "Avg / day"),
+        hovertemplate="<b>%{y}</b><br>%{x|" + x_format + "}<br>%{z:,.0f}<extra></extra>",
+    )
+)
+fig.update_layout(
+    yaxis=dict(autorange="reversed"),
+    height=max(500, 22 * len(y_labels)),
+    margin=dict(t=40, b=60, l=260),
+)
+
+st.caption(f"{len(heatmap.columns)} {dict(D='days', W='weeks', M='months')[freq]} × {len(y_labels)} stations")
+st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,109 @@
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from downsampling import downsample
+from ridership_tracker_api import (
+    PARKING_COLUMN_DISPLAY_NAMES,
+    PAYMENT_METHOD_DISPLAY_NAMES,
+    STATION_CODE_TO_NAME,
+    format_number,
+    get_available_dates,
+    get_count_columns,
+    get_station_history,
+)
+
+
+st.set_page_config(page_title="Station History", layout="wide")
+
+ROLLING_DAYS = 7
+
+DATASETS = {
+    "Ridership": ("ridership_station", "Total", "Passengers", {"Total": "Total Passengers", **PAYMENT_METHOD_DISPLAY_NAMES}),
+    "Parking": ("parking_station", "Total Vehicles", "Vehicles", {"Total Vehicles": "Total Vehicles", **PARKING_COLUMN_DISPLAY_NAMES}),
+}
+
+st.title("Station History")
+
+col1, col2, col3 = st.columns([1, 2, 2])
+with col1:
+    dataset_label = st.radio("Data", list(DATASETS), horizontal=True)
+dataset, total_col, unit, display_names = DATASETS[dataset_label]
+
+dates = get_available_dates(dataset)
+if dates.empty:
+    st.error("No data available.")
+    st.stop()
+
+with col2:
+    codes = sorted(STATION_CODE_TO_NAME, key=STATION_CODE_TO_NAME.get)
+    code = st.selectbox("Station", codes, format_func=lambda c: f"{STATION_CODE_TO_NAME[c]} ({c})")
+with col3:
+    date_range = st.date_input(
+        "Date range",
+        value=(dates[0].date(), dates[-1].date()),
+        min_value=dates[0].date(),
+        max_value=dates[-1].date(),
+    )
+
+if len(date_range) != 2:
+    st.info("Select a start and end date.")
+    st.stop()
+
+history = get_station_history(code, start=date_range[0], end=date_range[1], dataset=dataset)
+if history.empty:
+    st.warning(f"No {dataset_label.lower()} data for {STATION_CODE_TO_NAME[code]} in the selected range.")
+    st.stop()
+
+# interchange stations have one row per line, the station's day is their sum
+value_cols = get_count_columns(history)
+daily = history.groupby("Date")[value_cols].sum()
+
+metrics = st.multiselect(
+    "Series",
+    value_cols,
+    default=[total_col] if total_col in value_cols else value_cols[:1],
+    format_func=lambda col: display_names.get(col, col),
+)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric(f"Average {unit.lower()} / day", format_number(round(daily[total_col].mean())) if total_col in daily else "N/A")
+with col2:
+    st.metric("Busiest day", f"{daily[total_col].idxmax():%d %b %Y}" if total_col in daily else "N/A")
+with col3:
+    st.metric("Days", format_number(len(daily)))
+
+fig = go.Figure()
+for metric in metrics:
+    name = display_names.get(metric, metric)
+    # years of daily points are reduced to what the chart can show, peaks kept
+    x, y = downsample(daily.index, daily[metric], method="minmax")
+    fig.add_trace(go.Scatter(x=x, y=y, mode="lines", name=name, opacity=0.45, line=dict(width=1)))
+    rolling = daily[metric].rolling(ROLLING_DAYS, min_periods=1).mean()
+    x, y = downsample(daily.index, rolling)
+    fig.add_trace(go.Scatter(
+        x=x, y=y, mode="lines", name=f"{name} ({ROLLING_DAYS}-day avg)", line=dict(width=2.5),
+        hovertemplate="%{x|%d %b %Y}<br>%{y:,.0f}<extra></extra>",
+    ))
+fig.update_layout(
+    title_text=f"{STATION_CODE_TO_NAME[code]} ({code})",
+    yaxis_title=f"{unit} / day",
+    hovermode="x unified",
+    legend=dict(orientation="h", yanchor="top", y=-0.15, xanchor="center", x=0.5),
+    height=600,
+    margin=dict(t=80, b=120),
+)
+st.plotly_chart(fig, use_container_width=True)
+
+# weekday profile of the same range
+by_weekday = daily[total_col].groupby(daily.index.dayofweek).mean() if total_col in daily else pd.Series(dtype=float)
+if not by_weekday.empty:
+    st.subheader("Average by day of week")
+    fig_weekday = go.Figure(go.Bar(
+        x=[["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"][day] for day in by_weekday.index],
+        y=by_weekday.to_numpy(),
+        hovertemplate="%{x}: %{y:,.0f}<extra></extra>",
+    ))
+    fig_weekday.update_layout(yaxis_title=f"{unit} / day", height=350, margin=dict(t=20, b=40))
+    st.plotly_chart(fig_weekday, use_container_width=True)
@@ -0,0 +1,138 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from weather import WEATHER_PATH, get_weather_features
+
+
+st.set_page_config(page_title="Weather vs Ridership", layout="wide")
+
+# IMD daily rainfall categories (mm)
+RAIN_BINS = [-np.inf, 0.05, 2.5, 15.6, 64.5, np.inf]
+RAIN_LABELS = ["Dry", "Very light", "Light", "Moderate", "Heavy"]
+TEMPERATURE_STEP_C = 2
+STRUCTURE_COLORS = {"underground": "#1f77b4", "elevated": "#ff7f0e"}
+
+st.title("Weather vs Ridership")
+
+if not os.path.exists(WEATHER_PATH):
+    st.error(f"No weather file at {WEATHER_PATH}. Set CMRL_WEATHER_PATH to a CSV / Parquet of hourly observations.")
+    st.stop()
+if os.path.basename(WEATHER_PATH) == "chennai_weather_sample.csv":
+    st.warning("Showing the bundled synthetic weather sample. Set CMRL_WEATHER_PATH to real observations for actual results.")
+
+stations = get_weather_features("ridership_station")
+stations = stations[stations["Relative Total"].notna() & stations["Max Temperature"].notna()]
+if stations.empty:
+    st.error("The weather file doesn't cover any date with station ridership.")
+    st.stop()
+
+min_date = stations["Date"].min().date()
+max_date = stations["Date"].max().date()
+
+col1, col2 = st.columns([2, 3])
+with col1:
+    date_range = st.date_input("Date range", value=(min_date, max_date), min_value=min_date, max_value=max_date)
+with col2:
+    split = st.radio("Split stations by", ["Structure", "Multimodal"], horizontal=True,
+                     format_func=lambda key: "Underground vs elevated" if key == "Structure" else "Multimodal vs not")
+
+if len(date_range) != 2:
+    st.info("Select a start and end date.")
+    st.stop()
+start, end = (pd.Timestamp(date) for date in date_range)
+stations = stations[(stations["Date"] >= start) & (stations["Date"] <= end)]
+
+st.caption(
+    "Relative ridership is a station's riders over its usual riders on the same weekday, "
+    "so 1.0 is a typical day and seasons / station sizes compare directly."
+)
+
+
+def relative(frame, keys):
+    # riders over usual riders of every group, weighted by station size
+    grouped = frame.groupby(keys, observed=True)
+    return (grouped["Total"].sum() / grouped["Expected Total"].sum()).rename("Relative"), grouped["Date"].nunique().rename("Days")
+
+
+def group_label(value):
+    if split == "Structure":
+        return str(value).capitalize()
+    return "Multimodal" if value else "Not multimodal"
+
+
+def group_color(value):
+    if split == "Structure":
+        return STRUCTURE_COLORS.get(value, "#808080")
+    return "#54a24b" if value else "#9e9e9e"
+
+
+# rainfall
+st.subheader("Rainfall")
+stations = stations.assign(
+    **{"Rain Category": pd.cut(stations["Rainfall"], RAIN_BINS, labels=RAIN_LABELS)},
+    **{"Temperature Bin": (stations["Max Temperature"] // TEMPERATURE_STEP_C * TEMPERATURE_STEP_C).astype(int)},
+)
+rain, rain_days = relative(stations, [split, "Rain Category"])
+fig_rain = go.Figure()
+for value in stations[split].dropna().unique():
+    rows = rain.loc[value].reindex(RAIN_LABELS)
+    days = rain_days.loc[value].reindex(RAIN_LABELS).fillna(0).astype(int)
+    fig_rain.add_trace(go.Bar(
+        x=RAIN_LABELS, y=rows.to_numpy(), name=group_label(value), marker_color=group_color(value),
+        customdata=days.to_numpy(), hovertemplate="%{x} : %{y:.3f}<br>%{customdata} days<extra></extra>",
+    ))
+fig_rain.add_hline(y=1, line_dash="dot", line_color="#666666")
+fig_rain.update_layout(barmode="group", xaxis_title="Rainfall over service hours", yaxis_title="Relative ridership", height=420, margin=dict(t=20, b=40))
+st.plotly_chart(fig_rain, use_container_width=True)
+
+# heat
+st.subheader("Heat")
+heat, heat_days = relative(stations, [split, "Temperature Bin"])
+fig_heat = go.Figure()
+for value in stations[split].dropna().unique():
+    rows = heat.loc[value]
+    fig_heat.add_trace(go.Scatter(
+        x=rows.index, y=rows.to_numpy(), mode="lines+markers", name=group_label(value), line=dict(color=group_color(value), width=2.5),
+        customdata=heat_days.loc[value].to_numpy(),
+        hovertemplate=f"%{{x}}-%{{x}}+{TEMPERATURE_STEP_C} °C : %{{y:.3f}}<br>%{{customdata}} days<extra></extra>",
+    ))
+fig_heat.add_hline(y=1, line_dash="dot", line_color="#666666")
+fig_heat.update_layout(xaxis_title="Daily max temperature (°C)", yaxis_title="Relative ridership", height=420, margin=dict(t=20, b=40))
+st.plotly_chart(fig_heat, use_container_width=True)
+
+# correlations of relative ridership with every weather feature, per group
+st.subheader("Correlation with relative ridership")
+weather_columns = [col for col in ["Max Temperature", "Mean Temperature", "Rainfall", "Rain Hours", "Mean Humidity"] if col in stations.columns]
+correlations = pd.DataFrame({
+    group_label(value): rows[weather_columns].astype(float).corrwith(rows["Relative Total"])
+    for value, rows in stations.groupby(split, observed=True)
+}).T
+st.dataframe(correlations.round(3), use_container_width=True)
+
+# rain within the hour, against the usual ridership of that hour
+st.subheader("Rain by hour of day")
+hourly = get_weather_features("ridership_hourly")
+hourly = hourly[(hourly["Date"] >= start) & (hourly["Date"] <= end) & hourly["Rainfall"].notna() & hourly["Relative Total"].notna()]
+if hourly.empty:
+    st.info("No hourly ridership with weather in the selected range.")
+else:
+    hourly = hourly.assign(Raining=hourly["Rainfall"] > 0)
+    fig_hourly = go.Figure()
+    for raining, label, color in [(False, "Dry hours", "#9e9e9e"), (True, "Raining", "#4c78a8")]:
+        rows = hourly[hourly["Raining"] == raining]
+        if rows.empty:
+            continue
+        grouped = rows.groupby("HourOfDay")
+        values = grouped["Total"].sum() / grouped["Expected Total"].sum()
+        fig_hourly.add_trace(go.Scatter(
+            x=[f"{hour:02d}:00" for hour in values.index], y=values.to_numpy(), mode="lines+markers", name=label,
+            line=dict(color=color, width=2.5), customdata=grouped.size().to_numpy(),
+            hovertemplate="%{x} : %{y:.3f}<br>%{customdata} hours<extra></extra>",
+        ))
+    fig_hourly.add_hline(y=1, line_dash="dot", line_color="#666666")
+    fig_hourly.update_layout(xaxis_title="Hour", yaxis_title="Relative ridership", height=420, margin=dict(t=20, b=40))
+    st.plotly_chart(fig_hourly, use_container_width=True)
@@ -0,0 +1,130 @@
+import plotly.graph_objects as go
+import streamlit as st
+
+from ridership_tracker_api import (
+    PARKING_COLUMN_DISPLAY_NAMES,
+    PAYMENT_METHOD_DISPLAY_NAMES,
+    PROFILE_EXCLUDED_DATES,
+    format_number,
+    get_available_dates,
+    get_hourly_profile,
+)
+
+
+st.set_page_config(page_title="Weekday vs Weekend", layout="wide")
+
+DATASETS = {
+    "Ridership": ("ridership_hourly", "Total", "Passengers", {"Total": "Total Passengers", **PAYMENT_METHOD_DISPLAY_NAMES}),
+    "Parking": ("parking_hourly", "Total Vehicles", "Vehicles", {"Total Vehicles": "Total Vehicles", **PARKING_COLUMN_DISPLAY_NAMES}),
+}
+GROUP_COLORS = {
+    "Weekday": "#1f77b4", "Weekend": "#ff7f0e",
+    "Monday": "#08306b", "Tuesday": "#2171b5", "Wednesday": "#4292c6", "Thursday": "#6baed6", "Friday": "#9ecae1",
+    "Saturday": "#fd8d3c", "Sunday": "#d94801",
+}
+
+st.title("Weekday vs Weekend Patterns")
+
+col1, col2, col3 = st.columns([1, 2, 2])
+with col1:
+    dataset_label = st.radio("Data", list(DATASETS), horizontal=True)
+dataset, total_col, unit, display_names = DATASETS[dataset_label]
+
+if get_available_dates(dataset).empty:
+    st.error("No data available.")
+    st.stop()
+
+with col2:
+    by = st.radio("Compare", ["daytype", "dow"], horizontal=True,
+                  format_func=lambda key: "Weekday vs Weekend" if key == "daytype" else "Day of week")
+with col3:
+    excluded = st.multiselect(
+        "Excluded special days",
+        list(PROFILE_EXCLUDED_DATES),
+        default=list(PROFILE_EXCLUDED_DATES),
+        format_func=lambda date: f"{date} · {PROFILE_EXCLUDED_DATES[date]}",
+    )
+
+profile = get_hourly_profile(dataset, by=by, exclude_dates=excluded)
+columns = list(dict.fromkeys(profile["Column"]))
+metric = st.selectbox(
+    "Metric",
+    columns,
+    index=columns.index(total_col) if total_col in columns else 0,
+    format_func=lambda col: display_names.get(col, col),
+)
+show_band = st.checkbox("Show ±1 standard deviation", value=by == "daytype")
+
+curves = profile[profile["Column"] == metric]
+if curves.empty:
+    st.warning("No hourly data left after the exclusions.")
+    st.stop()
+
+# average daily totals per group
+cols = st.columns(len(curves["Group"].unique()))
+for col, (group, rows) in zip(cols, curves.groupby("Group", sort=False)):
+    with col:
+        st.metric(f"{group} / day", format_number(round(rows["Mean"].sum())), help=f"{rows['Days'].max()} days")
+
+fig = go.Figure()
+for group, rows in curves.groupby("Group", sort=False):
+    color = GROUP_COLORS.get(group, "#808080")
+    hours = [f"{hour:02d}:00" for hour in rows["HourOfDay"]]
+    if show_band:
+        upper = rows["Mean"] + rows["Std"].fillna(0)
+        lower = (rows["Mean"] - rows["Std"].fillna(0)).clip(lower=0)
+        fig.add_trace(go.Scatter(
+            x=hours + hours[::-1],
+            y=list(upper) + list(lower)[::-1],
+            fill="toself",
+            fillcolor=color,
+            opacity=0.15,
+            line=dict(width=0),
+            hoverinfo="skip",
+            showlegend=False,
+        ))
+    fig.add_trace(go.Scatter(
+        x=hours,
+        y=rows["Mean"],
+        mode="lines+markers",
+        name=group,
+        line=dict(color=color, width=2.5),
+        customdata=rows[["Std", "Days"]].to_numpy(),
+        hovertemplate=f"<b>{group}</b> %{{x}}<br>%{{y:,.0f}} ± %{{customdata[0]:,.0f}}<br>%{{customdata[1]}} days<extra></extra>",
+    ))
+fig.update_layout(
+    title_text=f"Average hourly {display_names.get(metric, metric)}",
+    xaxis_title="Hour",
+    yaxis_title=f"{unit} / hour",
+    hovermode="x",
+    legend=dict(orientation="h", yanchor="top", y=-0.15, xanchor="center", x=0.5),
+    height=600,
+    margin=dict(t=80, b=120),
+)
+st.plotly_chart(fig, use_container_width=True)
+
+# how each payment mode / vehicle type splits between the groups, per average day
+st.subheader("Share of the day by group")
+daily = profile.groupby(["Group", "Column"], sort=False)["Mean"].sum().unstack("Column")
+daily = daily.reindex(list(dict.fromkeys(profile["Group"])))  # unstack sorts groups alphabetically
+# totals and the QR / ONDC QR aggregates would count their own parts twice
+shares = daily.drop(columns=[total_col, "noOfTotal_QR", "noOfONDCQR"], errors="ignore")
+shares = shares.loc[:, shares.sum() > 0]
+shares = 100 * shares.div(shares.sum(axis=1), axis=0)
+fig_share = go.Figure()
+for col in shares.columns:
+    fig_share.add_trace(go.Bar(
+        y=shares.index,
+        x=shares[col],
+        name=display_names.get(col, col),
+        orientation="h",
+        hovertemplate=f"{display_names.get(col, col)} : %{{x:.1f}}%<extra></extra>",
+    ))
+fig_share.update_layout(
+    barmode="stack",
+    xaxis_title="Share (%)",
+    height=150 + 40 * len(shares),
+    margin=dict(t=20, b=40),
+    legend=dict(orientation="h", yanchor="top", y=-0.3, xanchor="center", x=0.5),
+)
+st.plotly_chart(fig_share, use_container_width=True)
@@ -0,0 +1,143 @@
+"""
+Commuter vs casual rider segmentation, approximated through payment modes.
+
+Stored value cards and passes (Singara / NCMC, closed-loop cards, the Smart Value Pass) are bought by
+regular riders, single-journey QR tickets by occasional ones. Every payment mode column is mapped to one segment through a
+(columns x segments) 0/1 matrix, so a whole dataset is segmented with one matrix product.
+Segmented frames are cached per data version, period sums come from the incremental rollup cubes.
+"""
+import numpy as np
+import pandas as pd
+
+from ridership_tracker_api import (
+    ROLLUP_KEYS,
+    cached_derived,
+    get_count_columns,
+    get_dataset,
+    get_payment_method_class,
+    get_rollup,
+    get_station_name_from_code,
+)
+
+# get_payment_method_class -> segment, anything else (tokens, tourist / trip / group cards) is "Other"
+RIDER_SEGMENTS = {
+    "singara": "Commuter",
+    "closed_loop": "Commuter",
+    "qr": "Casual",
+}
+# columns whose payment method class doesn't tell their segment : the Smart Value Pass is classed (and
+# coloured) with the QR modes but is a stored value pass bought by regular riders
+RIDER_SEGMENT_OVERRIDES = {
+    "noOfSVP": "Commuter",
+}
+RIDER_SEGMENT_NAMES = ["Commuter", "Casual", "Other"]
+
+# totals of other columns, counting them would count their riders twice
+SEGMENT_AGGREGATE_COLUMNS = ["Total", "noOfTotal_QR", "noOfONDCQR"]
+
+# keys a segmented row keeps per ridership dataset
+SEGMENT_KEYS = {
+    "ridership_daily": ["Date"],
+    "ridership_hourly": ["Date", "Hour", "HourOfDay"],
+    "ridership_station": ["Date", "Line", "Station"],
+}
+
+
+def get_segment_columns(columns):
+    """Payment mode columns among `columns` that belong to exactly one segment (aggregates left out)."""
+    return [col for col in columns if col not in SEGMENT_AGGREGATE_COLUMNS]
+
+
+def get_column_segment(col):
+    """Rider segment of one payment mode column."""
+    if col in RIDER_SEGMENT_OVERRIDES:
+        return RIDER_SEGMENT_OVERRIDES[col]
+    return RIDER_SEGMENTS.get(get_payment_method_class(col), "Other")
+
+
+def get_segment_matrix(columns):
+    """(payment mode columns x RIDER_SEGMENT_NAMES) 0/1 matrix, one 1 per row."""
+    columns = get_segment_columns(columns)
+    segments = [get_column_segment(col) for col in columns]
+    matrix = (np.array(segments)[:, None] == np.array(RIDER_SEGMENT_NAMES)[None, :]).astype(np.float64)
+    return pd.DataFrame(matrix, index=columns, columns=RIDER_SEGMENT_NAMES)
+
+
+def segment_frame(frame, keys):
+    """
+    `keys` of a ridership frame plus its riders per segment and each segment's share (%) of them.
+    Missing counts are treated as 0.
+    """
+    matrix = get_segment_matrix(get_count_columns(frame))
+    counts = frame[list(matrix.index)].to_numpy(dtype=np.float64)
+    segmented = np.nan_to_num(counts) @ matrix.to_numpy()
+    total = segmented.sum(axis=1)
+
+    result = frame[keys].reset_index(drop=True)
+    for i, segment in enumerate(RIDER_SEGMENT_NAMES):
+        result[segment] = segmented[:, i].round().astype(np.int64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for i, segment in enumerate(RIDER_SEGMENT_NAMES):
+            result[f"{segment} %"] = np.where(total > 0, 100 * segmented[:, i] / total, np.nan)
+    return result
+
+
+def get_rider_segments(name="ridership_station", start=None, end=None):
+    """
+    Commuter / Casual / Other riders and shares for every row of ridership_daily, ridership_hourly
+    (per date and hour) or ridership_station (per date and station) between start and end (inclusive).
+    The whole archive is segmented once per data version, ranges are positional slices of it.
+    """
+    if name not in SEGMENT_KEYS:
+        raise ValueError(f"No rider segments for {name!r}, expected one of {list(SEGMENT_KEYS)}")
+    segmented = cached_derived(name, "rider_segments", None, lambda: segment_frame(get_dataset(name), SEGMENT_KEYS[name]))
+
+    dates = segmented["Date"].to_numpy()
+    lo = 0 if start is None else np.searchsorted(dates, pd.Timestamp(start).to_datetime64(), side="left")
+    hi = len(dates) if end is None else np.searchsorted(dates, pd.Timestamp(end).to_datetime64(), side="right")
+    return segmented.iloc[lo:hi]
+
+
+def get_segment_rollup(name, period, start=None, end=None):
+    """
+    Segment sums per period ("week", "month" or "dow") and ROLLUP_KEYS of a ridership dataset, segmented
+    from the incrementally maintained rollup cube, with "Days" to turn sums into daily means.
+    """
+    if name not in SEGMENT_KEYS:
+        raise ValueError(f"No rider segments for {name!r}, expected one of {list(SEGMENT_KEYS)}")
+    keys = [period] + ROLLUP_KEYS[name] + ["Days"]
+    return cached_derived(
+        name, "segment_rollup", (period, start, end),
+        lambda: segment_frame(get_rollup(name, period, start=start, end=end), keys),
+    )
+
+
+def get_station_segment_ranking(start=None, end=None, segment="Commuter", min_riders=1000):
+    """
+    Stations ranked by their `segment` share (%) of all riders between start and end, with the mean
+    daily riders per segment. Interchange stations are summed over their lines, stations with fewer
+    than `min_riders` riders in the range are left out.
+    """
+    if segment not in RIDER_SEGMENT_NAMES:
+        raise ValueError(f"Unknown segment {segment!r}, expected one of {RIDER_SEGMENT_NAMES}")
+
+    def build():
+        rows = get_rider_segments("ridership_station", start, end)
+        grouped = rows.groupby(rows["Station"].astype(str), observed=True)
+        sums = grouped[RIDER_SEGMENT_NAMES].sum()
+        days = grouped["Date"].nunique()
+        total = sums.sum(axis=1)
+        sums = sums[total >= min_riders]
+        total = total[total >= min_riders]
+
+        ranking = pd.DataFrame({"Station": sums.index, "Station_Name": sums.index.map(get_station_name_from_code)})
+        for col in RIDER_SEGMENT_NAMES:
+            ranking[f"{col} / day"] = (sums[col] / days[sums.index]).to_numpy()
+        for col in RIDER_SEGMENT_NAMES:
+            ranking[f"{col} %"] = (100 * sums[col] / total).to_numpy()
+        ranking["Days"] = days[sums.index].to_numpy()
+        ranking = ranking.sort_values(f"{segment} %", ascending=False, ignore_index=True)
+        ranking.insert(0, "Rank", np.arange(1, len(ranking) + 1))
+        return ranking
+
+    return cached_derived("ridership_station", "segment_ranking", (start, end, segment, min_riders), build)
@@ -1,7 +1,39 @@
+import base64
+import concurrent.futures
+import hashlib
+import http.client
+import io
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
+try:
+    from pyarrow import dataset as pa_dataset
+    from pyarrow import feather
+except ImportError:  # snapshots are optional, CSVs are parsed on every start without pyarrow
+    pa_dataset = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
 # raw data source from repo/main to keep up w daily updates
-BASE_URL = "https://raw.githubusercontent.com/PratyushBalaji/chennai-metro-ridership-tracker/refs/heads/main/"
+BASE_URL = os.environ.get(
+    "CMRL_BASE_URL",
+    "https://raw.githubusercontent.com/PratyushBalaji/chennai-metro-ridership-tracker/refs/heads/main/",
+)
 
 # relative paths to raw url
 RIDERSHIP_DAILY_REL_PATH = "Ridership/ChennaiMetro_Daily_Ridership.csv"
@@ -14,46 +46,1445 @@ PARKING_STATION_REL_PATH = "Parking/ChennaiMetro_Station_Parking.csv"
 
 PHPDT_DAILY_REL_PATH = "PHPDT/ChennaiMetro_Daily_PHPDT.csv"
 
-# data source dict (map category to loaded data)
-DATA_SOURCES = {
-    "ridership_daily": pd.read_csv(BASE_URL + RIDERSHIP_DAILY_REL_PATH),
-    "ridership_hourly": pd.read_csv(BASE_URL + RIDERSHIP_HOURLY_REL_PATH),
-    "ridership_station": pd.read_csv(BASE_URL + RIDERSHIP_STATION_REL_PATH),
-    "parking_daily": pd.read_csv(BASE_URL + PARKING_DAILY_REL_PATH),
-    "parking_hourly": pd.read_csv(BASE_URL + PARKING_HOURLY_REL_PATH),
-    "parking_station": pd.read_csv(BASE_URL + PARKING_STATION_REL_PATH),
-    "phpdt_daily": pd.read_csv(BASE_URL + PHPDT_DAILY_REL_PATH),
+# data source registry (map category to relative path)
+DATA_SOURCE_REL_PATHS = {
+    "ridership_daily": RIDERSHIP_DAILY_REL_PATH,
+    "ridership_hourly": RIDERSHIP_HOURLY_REL_PATH,
+    "ridership_station": RIDERSHIP_STATION_REL_PATH,
+    "parking_daily": PARKING_DAILY_REL_PATH,
+    "parking_hourly": PARKING_HOURLY_REL_PATH,
+    "parking_station": PARKING_STATION_REL_PATH,
+    "phpdt_daily": PHPDT_DAILY_REL_PATH,
+}
+
+# local on-disk cache of the tracker CSVs (env vars override the defaults)
+CACHE_DIR = os.environ.get("CMRL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "cmrl-ridership"))
+CACHE_TTL_SECONDS = int(os.environ.get("CMRL_CACHE_TTL_SECONDS", 15 * 60))  # how long a copy is trusted before revalidating
+OFFLINE_MODE = os.environ.get("CMRL_OFFLINE", "0") == "1"  # never hit the network, serve last good copy
+HTTP_TIMEOUT_SECONDS = 30  # per socket operation
+HTTP_RETRIES = 3  # extra attempts after connection errors, 429 and 5xx responses
+HTTP_BACKOFF_SECONDS = 0.5  # doubled after every failed attempt
+TAIL_OVERLAP_BYTES = 256  # bytes re-read before the cached end when fetching / parsing only the new tail
+
+# one lock per source so concurrent sessions don't download the same CSV twice
+_LOAD_LOCKS = {name: threading.Lock() for name in DATA_SOURCE_REL_PATHS}
+_PARSE_STATE = {}
+# bumped on every full (re)load; appends keep the generation so derived data can update incrementally
+_GENERATIONS = {}
+_GENERATION_COUNTER = itertools.count(1)
+
+
+def _cache_paths(rel_path):
+    csv_path = os.path.join(CACHE_DIR, *rel_path.split("/"))
+    return csv_path, csv_path + ".meta.json"
+
+
+def _read_cache_meta(rel_path):
+    csv_path, meta_path = _cache_paths(rel_path)
+    if not (os.path.exists(csv_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, data, mode="wb"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_cache_meta(rel_path, meta):
+    _write_atomic(_cache_paths(rel_path)[1], json.dumps(meta), mode="w")
+
+
+# one keep-alive connection per thread and host, so repeated fetches skip the TCP / TLS handshake
+_HTTP_LOCAL = threading.local()
+
+
+def _http_connection(scheme, netloc):
+    connections = _HTTP_LOCAL.__dict__.setdefault("connections", {})
+    conn = connections.get((scheme, netloc))
+    if conn is None:
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = connections[(scheme, netloc)] = connection_class(netloc, timeout=HTTP_TIMEOUT_SECONDS)
+    return conn
+
+
+def _urllib_get(url, headers):
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT_SECONDS) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, b""
+
+
+def _http_get_once(url, headers, redirects=5):
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return _urllib_get(url, headers)  # e.g. a file:// mirror
+
+    conn = _http_connection(parts.scheme, parts.netloc)
+    reused = conn.sock is not None
+    try:
+        conn.request("GET", parts.path + (f"?{parts.query}" if parts.query else ""), headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+    except ConnectionError:
+        conn.close()
+        if not reused:
+            raise
+        # the server dropped the idle keep-alive connection, retry once on a new one
+        return _http_get_once(url, headers, redirects)
+    except BaseException:
+        conn.close()
+        raise
+
+    location = response.headers.get("Location")
+    if response.status in (301, 302, 303, 307, 308) and location and redirects > 0:
+        return _http_get_once(urllib.parse.urljoin(url, location), headers, redirects - 1)
+    return response.status, response.headers, body
+
+
+def _http_get(rel_path, headers):
+    """
+    GET a tracker file, returning (status, headers, body). Non-2xx responses are returned, not raised.
+    Connection errors, 429 and 5xx responses are retried HTTP_RETRIES times with exponential backoff.
+    """
+    for attempt in range(HTTP_RETRIES + 1):
+        try:
+            status, response_headers, body = _http_get_once(BASE_URL + rel_path, headers)
+        except (OSError, http.client.HTTPException):
+            if attempt == HTTP_RETRIES:
+                raise
+        else:
+            if (status != 429 and status < 500) or attempt == HTTP_RETRIES:
+                return status, response_headers, body
+        time.sleep(HTTP_BACKOFF_SECONDS * 2 ** attempt)
+
+
+def _read_file_range(path, start, stop):
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(stop - start)
+
+
+def fetch_csv_to_cache(rel_path, force=False, incremental=True):
+    """
+    Make sure the local copy of a tracker CSV is up to date and return (local_path, changed).
+    Copies younger than CACHE_TTL_SECONDS are trusted as is, older ones are revalidated with
+    If-None-Match / If-Modified-Since. With incremental=True the revalidation also asks for a byte range
+    starting just before the end of the cached copy, so a day appended upstream only downloads the new rows.
+    In offline mode, or if the request fails, the last good copy is served.
+    """
+    csv_path, _ = _cache_paths(rel_path)
+    meta = _read_cache_meta(rel_path)
+
+    if meta is not None:
+        age = time.time() - meta.get("fetched_at", 0)
+        if OFFLINE_MODE or (not force and age < CACHE_TTL_SECONDS):
+            return csv_path, False
+    elif OFFLINE_MODE:
+        raise FileNotFoundError(f"No cached copy of {rel_path} in {CACHE_DIR} (offline mode)")
+
+    headers = {}
+    range_start = None
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        if incremental and meta.get("size"):
+            # overlap a few bytes we already have so a rewritten file can be told apart from an appended one
+            range_start = max(meta["size"] - TAIL_OVERLAP_BYTES, 0)
+            headers["Range"] = f"bytes={range_start}-"
+
+    try:
+        status, response_headers, body = _http_get(rel_path, headers)
+    except (OSError, http.client.HTTPException) as e:  # URLError, timeouts, connection resets, truncated responses
+        if meta is None:
+            raise
+        logger.warning("Revalidating %s failed (%s), serving cached copy", rel_path, e)
+        return csv_path, False
+
+    if status == 304 and meta is not None:
+        meta["fetched_at"] = time.time()
+        _write_cache_meta(rel_path, meta)
+        return csv_path, False
+
+    if status == 206 and range_start is not None:
+        cached_size = meta["size"]
+        overlap = _read_file_range(csv_path, range_start, cached_size)
+        total_size = response_headers.get("Content-Range", "").rpartition("/")[2]
+        # an append always grows the file, a changed validator without growth means a rewrite
+        if total_size.isdigit() and int(total_size) > cached_size and body[:len(overlap)] == overlap:
+            body = _read_file_range(csv_path, 0, cached_size) + body[len(overlap):]
+        else:
+            # file was rewritten upstream, the range is useless
+            return fetch_csv_to_cache(rel_path, force=True, incremental=False)
+    elif status == 416 and range_start is not None:
+        # file shrank upstream
+        return fetch_csv_to_cache(rel_path, force=True, incremental=False)
+    elif status != 200:
+        if meta is None:
+            raise urllib.error.HTTPError(BASE_URL + rel_path, status, "Fetching tracker CSV failed", response_headers, None)
+        logger.warning("Revalidating %s failed (HTTP %s), serving cached copy", rel_path, status)
+        return csv_path, False
+
+    _write_atomic(csv_path, body)
+    _write_cache_meta(rel_path, {
+        "etag": response_headers.get("ETag"),
+        "last_modified": response_headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+        "size": len(body),
+    })
+    return csv_path, True
+
+
+# ingest : every parsed CSV chunk is validated, normalized, typed and deduplicated once before it is served
+REQUIRED_COLUMNS = {
+    "ridership_daily": ["Date", "Total"],
+    "ridership_hourly": ["Date", "Hour", "Total"],
+    "ridership_station": ["Date", "Line", "Station", "Total"],
+    "parking_daily": ["Date", "Total Vehicles"],
+    "parking_hourly": ["Date", "Hour", "Total Vehicles"],
+    "parking_station": ["Date", "Line", "Station", "Total Vehicles"],
+    "phpdt_daily": ["Date", "Line", "Direction", "Start Station", "End Station", "PHPDT"],
 }
 
+# one row per key, later rows in the file win
+DEDUPE_KEYS = {
+    "ridership_daily": ["Date"],
+    "ridership_hourly": ["Date", "Hour"],
+    "ridership_station": ["Date", "Line", "Station"],
+    "parking_daily": ["Date"],
+    "parking_hourly": ["Date", "Hour"],
+    "parking_station": ["Date", "Line", "Station"],
+    "phpdt_daily": ["Date", "Line", "Direction", "Start Station", "End Station"],
+}
+
+# misspelt upstream column names -> canonical name
+COLUMN_RENAMES = {
+    "Eight Wheleer": "eightWheeler",
+}
+
+# typed schema shared by every dataset (columns that don't exist in a dataset are skipped)
+CATEGORICAL_COLUMNS = ["Line", "Station", "Direction", "Start Station", "End Station", "Hour"]
+COUNT_COLUMN_PREFIXES = ("noOf",)
+COUNT_COLUMNS = [
+    "Total", "Total Vehicles", "General Parking", "PHPDT",
+    "eFourWheeler", "eTwoWheeler", "hFourWheeler", "hTwoWheeler",
+    "fourWheeler", "twoWheeler", "threeWheeler", "sixWheeler", "eightWheeler",
+]
+
+
+def get_count_columns(df):
+    """Ridership / vehicle / PHPDT count columns of a frame, in frame order."""
+    return [col for col in df.columns if col in COUNT_COLUMNS or col.startswith(COUNT_COLUMN_PREFIXES)]
+
+
+def _normalize_columns(df):
+    df.columns = [str(col).strip() for col in df.columns]
+    for wrong, right in COLUMN_RENAMES.items():
+        if wrong in df.columns:
+            # keep the correctly named column if upstream already ships both
+            df = df.drop(columns=wrong) if right in df.columns else df.rename(columns={wrong: right})
+    return df
+
+
+def _apply_schema(df):
+    """Give a tracker frame explicit dtypes: datetime Date, categorical keys, smallest fitting ints."""
+    df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d", errors="coerce")
+    if "Line" in df.columns:
+        # ridership ships 1 / 2, parking "01" / "02"
+        df["Line"] = pd.to_numeric(df["Line"].astype(str).str.strip(), errors="coerce")
+    for col in ["Station", "Direction", "Start Station", "End Station"]:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip().str.upper()
+    if "Hour" in df.columns:
+        # one canonical "HH:MM" label, its parsed time of day and integer hour
+        df["Time_dt"] = pd.to_datetime(df["Hour"].astype(str).str.strip(), format="%H:%M", errors="coerce")
+        df["Hour"] = df["Time_dt"].dt.strftime("%H:%M")
+    return compact_frame(df)
+
+
+def compact_frame(df):
+    """
+    Memory-compact dtypes for a tracker frame, applied to every ingested chunk and every sqlite read:
+    counts and Line downcast to the smallest int that holds them, repeated labels (stations, lines,
+    directions, hours) as categoricals. Dates stay datetime64, every getter relies on date semantics.
+    """
+    int_columns = get_count_columns(df) + [col for col in ["Line"] if col in df.columns]
+    for col in int_columns:
+        values = pd.to_numeric(df[col], errors="coerce")
+        # columns with gaps stay float, ints can't hold NaN
+        df[col] = pd.to_numeric(values, downcast="integer") if not values.isna().any() else values
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _add_derived_columns(name, df):
+    if name == "parking_daily" and {"threeWheeler", "fourWheeler"} <= set(df.columns):
+        # upstream threeWheeler is combined 3 & 4-wheelers, keep only the 3-wheelers
+        df["threeWheeler"] = df["threeWheeler"] - df["fourWheeler"]
+    return df
+
+
+def ingest_frame(name, df):
+    """
+    Turn a raw tracker frame (whole file or an appended chunk) into the clean dataset the getters serve:
+    validated columns, canonical names, typed / normalized values, derived columns, rows without a valid
+    Date or Hour dropped, duplicates removed and rows sorted by Date.
+    """
+    df = _normalize_columns(df)
+    missing = [col for col in REQUIRED_COLUMNS[name] if col not in df.columns]
+    if missing:
+        raise ValueError(f"{name} is missing required columns {missing}")
+
+    df = _add_derived_columns(name, _apply_schema(df))
+
+    # rows without a valid date / hour can't be looked up by any getter
+    invalid = df["Date"].isna()
+    if "Time_dt" in df.columns:
+        invalid |= df["Time_dt"].isna()
+    if invalid.any():
+        df = df[~invalid.to_numpy()]
+    if "Time_dt" in df.columns:
+        df = df.assign(HourOfDay=df["Time_dt"].dt.hour.astype(np.int8))
+    df = df.drop_duplicates(subset=DEDUPE_KEYS[name], keep="last")
+    # keep rows sorted by date so the date index can map every date to one contiguous slice
+    if not df["Date"].is_monotonic_increasing:
+        df = df.sort_values("Date", kind="stable")
+    return df.reset_index(drop=True)
+
+
+def _read_csv_bytes(name, data):
+    return ingest_frame(name, pd.read_csv(io.BytesIO(data)))
+
+
+def _concat_rows(old, new_rows):
+    """Append typed rows to a typed frame, keeping categoricals categorical and the RangeIndex contiguous."""
+    new_rows.index = pd.RangeIndex(len(old), len(old) + len(new_rows))
+    old_cols, new_cols = {}, {}
+    for col in old.columns.intersection(new_rows.columns):
+        if isinstance(old[col].dtype, pd.CategoricalDtype) and isinstance(new_rows[col].dtype, pd.CategoricalDtype):
+            # append unseen categories at the end so existing codes stay valid
+            categories = old[col].cat.categories
+            categories = categories.append(new_rows[col].cat.categories.difference(categories))
+            old_cols[col] = old[col].cat.set_categories(categories)
+            new_cols[col] = new_rows[col].cat.set_categories(categories)
+    if old_cols:
+        old = old.assign(**old_cols)
+        new_rows = new_rows.assign(**new_cols)
+    return pd.concat([old, new_rows])
+
+
+def _parse_state(csv_path, offset, df):
+    # what an in-memory frame was parsed from, so refreshes can parse only the bytes after it
+    head = _read_file_range(csv_path, 0, min(offset, 64 * 1024))
+    return {
+        "offset": offset,
+        "header": head[:head.find(b"\n") + 1],
+        "tail": _read_file_range(csv_path, max(offset - TAIL_OVERLAP_BYTES, 0), offset),
+        "last_date": df["Date"].max() if not df.empty else None,
+    }
+
+
+def _has_parsed_prefix(csv_path, state):
+    # True if the cached file still starts with the bytes the in-memory frame was parsed from
+    if state is None or os.path.getsize(csv_path) < state["offset"]:
+        return False
+    offset = state["offset"]
+    return _read_file_range(csv_path, offset - len(state["tail"]), offset) == state["tail"]
+
+
+def _parse_new_rows(name, state, csv_path):
+    """
+    Parse only the bytes appended to the cached CSV after `state`.
+    Returns (new_rows, state), or None if the new rows go back in time (a rewrite) and a full reload is needed.
+    """
+    if not state["tail"].endswith(b"\n"):
+        return None
+
+    with open(csv_path, "rb") as f:
+        f.seek(state["offset"])
+        new_bytes = f.read()
+    new_rows = _read_csv_bytes(name, state["header"] + new_bytes)
+    if not new_rows.empty and state["last_date"] is not None and new_rows["Date"].min() <= state["last_date"]:
+        return None
+
+    new_state = dict(
+        state,
+        offset=state["offset"] + len(new_bytes),
+        tail=(state["tail"] + new_bytes)[-TAIL_OVERLAP_BYTES:],
+        last_date=new_rows["Date"].max() if not new_rows.empty else state["last_date"],
+    )
+    return new_rows, new_state
+
+
+def _parse_appended_rows(name, df, state, csv_path):
+    # _parse_new_rows, appended to the in-memory frame: (df, state) or None
+    parsed = _parse_new_rows(name, state, csv_path)
+    if parsed is None:
+        return None
+    new_rows, new_state = parsed
+    return _concat_rows(df, new_rows), new_state
+
+
+# columnar snapshots of the typed frames (needs pyarrow, skipped silently without it)
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")
+SNAPSHOT_FORMAT_VERSION = 2  # bump whenever ingest_frame changes what gets stored
+
+
+def _snapshot_paths(name):
+    path = os.path.join(SNAPSHOT_DIR, f"{name}.arrow")
+    return path, path + ".meta.json"
+
+
+def write_snapshot(name, df, state):
+    """
+    Store a typed frame as an uncompressed Arrow IPC (Feather v2) file so it can be memory mapped on load.
+    `state` records which prefix of the cached CSV the snapshot holds.
+    """
+    if feather is None:
+        return None
+    path, meta_path = _snapshot_paths(name)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+    _write_atomic(meta_path, json.dumps({
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "offset": state["offset"],
+        "header": base64.b64encode(state["header"]).decode(),
+        "tail": base64.b64encode(state["tail"]).decode(),
+        "last_date": state["last_date"].isoformat() if pd.notna(state["last_date"]) else None,
+    }), mode="w")
+    return path
+
+
+def _read_snapshot_state(name):
+    _, meta_path = _snapshot_paths(name)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("format") != SNAPSHOT_FORMAT_VERSION:
+        return None
+    return {
+        "offset": meta["offset"],
+        "header": base64.b64decode(meta["header"]),
+        "tail": base64.b64decode(meta["tail"]),
+        "last_date": pd.Timestamp(meta["last_date"]) if meta["last_date"] else None,
+    }
+
+
+def load_snapshot(name, columns=None):
+    """Load a dataset snapshot, memory mapped and reading only `columns` (all if None). None if unavailable."""
+    path, _ = _snapshot_paths(name)
+    if feather is None or not os.path.exists(path):
+        return None
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def _load_from_snapshot(name, csv_path, fetched=False):
+    # snapshot + whatever was appended to the CSV since it was written, None if the snapshot can't be used
+    state = _read_snapshot_state(name)
+    if feather is None or not _has_parsed_prefix(csv_path, state):
+        return None
+    if fetched and os.path.getsize(csv_path) == state["offset"]:
+        return None  # new contents that didn't grow : rewritten in place
+    df = load_snapshot(name)
+    if df is None:
+        return None
+    if os.path.getsize(csv_path) > state["offset"]:
+        appended = _parse_appended_rows(name, df, state, csv_path)
+        if appended is None:
+            return None
+        df, state = appended
+        write_snapshot(name, df, state)
+    return df, state
+
+
+def _load_data_source(name, use_snapshot=True):
+    csv_path, fetched = fetch_csv_to_cache(DATA_SOURCE_REL_PATHS[name])
+    loaded = _load_from_snapshot(name, csv_path, fetched) if use_snapshot else None
+    if loaded is None:
+        with open(csv_path, "rb") as f:
+            data = f.read()
+        df = _read_csv_bytes(name, data)
+        state = _parse_state(csv_path, len(data), df)
+        write_snapshot(name, df, state)
+        loaded = df, state
+    df, _PARSE_STATE[name] = loaded
+    return df
+
+
+def build_snapshots(names=None):
+    """Fetch the given data sources (all by default) and (re)write their typed snapshots. Returns {name: path}."""
+    paths = {}
+    for name in names or DATA_SOURCE_REL_PATHS:
+        csv_path, _ = fetch_csv_to_cache(DATA_SOURCE_REL_PATHS[name], force=True)
+        with open(csv_path, "rb") as f:
+            data = f.read()
+        df = _read_csv_bytes(name, data)
+        paths[name] = write_snapshot(name, df, _parse_state(csv_path, len(data), df))
+    return paths
+
+
+# sqlite backend : every dataset in one embedded database file, served through SQL instead of in-memory frames
+DATA_BACKEND = os.environ.get("CMRL_BACKEND", "pandas")  # "pandas" (frames in memory) or "sqlite"
+SQLITE_PATH = os.environ.get("CMRL_SQLITE_PATH", os.path.join(CACHE_DIR, "cmrl-ridership.sqlite"))
+
+# indexes per table, every date / station / line filter can start from one of them
+SQLITE_INDEXES = {
+    "ridership_daily": [["Date"]],
+    "ridership_hourly": [["Date"]],
+    "ridership_station": [["Date"], ["Station", "Date"], ["Line", "Date"]],
+    "parking_daily": [["Date"]],
+    "parking_hourly": [["Date"]],
+    "parking_station": [["Date"], ["Station", "Date"], ["Line", "Date"]],
+    "phpdt_daily": [["Date"], ["Line", "Date"]],
+}
+
+_SQLITE_LOCAL = threading.local()  # one read-only connection per thread
+_SQLITE_WRITE_LOCK = threading.Lock()
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _sqlite_type(dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    if dtype.kind in "iub":
+        return "INTEGER"
+    if dtype.kind == "f":
+        return "REAL"
+    return "TEXT"  # dates are stored as "YYYY-MM-DD", which sorts and compares like the dates
+
+
+def _stored_columns(df):
+    # Time_dt is rebuilt from Hour on read
+    return [col for col in df.columns if col != "Time_dt"]
+
+
+def _insert_sqlite_rows(conn, name, df):
+    columns = _stored_columns(df)
+    values = []
+    for col in columns:
+        series = df[col].dt.strftime("%Y-%m-%d") if col == "Date" else df[col]
+        values.append(np.asarray(series).tolist())  # plain python values, NaN is stored as NULL
+    conn.executemany(
+        f"INSERT INTO {_quote(name)} ({', '.join(map(_quote, columns))}) VALUES ({', '.join('?' * len(columns))})",
+        zip(*values),
+    )
+
+
+def _create_sqlite_table(conn, name, df):
+    conn.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+    columns = ", ".join(f"{_quote(col)} {_sqlite_type(df[col].dtype)}" for col in _stored_columns(df))
+    conn.execute(f"CREATE TABLE {_quote(name)} ({columns})")
+    _insert_sqlite_rows(conn, name, df)
+    for index_columns in SQLITE_INDEXES[name]:
+        if all(col in df.columns for col in index_columns):
+            index_name = _quote(f"{name}_{'_'.join(index_columns)}".replace(" ", "_").lower())
+            conn.execute(f"CREATE INDEX {index_name} ON {_quote(name)} ({', '.join(map(_quote, index_columns))})")
+
+
+def _read_sqlite_state(conn, name):
+    # parse state of a table (what prefix of the cached CSV it holds) plus its generation / row count
+    row = conn.execute(
+        "SELECT format, generation, row_count, csv_offset, header, tail, last_date FROM _sources WHERE name = ?", (name,)
+    ).fetchone()
+    if row is None or row[0] != SNAPSHOT_FORMAT_VERSION:
+        return None
+    return {
+        "generation": row[1],
+        "rows": row[2],
+        "offset": row[3],
+        "header": bytes(row[4]),
+        "tail": bytes(row[5]),
+        "last_date": pd.Timestamp(row[6]) if row[6] else None,
+    }
+
+
+def _write_sqlite_state(conn, name, state):
+    conn.execute(
+        "INSERT OR REPLACE INTO _sources VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            name, SNAPSHOT_FORMAT_VERSION, state["generation"], state["rows"], state["offset"],
+            state["header"], state["tail"], state["last_date"].strftime("%Y-%m-%d") if state["last_date"] is not None else None,
+        ),
+    )
+
+
+def _sync_sqlite_source(conn, name, force, incremental):
+    # bring one table in line with the cached CSV, True if it changed
+    csv_path, fetched = fetch_csv_to_cache(DATA_SOURCE_REL_PATHS[name], force=force, incremental=incremental)
+    conn.execute("BEGIN IMMEDIATE")  # one writer at a time across processes, readers keep reading the last commit
+    try:
+        state = _read_sqlite_state(conn, name)
+        has_prefix = _has_parsed_prefix(csv_path, state)
+        if has_prefix and os.path.getsize(csv_path) == state["offset"]:
+            if not fetched:
+                conn.execute("ROLLBACK")
+                return False
+            has_prefix = False  # new contents that didn't grow : rewritten in place
+
+        parsed = _parse_new_rows(name, state, csv_path) if incremental and has_prefix else None
+        if parsed is not None:
+            table_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({_quote(name)})")}
+            if not set(_stored_columns(parsed[0])) <= table_columns:
+                parsed = None  # upstream added a column, rebuild the table
+        if parsed is not None:
+            new_rows, new_state = parsed
+            _insert_sqlite_rows(conn, name, new_rows)
+            new_state["rows"] = state["rows"] + len(new_rows)
+        else:
+            with open(csv_path, "rb") as f:
+                data = f.read()
+            df = _read_csv_bytes(name, data)
+            _create_sqlite_table(conn, name, df)
+            generation = conn.execute("SELECT COALESCE(MAX(generation), 0) + 1 FROM _sources").fetchone()[0]
+            new_state = dict(_parse_state(csv_path, len(data), df), generation=generation, rows=len(df))
+        _write_sqlite_state(conn, name, new_state)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return True
+
+
+def sync_sqlite_database(names=None, force=False, incremental=True):
+    """
+    Create or update the database of the sqlite backend from the cached tracker CSVs (all sources by default).
+    Tables only get the rows appended since the last sync unless their CSV was rewritten.
+    Returns the list of updated source names.
+    """
+    names = list(names or DATA_SOURCE_REL_PATHS)
+    with _SQLITE_WRITE_LOCK:
+        path = SQLITE_PATH
+        created = not os.path.exists(SQLITE_PATH)
+        if created:
+            # build every table in a temp file and move it in once complete, readers never see a partial database
+            os.makedirs(os.path.dirname(SQLITE_PATH) or ".", exist_ok=True)
+            path = f"{SQLITE_PATH}.{os.getpid()}.tmp"
+            names = list(DATA_SOURCE_REL_PATHS)
+        conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _sources (name TEXT PRIMARY KEY, format INTEGER, generation INTEGER, "
+                "row_count INTEGER, csv_offset INTEGER, header BLOB, tail BLOB, last_date TEXT)"
+            )
+            updated = [name for name in names if _sync_sqlite_source(conn, name, force, incremental)]
+        finally:
+            conn.close()
+        if created:
+            os.replace(path, SQLITE_PATH)
+    for name in updated:
+        _evict_derived(name)
+    return updated
+
+
+def _sqlite_reader():
+    # read-only connection of the current thread, the database is built on first use
+    conn = getattr(_SQLITE_LOCAL, "conn", None)
+    if conn is None:
+        if not os.path.exists(SQLITE_PATH):
+            sync_sqlite_database()
+        uri = "file:" + urllib.request.pathname2url(os.path.abspath(SQLITE_PATH)) + "?mode=ro"
+        conn = _SQLITE_LOCAL.conn = sqlite3.connect(uri, uri=True, timeout=60)
+    return conn
+
+
+def _sqlite_columns(name):
+    return [row[1] for row in _sqlite_reader().execute(f"PRAGMA table_info({_quote(name)})")]
+
+
+def _from_sqlite(df):
+    # undo the storage types : dates from text, Time_dt from Hour, smallest ints and categoricals
+    if "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+    if "Hour" in df.columns:
+        position = df.columns.get_loc("HourOfDay") if "HourOfDay" in df.columns else len(df.columns)
+        df.insert(position, "Time_dt", pd.to_datetime(df["Hour"], format="%H:%M"))
+    if "HourOfDay" in df.columns:
+        df["HourOfDay"] = df["HourOfDay"].astype(np.int8)
+    return compact_frame(df)
+
+
+def _sqlite_select(name, where="", params=(), columns=None):
+    # rows in file order, typed like the in-memory frames
+    selected = "*" if columns is None else ", ".join(map(_quote, columns))
+    sql = f"SELECT {selected} FROM {_quote(name)} {where} ORDER BY rowid"
+    return _from_sqlite(pd.read_sql_query(sql, _sqlite_reader(), params=list(params)))
+
+
+def _sqlite_state_row(name):
+    row = _sqlite_reader().execute(
+        "SELECT generation, row_count, csv_offset, tail FROM _sources WHERE name = ?", (name,)
+    ).fetchone()
+    if row is None:
+        # database built before this source existed
+        sync_sqlite_database([name])
+        return _sqlite_state_row(name)
+    return row
+
+
+class _LazyDataSources(dict):
+    """
+    Dict of loaded data sources that fetches and parses each CSV the first time it is accessed.
+    Only DATA_SOURCES[name] triggers a load; `in`, .get() and iteration only see what is already loaded.
+    """
+
+    def __missing__(self, name):
+        if name not in DATA_SOURCE_REL_PATHS:
+            raise KeyError(name)
+        with _LOAD_LOCKS[name]:
+            # another thread may have finished loading while we waited on the lock
+            if dict.__contains__(self, name):
+                return dict.__getitem__(self, name)
+            df = _load_data_source(name)
+            _GENERATIONS[name] = next(_GENERATION_COUNTER)
+            self[name] = df
+            return df
+
+
+# data source dict (map category to loaded data, loaded on first access)
+DATA_SOURCES = _LazyDataSources()
+
+
+def refresh_data_sources(force=False, incremental=True):
+    """
+    Revalidate every loaded data source against the remote and re-parse only the ones that changed.
+    With incremental=True only the rows appended since the last load are parsed and appended to the
+    in-memory frame; a rewritten file falls back to a full reload.
+    Returns the list of refreshed source names.
+    With the sqlite backend the database is synced instead (see sync_sqlite_database).
+    """
+    if DATA_BACKEND == "sqlite":
+        return sync_sqlite_database(force=force, incremental=incremental)
+
+    # every loaded source is revalidated on its own worker, so one slow file doesn't delay the others
+    names = list(DATA_SOURCES.keys())
+    changed = _LOAD_POOL.map(lambda name: _refresh_data_source(name, force, incremental), names)
+    return [name for name, refreshed in zip(names, changed) if refreshed]
+
+
+def _refresh_data_source(name, force, incremental):
+    with _LOAD_LOCKS[name]:
+        csv_path, fetched = fetch_csv_to_cache(DATA_SOURCE_REL_PATHS[name], force=force, incremental=incremental)
+        # compare against what this process parsed, another worker may have updated the shared cache
+        state = _PARSE_STATE.get(name)
+        has_prefix = _has_parsed_prefix(csv_path, state)
+        if has_prefix and os.path.getsize(csv_path) == state["offset"]:
+            if not fetched:
+                return False
+            has_prefix = False  # new contents that didn't grow : rewritten in place
+        appended = _parse_appended_rows(name, DATA_SOURCES[name], state, csv_path) if incremental and has_prefix else None
+        if appended is not None:
+            df, _PARSE_STATE[name] = appended
+            write_snapshot(name, df, _PARSE_STATE[name])
+            DATA_SOURCES[name] = df
+        else:
+            # the snapshot holds what was parsed before, which no longer matches the file
+            df = _load_data_source(name, use_snapshot=False)
+            _GENERATIONS[name] = next(_GENERATION_COUNTER)
+            DATA_SOURCES[name] = df
+        _evict_derived(name)
+        return True
+
+
+# concurrent loading : every source is fetched and parsed on its own worker, failures are reported instead of raised
+LOAD_MAX_WORKERS = int(os.environ.get("CMRL_LOAD_WORKERS", len(DATA_SOURCE_REL_PATHS)))
+SOURCE_TIMEOUT_SECONDS = int(os.environ.get("CMRL_SOURCE_TIMEOUT_SECONDS", 120))
+
+LOAD_ERRORS = {}  # name -> exception of its last failed load, cleared once it loads
+_LOAD_POOL = ThreadPoolExecutor(max_workers=LOAD_MAX_WORKERS, thread_name_prefix="cmrl-load")
+
+
+def _load_one(name):
+    try:
+        if DATA_BACKEND == "sqlite":
+            fetch_csv_to_cache(DATA_SOURCE_REL_PATHS[name])  # parsed by sync_sqlite_database afterwards
+        else:
+            DATA_SOURCES[name]
+    except Exception as e:
+        LOAD_ERRORS[name] = e
+        logger.warning("Loading %s failed: %s", name, e)
+        raise
+    LOAD_ERRORS.pop(name, None)
+
+
+def load_data_sources(names=None, timeout=SOURCE_TIMEOUT_SECONDS):
+    """
+    Fetch and parse data sources (all by default) concurrently instead of one after another.
+    A source that fails or isn't done within `timeout` seconds doesn't hold up or break the others : it is
+    returned in {name: exception} (and kept in LOAD_ERRORS) instead of raised. Timed out sources keep
+    loading in the background and become available once done.
+    """
+    names = list(names or DATA_SOURCE_REL_PATHS)
+    futures = {_LOAD_POOL.submit(_load_one, name): name for name in names}
+    done, not_done = concurrent.futures.wait(futures, timeout=timeout)
+
+    failures = {}
+    for future in done:
+        if future.exception() is not None:
+            failures[futures[future]] = future.exception()
+    for future in not_done:
+        name = futures[future]
+        failures[name] = LOAD_ERRORS[name] = TimeoutError(f"Loading {name} took longer than {timeout}s")
+
+    if DATA_BACKEND == "sqlite" and len(failures) < len(names):
+        sync_sqlite_database([name for name in names if name not in failures])
+    return failures
+
+
+def get_data_version(name):
+    """
+    (generation, rows) identifying the loaded contents of a data source.
+    The generation changes on full reloads; appended days only grow the row count.
+    """
+    if DATA_BACKEND == "sqlite":
+        generation, rows, _, _ = _sqlite_state_row(name)
+        return generation, rows
+    df = DATA_SOURCES[name]
+    return _GENERATIONS[name], len(df)
+
+
+def get_data_fingerprint(name):
+    """Short hash of the CSV bytes a data source was parsed from. Unlike the data version it is stable across processes."""
+    if DATA_BACKEND == "sqlite":
+        _, _, offset, tail = _sqlite_state_row(name)
+        return hashlib.sha1(str(offset).encode() + bytes(tail)).hexdigest()[:16]
+    DATA_SOURCES[name]  # make sure it is loaded
+    state = _PARSE_STATE[name]
+    return hashlib.sha1(str(state["offset"]).encode() + state["tail"]).hexdigest()[:16]
+
+
+def get_rows_since(name, version):
+    """Rows appended to a data source since `version` (from get_data_version), None if it was fully reloaded since."""
+    generation, rows = version
+    if DATA_BACKEND == "sqlite":
+        if get_data_version(name)[0] != generation:
+            return None
+        return _sqlite_select(name, "WHERE rowid > ?", (rows,))
+    df = DATA_SOURCES[name]
+    if _GENERATIONS[name] != generation or len(df) < rows:
+        return None
+    return df.iloc[rows:]
+
+
+def get_dataset(name):
+    """
+    The full typed frame of a data source. The sqlite backend reads it from the database on every call
+    instead of keeping it in memory, so only use it where the whole history is needed.
+    """
+    if DATA_BACKEND == "sqlite":
+        return _sqlite_select(name)
+    return DATA_SOURCES[name]
+
+
+# memory report : what the typed frames take vs read_csv's default dtypes
+DERIVED_COLUMNS = ["Time_dt", "HourOfDay"]  # added at ingest, not part of the CSVs
+
+
+def _default_dtype_bytes(df):
+    # the CSV columns of a typed frame as read_csv leaves them : int64 / float64 numbers, object strings
+    total = 0
+    for col in df.columns:
+        if col in DERIVED_COLUMNS:
+            continue
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(series.cat.categories.dtype)
+        if col == "Date":
+            series = series.dt.strftime("%Y-%m-%d")
+        if series.dtype.kind in "iuf":
+            total += 8 * len(series)
+        else:
+            total += int(series.astype(object).memory_usage(deep=True, index=False))
+    return total
+
+
+def get_memory_report(names=None):
+    """
+    Per-dataset memory of the data sources (all by default) : "Default MB" as read_csv's default dtypes would
+    hold the CSV columns, "Compact MB" as the typed frame holds them (derived columns included).
+    """
+    rows = []
+    for name in names or DATA_SOURCE_REL_PATHS:
+        df = get_dataset(name)
+        default_bytes = _default_dtype_bytes(df)
+        compact_bytes = int(df.memory_usage(deep=True, index=False).sum())
+        rows.append({
+            "Dataset": name,
+            "Rows": len(df),
+            "Default MB": round(default_bytes / 1024 ** 2, 2),
+            "Compact MB": round(compact_bytes / 1024 ** 2, 2),
+            "Saved %": round(100 * (1 - compact_bytes / default_bytes), 1) if default_bytes else 0.0,
+        })
+    return pd.DataFrame(rows)
+
+
+# bounded in-process caches shared by every session of the app process
+DERIVED_CACHE_MAX_BYTES = int(os.environ.get("CMRL_DERIVED_CACHE_MB", 256)) * 1024 ** 2
+
+
+def estimate_bytes(value):
+    """Rough in-memory size of a cached value, used to keep caches under their byte budget."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_bytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache bounded by total estimated size in bytes."""
+
+    def __init__(self, max_bytes, sizeof=estimate_bytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value  # never fits, don't flush everything else for it
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+        return value
+
+    def get_or_build(self, key, build):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.set(key, build())
+        return value
+
+    def evict(self, predicate):
+        """Drop every entry whose key matches predicate(key)."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self.total_bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_MISSING = object()
+_DERIVED_FRAMES = LRUCache(DERIVED_CACHE_MAX_BYTES)
+
+
+def cached_derived(name, kind, key, build):
+    """
+    Memoize a frame derived from a data source. Entries are keyed by the source's data version,
+    so refreshed data never serves stale results, and old versions are evicted on refresh.
+    """
+    return _DERIVED_FRAMES.get_or_build((name, get_data_version(name), kind, key), build)
+
+
+def _evict_derived(name):
+    _DERIVED_FRAMES.evict(lambda key: key[0] == name)
+
+
+# date index : every frame is sorted by Date, so each date maps to one contiguous row slice
+_DATE_INDEXES = {}
+
+
+def _date_key(date):
+    if isinstance(date, str) and len(date) == 10:
+        return date
+    return pd.Timestamp(date).strftime("%Y-%m-%d")
+
+
+def get_date_index(name):
+    """
+    Return the date index of a data source, rebuilding it if the frame was replaced since it was built.
+    dict with "dates" (sorted unique DatetimeIndex), "starts" / "stops" (row offsets per date) and
+    "slices" ({"YYYY-MM-DD": (start, stop)}).
+    """
+    df = DATA_SOURCES[name]
+    index = _DATE_INDEXES.get(name)
+    if index is not None and index["frame"] is df:
+        return index
+
+    dates = df["Date"].to_numpy()
+    boundaries = np.flatnonzero(dates[1:] != dates[:-1]) + 1
+    starts = np.concatenate([[0], boundaries]) if len(dates) else np.array([], dtype=np.int64)
+    stops = np.concatenate([boundaries, [len(dates)]]) if len(dates) else np.array([], dtype=np.int64)
+    unique_dates = pd.DatetimeIndex(dates[starts])
+    index = {
+        "frame": df,
+        "dates": unique_dates,
+        "starts": starts,
+        "stops": stops,
+        "slices": dict(zip(unique_dates.strftime("%Y-%m-%d"), zip(starts.tolist(), stops.tolist()))),
+    }
+    _DATE_INDEXES[name] = index
+    return index
+
+
+def get_available_dates(name):
+    """Sorted unique dates (DatetimeIndex) a data source has rows for."""
+    if DATA_BACKEND == "sqlite":
+        sql = f'SELECT DISTINCT "Date" FROM {_quote(name)} ORDER BY "Date"'
+        return cached_derived(
+            name, "dates", None,
+            lambda: pd.DatetimeIndex(pd.to_datetime(pd.read_sql_query(sql, _sqlite_reader())["Date"], format="%Y-%m-%d")),
+        )
+    return get_date_index(name)["dates"]
+
+
+def _rows_on_date(name, date):
+    # rows for one date as a positional slice (a view where pandas allows it), empty frame if missing
+    if DATA_BACKEND == "sqlite":
+        return _query_sqlite(name, date, date, None, None, None, None, None)
+    index = get_date_index(name)
+    start, stop = index["slices"].get(_date_key(date), (0, 0))
+    return index["frame"].iloc[start:stop]
+
+
+def _rows_on_dates(name, dates, as_dict=False):
+    """
+    Rows for many dates in date order, resolved through the date index and gathered with one positional take.
+    as_dict=True returns {"YYYY-MM-DD": rows} of slices sharing the source frame's memory instead (empty frame if missing).
+    """
+    keys = sorted({_date_key(date) for date in dates})
+    if DATA_BACKEND == "sqlite":
+        rows = _sqlite_select(name, f'WHERE "Date" IN ({", ".join("?" * len(keys))})', keys)
+        if not as_dict:
+            return rows
+        groups = dict(tuple(rows.groupby(rows["Date"].dt.strftime("%Y-%m-%d"), sort=False)))
+        return {key: groups.get(key, rows.iloc[0:0]) for key in keys}
+
+    index = get_date_index(name)
+    frame = index["frame"]
+    spans = [index["slices"].get(key, (0, 0)) for key in keys]
+    if as_dict:
+        return {key: frame.iloc[start:stop] for key, (start, stop) in zip(keys, spans)}
+    positions = np.concatenate([np.arange(start, stop) for start, stop in spans] or [np.array([], dtype=np.int64)])
+    return frame.iloc[positions]
+
+
 # basic getters : csv data by date
 def get_aggregate_ridership_on_date(date_str):
-    return DATA_SOURCES["ridership_daily"][DATA_SOURCES["ridership_daily"]["Date"] == date_str]
+    return _rows_on_date("ridership_daily", date_str)
 
 
 def get_hourly_ridership_on_date(date_str):
-    return DATA_SOURCES["ridership_hourly"][DATA_SOURCES["ridership_hourly"]["Date"] == date_str]
+    return _rows_on_date("ridership_hourly", date_str)
 
 
 def get_station_ridership_on_date(date_str):
-    return DATA_SOURCES["ridership_station"][DATA_SOURCES["ridership_station"]["Date"] == date_str]
+    return _rows_on_date("ridership_station", date_str)
 
 
 def get_aggregate_parking_on_date(date_str):
-    return DATA_SOURCES["parking_daily"][DATA_SOURCES["parking_daily"]["Date"] == date_str]
+    return _rows_on_date("parking_daily", date_str)
 
 
 def get_hourly_parking_on_date(date_str):
-    return DATA_SOURCES["parking_hourly"][DATA_SOURCES["parking_hourly"]["Date"] == date_str]
+    return _rows_on_date("parking_hourly", date_str)
 
 
 def get_station_parking_on_date(date_str):
-    return DATA_SOURCES["parking_station"][DATA_SOURCES["parking_station"]["Date"] == date_str]
+    return _rows_on_date("parking_station", date_str)
 
 
 def get_phpdt_ridership_on_date(date_str):
-    return DATA_SOURCES["phpdt_daily"][DATA_SOURCES["phpdt_daily"]["Date"] == date_str]
+    return _rows_on_date("phpdt_daily", date_str)
+
+
+# batch getters : csv data for many dates in one call (one long frame, or {date: frame} with as_dict=True)
+def get_aggregate_ridership_on_dates(dates, as_dict=False):
+    return _rows_on_dates("ridership_daily", dates, as_dict)
+
+
+def get_hourly_ridership_on_dates(dates, as_dict=False):
+    return _rows_on_dates("ridership_hourly", dates, as_dict)
+
+
+def get_station_ridership_on_dates(dates, as_dict=False):
+    return _rows_on_dates("ridership_station", dates, as_dict)
+
+
+def get_aggregate_parking_on_dates(dates, as_dict=False):
+    return _rows_on_dates("parking_daily", dates, as_dict)
+
+
+def get_hourly_parking_on_dates(dates, as_dict=False):
+    return _rows_on_dates("parking_hourly", dates, as_dict)
+
+
+def get_station_parking_on_dates(dates, as_dict=False):
+    return _rows_on_dates("parking_station", dates, as_dict)
+
+
+def get_phpdt_ridership_on_dates(dates, as_dict=False):
+    return _rows_on_dates("phpdt_daily", dates, as_dict)
+
+
+# display-ready frames : derived once per date and data version, shared across sessions (treat as read-only)
+def _with_time_column(df):
+    # Time_dt is parsed once at ingest, only the order is per date
+    return df.sort_values("Time_dt").reset_index(drop=True)
+
+
+def _with_station_display(df):
+    df = df.copy()
+    df["Station"] = df["Station"].astype(str)
+    df["Station_Name"] = df["Station"].map(get_station_name_from_code)
+    df["Station_Display"] = df["Station_Name"] + " (" + df["Station"] + ")"
+    return df
+
+
+def get_hourly_ridership_for_display(date_str):
+    """Hourly ridership for a date with a parsed Time_dt column, sorted by time."""
+    return cached_derived(
+        "ridership_hourly", "display", _date_key(date_str),
+        lambda: _with_time_column(get_hourly_ridership_on_date(date_str)),
+    )
+
+
+def get_station_ridership_for_display(date_str):
+    """Station ridership for a date with Station_Name and Station_Display label columns."""
+    return cached_derived(
+        "ridership_station", "display", _date_key(date_str),
+        lambda: _with_station_display(get_station_ridership_on_date(date_str)),
+    )
+
+
+def get_hourly_parking_for_display(date_str):
+    """Hourly parking for a date with a parsed Time_dt column, sorted by time."""
+    return cached_derived(
+        "parking_hourly", "display", _date_key(date_str),
+        lambda: _with_time_column(get_hourly_parking_on_date(date_str)),
+    )
+
+
+def get_station_parking_for_display(date_str):
+    """Station parking for a date with Station_Name and Station_Display label columns."""
+    return cached_derived(
+        "parking_station", "display", _date_key(date_str),
+        lambda: _with_station_display(get_station_parking_on_date(date_str)),
+    )
+
+# advanced filters : csv data by date range, station name, line, hour range, direction
+def _date_row_bounds(name, start, end):
+    # positional [lo, hi) row range covering start..end (inclusive, either may be None)
+    index = get_date_index(name)
+    lo, hi = 0, len(index["frame"])
+    if start is not None:
+        i = index["dates"].searchsorted(pd.Timestamp(start), side="left")
+        lo = int(index["starts"][i]) if i < len(index["starts"]) else hi
+    if end is not None:
+        i = index["dates"].searchsorted(pd.Timestamp(end), side="right")
+        hi = int(index["stops"][i - 1]) if i > 0 else 0
+    return lo, max(lo, hi)
+
+
+def _station_mask(name, frame, stations):
+    # PHPDT rows have a start and end station instead of a single one
+    if "Station" in frame.columns:
+        return frame["Station"].isin(stations).to_numpy()
+    if "Start Station" in frame.columns:
+        return (frame["Start Station"].isin(stations) | frame["End Station"].isin(stations)).to_numpy()
+    raise ValueError(f"{name} has no station columns to filter on")
+
+
+def _query_snapshot(name, start, end, stations, lines, hours, directions, columns):
+    """
+    Evaluate every filter and the projection inside the Arrow snapshot,
+    so only matching rows are materialised. None if the snapshot is missing or behind the cached CSV.
+    """
+    if pa_dataset is None or dict.__contains__(DATA_SOURCES, name):
+        return None
+    path, _ = _snapshot_paths(name)
+    state = _read_snapshot_state(name)
+    csv_path, _ = _cache_paths(DATA_SOURCE_REL_PATHS[name])
+    if not os.path.exists(path) or not os.path.exists(csv_path) or not _has_parsed_prefix(csv_path, state) \
+            or os.path.getsize(csv_path) != state["offset"]:
+        return None
+
+    dataset = pa_dataset.dataset(path, format="ipc")
+    schema_names = dataset.schema.names
+    conditions = []
+    if start is not None:
+        conditions.append(pa_dataset.field("Date") >= pd.Timestamp(start).to_datetime64())
+    if end is not None:
+        conditions.append(pa_dataset.field("Date") <= pd.Timestamp(end).to_datetime64())
+    if stations is not None:
+        if "Station" in schema_names:
+            conditions.append(pa_dataset.field("Station").isin(list(stations)))
+        elif "Start Station" in schema_names:
+            conditions.append(
+                pa_dataset.field("Start Station").isin(list(stations)) | pa_dataset.field("End Station").isin(list(stations))
+            )
+        else:
+            raise ValueError(f"{name} has no station columns to filter on")
+    if lines is not None:
+        conditions.append(pa_dataset.field("Line").isin(list(lines)))
+    if hours is not None:
+        conditions.append((pa_dataset.field("HourOfDay") >= hours[0]) & (pa_dataset.field("HourOfDay") <= hours[1]))
+    if directions is not None:
+        conditions.append(pa_dataset.field("Direction").isin(list(directions)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def _query_sqlite(name, start, end, stations, lines, hours, directions, columns):
+    # the same filters as one indexed SQL query, only matching rows leave the database
+    conditions, params = [], []
+
+    def isin(column, values):
+        values = list(values)
+        params.extend(values)
+        return f"{_quote(column)} IN ({', '.join('?' * len(values))})"
+
+    if start is not None:
+        conditions.append('"Date" >= ?')
+        params.append(_date_key(start))
+    if end is not None:
+        conditions.append('"Date" <= ?')
+        params.append(_date_key(end))
+    if stations is not None:
+        table_columns = _sqlite_columns(name)
+        if "Station" in table_columns:
+            conditions.append(isin("Station", stations))
+        elif "Start Station" in table_columns:
+            conditions.append(f"({isin('Start Station', stations)} OR {isin('End Station', stations)})")
+        else:
+            raise ValueError(f"{name} has no station columns to filter on")
+    if lines is not None:
+        conditions.append(isin("Line", lines))
+    if hours is not None:
+        conditions.append('"HourOfDay" BETWEEN ? AND ?')
+        params.extend([int(hours[0]), int(hours[1])])
+    if directions is not None:
+        conditions.append(isin("Direction", directions))
+
+    selected = None
+    if columns is not None:
+        # Time_dt isn't stored, it comes from Hour
+        selected = [col for col in columns if col != "Time_dt"]
+        if "Time_dt" in columns and "Hour" not in selected:
+            selected.append("Hour")
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    result = _sqlite_select(name, where, params, selected)
+    return result if columns is None else result[list(columns)]
+
+
+def query(name, start=None, end=None, stations=None, lines=None, hours=None, directions=None, columns=None):
+    """
+    Rows of a data source matching every given filter, evaluated in one vectorized pass.
+    start / end : inclusive dates; stations, lines, directions : allowed values; hours : inclusive
+    (first, last) hour of day for hourly data; columns : only return these columns.
+    If the source isn't loaded yet, filters and projection are pushed down into its Arrow snapshot,
+    with the sqlite backend they run as SQL.
+    """
+    if DATA_BACKEND == "sqlite":
+        return _query_sqlite(name, start, end, stations, lines, hours, directions, columns)
+    result = _query_snapshot(name, start, end, stations, lines, hours, directions, columns)
+    if result is not None:
+        return result
+
+    df = DATA_SOURCES[name]
+    lo, hi = _date_row_bounds(name, start, end)
+    frame = df.iloc[lo:hi]
+
+    mask = np.ones(len(frame), dtype=bool)
+    if stations is not None:
+        mask &= _station_mask(name, frame, stations)
+    if lines is not None:
+        mask &= frame["Line"].isin(lines).to_numpy()
+    if directions is not None:
+        mask &= frame["Direction"].isin(directions).to_numpy()
+    if hours is not None:
+        hour = frame["HourOfDay"].to_numpy()
+        mask &= (hour >= hours[0]) & (hour <= hours[1])
+
+    result = frame if mask.all() else frame[mask]
+    return result if columns is None else result[list(columns)]
+
+
+# rollup cubes : sums per (period, keys) maintained incrementally as days are appended
+ROLLUP_PERIODS = ["week", "month", "dow"]
+
+# keys each data source is rolled up by on top of the period (value columns are all count columns)
+ROLLUP_KEYS = {
+    "ridership_daily": [],
+    "ridership_hourly": ["Hour"],
+    "ridership_station": ["Line", "Station"],
+    "parking_daily": [],
+    "parking_hourly": ["Hour"],
+    "parking_station": ["Line", "Station"],
+    "phpdt_daily": ["Line", "Direction", "Start Station", "End Station"],
+}
+
+_ROLLUPS = {}
+_ROLLUP_LOCKS = {(name, period): threading.Lock() for name in ROLLUP_KEYS for period in ROLLUP_PERIODS}
+
+
+def _period_keys(dates, period):
+    # week -> Monday of the week, month -> first of the month, dow -> 0 (Mon) .. 6 (Sun)
+    if period == "week":
+        return (dates - pd.to_timedelta(dates.dt.dayofweek, unit="D")).to_numpy()
+    if period == "month":
+        return dates.to_numpy().astype("datetime64[M]").astype("datetime64[ns]")
+    if period == "dow":
+        return dates.dt.dayofweek.to_numpy()
+    raise ValueError(f"Unknown rollup period {period!r}, expected one of {ROLLUP_PERIODS}")
+
+
+def _aggregate_rollup(frame, name, period):
+    keys = ROLLUP_KEYS[name]
+    value_cols = [col for col in get_count_columns(frame) if col not in keys]
+    group_keys = [_period_keys(frame["Date"], period)] + [frame[key].to_numpy() for key in keys]
+    grouped = frame[value_cols].groupby(group_keys)
+    partial = grouped.sum()
+    partial.insert(0, "Days", grouped.size())  # one row per key per day, so the row count is the day count
+    partial.index.names = [period] + keys
+    return partial
+
+
+def _merge_rollup(cube, partial):
+    # add a partial aggregate into the cube, touching only the buckets it covers
+    existing = partial.index.isin(cube.index)
+    if existing.any():
+        cube.loc[partial.index[existing]] += partial[existing]
+    if not existing.all():
+        cube = pd.concat([cube, partial[~existing]]).sort_index()
+    return cube
+
+
+def get_rollup(name, period, start=None, end=None):
+    """
+    Rolled up sums of a data source by period ("week", "month" or "dow") plus its ROLLUP_KEYS,
+    with a "Days" column to turn sums into daily means. start / end filter week / month buckets.
+    Built once, then only the buckets touched by newly appended days are updated.
+    """
+    with _ROLLUP_LOCKS[(name, period)]:
+        version = get_data_version(name)
+        state = _ROLLUPS.get((name, period))
+        if state is None or state["version"] != version:
+            new_rows = get_rows_since(name, state["version"]) if state is not None else None
+            if new_rows is None:
+                cube = _aggregate_rollup(get_dataset(name), name, period)
+            elif new_rows.empty:
+                cube = state["cube"]
+            else:
+                cube = _merge_rollup(state["cube"].copy(), _aggregate_rollup(new_rows, name, period))
+            state = {"version": version, "cube": cube}
+            _ROLLUPS[(name, period)] = state
+
+    cube = state["cube"].reset_index()
+    if period != "dow":
+        if start is not None:
+            cube = cube[cube[period] >= pd.Timestamp(start)]
+        if end is not None:
+            cube = cube[cube[period] <= pd.Timestamp(end)]
+    return cube
+
+
+# station index : each station's rows as one contiguous date-sorted frame, extended as days are appended
+STATION_HISTORY_DATASETS = ["ridership_station", "parking_station"]
+
+_STATION_INDEXES = {}
+_STATION_INDEX_LOCKS = {name: threading.Lock() for name in STATION_HISTORY_DATASETS}
+
+
+def _partition_by_station(frame):
+    # frames are date-sorted, a stable sort by station keeps every station's rows in date order
+    codes = frame["Station"].astype(str).to_numpy()
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    boundaries = np.flatnonzero(sorted_codes[1:] != sorted_codes[:-1]) + 1
+    starts = np.concatenate([[0], boundaries]) if len(codes) else np.array([], dtype=np.int64)
+    stops = np.concatenate([boundaries, [len(codes)]]) if len(codes) else np.array([], dtype=np.int64)
+    return {
+        sorted_codes[start]: frame.iloc[order[start:stop]].reset_index(drop=True)
+        for start, stop in zip(starts, stops)
+    }
+
+
+def _station_index(name):
+    with _STATION_INDEX_LOCKS[name]:
+        version = get_data_version(name)
+        state = _STATION_INDEXES.get(name)
+        if state is not None and state["version"] == version:
+            return state["stations"]
+
+        new_rows = get_rows_since(name, state["version"]) if state is not None else None
+        if new_rows is None:
+            stations = _partition_by_station(get_dataset(name))
+        else:
+            # appended days are later than every stored one, so they go at the end of each station's frame
+            stations = dict(state["stations"])
+            for code, rows in _partition_by_station(new_rows).items():
+                stations[code] = _concat_rows(stations[code], rows) if code in stations else rows
+        _STATION_INDEXES[name] = {"version": version, "stations": stations}
+        return stations
+
+
+def get_station_history(code, start=None, end=None, columns=None, dataset="ridership_station"):
+    """
+    All rows of one station between start and end (inclusive, either may be None) from ridership_station
+    or parking_station, in date order. Served from the station index, so the cost depends on the rows
+    returned, not on how many stations and days are stored. Interchange stations have one row per line.
+    """
+    if dataset not in STATION_HISTORY_DATASETS:
+        raise ValueError(f"No station index for {dataset!r}, expected one of {STATION_HISTORY_DATASETS}")
+    if DATA_BACKEND == "sqlite":
+        # the (Station, Date) index plays the same role
+        return query(dataset, start=start, end=end, stations=[code], columns=columns)
+
+    stations = _station_index(dataset)
+    history = stations.get(code)
+    if history is None:
+        history = next(iter(stations.values())).iloc[0:0] if stations else pd.DataFrame(columns=["Date", "Station"])
+    dates = history["Date"].to_numpy()
+    lo = 0 if start is None else np.searchsorted(dates, pd.Timestamp(start).to_datetime64(), side="left")
+    hi = len(dates) if end is None else np.searchsorted(dates, pd.Timestamp(end).to_datetime64(), side="right")
+    rows = history.iloc[lo:hi]
+    return rows if columns is None else rows[list(columns)]
 
-# TO DO : csv data by date range, station name, hour range, etc (ADVANCED FILTERS)
 
 # station code-name mapping
 STATION_CODE_TO_NAME = {
@@ -111,6 +1542,109 @@ def get_station_code_from_name(name):
     return STATION_NAME_TO_CODE.get(name, name)
 
 
+# approximate (lat, lon) of every station, good enough for city-scale maps
+STATION_COORDINATES = {
+    "SWD": (13.1840, 80.3090),
+    "SWN": (13.1786, 80.3075),
+    "STV": (13.1720, 80.3050),
+    "STT": (13.1600, 80.3010),
+    "SKP": (13.1510, 80.2990),
+    "STG": (13.1430, 80.2960),
+    "SNW": (13.1355, 80.2930),
+    "STR": (13.1265, 80.2895),
+    "STC": (13.1165, 80.2860),
+    "SWA": (13.1075, 80.2805),
+    "SMA": (13.0950, 80.2860),
+    "SHC": (13.0875, 80.2850),
+    "SGE": (13.0695, 80.2725),
+    "SLI": (13.0640, 80.2660),
+    "STL": (13.0580, 80.2580),
+    "SGM": (13.0450, 80.2480),
+    "STE": (13.0375, 80.2465),
+    "SCR": (13.0300, 80.2400),
+    "SSA": (13.0235, 80.2280),
+    "SLM": (13.0145, 80.2240),
+    "SGU": (13.0090, 80.2130),
+    "SOT": (12.9990, 80.1930),
+    "SME": (12.9875, 80.1765),
+    "SAP": (12.9810, 80.1640),
+    "SCC": (13.0820, 80.2740),
+    "SEG": (13.0785, 80.2610),
+    "SNP": (13.0790, 80.2510),
+    "SKM": (13.0780, 80.2420),
+    "SPC": (13.0760, 80.2320),
+    "SSN": (13.0785, 80.2250),
+    "SAE": (13.0845, 80.2190),
+    "SAT": (13.0850, 80.2085),
+    "STI": (13.0850, 80.2010),
+    "SKO": (13.0735, 80.1950),
+    "SCM": (13.0690, 80.2040),
+    "SAR": (13.0620, 80.2110),
+    "SVA": (13.0505, 80.2120),
+    "SAN": (13.0355, 80.2110),
+    "SSI": (13.0170, 80.2050),
+    "SAL": (13.0040, 80.2010),
+    "SMM": (12.9950, 80.1990),
+}
+
+
+# station attributes : "underground" (AC, sheltered) or "elevated" (exposed), and whether the station
+# connects to another mode (suburban rail / MRTS / bus terminus) for first / last mile trips
+STATION_ATTRIBUTES = {
+    "SWD": {"structure": "elevated", "multimodal": False},
+    "SWN": {"structure": "elevated", "multimodal": True},
+    "STV": {"structure": "elevated", "multimodal": True},
+    "STT": {"structure": "elevated", "multimodal": False},
+    "SKP": {"structure": "elevated", "multimodal": False},
+    "STG": {"structure": "elevated", "multimodal": False},
+    "SNW": {"structure": "elevated", "multimodal": False},
+    "STR": {"structure": "underground", "multimodal": False},
+    "STC": {"structure": "underground", "multimodal": False},
+    "SWA": {"structure": "underground", "multimodal": True},
+    "SMA": {"structure": "underground", "multimodal": False},
+    "SHC": {"structure": "underground", "multimodal": True},
+    "SGE": {"structure": "underground", "multimodal": False},
+    "SLI": {"structure": "underground", "multimodal": False},
+    "STL": {"structure": "underground", "multimodal": False},
+    "SGM": {"structure": "underground", "multimodal": False},
+    "STE": {"structure": "underground", "multimodal": False},
+    "SCR": {"structure": "underground", "multimodal": False},
+    "SSA": {"structure": "underground", "multimodal": True},
+    "SLM": {"structure": "elevated", "multimodal": False},
+    "SGU": {"structure": "elevated", "multimodal": True},
+    "SOT": {"structure": "elevated", "multimodal": False},
+    "SME": {"structure": "elevated", "multimodal": True},
+    "SAP": {"structure": "elevated", "multimodal": True},
+    "SCC": {"structure": "underground", "multimodal": True},
+    "SEG": {"structure": "underground", "multimodal": True},
+    "SNP": {"structure": "underground", "multimodal": False},
+    "SKM": {"structure": "underground", "multimodal": False},
+    "SPC": {"structure": "underground", "multimodal": False},
+    "SSN": {"structure": "underground", "multimodal": False},
+    "SAE": {"structure": "underground", "multimodal": False},
+    "SAT": {"structure": "underground", "multimodal": False},
+    "STI": {"structure": "underground", "multimodal": False},
+    "SKO": {"structure": "elevated", "multimodal": False},
+    "SCM": {"structure": "elevated", "multimodal": True},
+    "SAR": {"structure": "elevated", "multimodal": False},
+    "SVA": {"structure": "elevated", "multimodal": False},
+    "SAN": {"structure": "elevated", "multimodal": False},
+    "SSI": {"structure": "elevated", "multimodal": False},
+    "SAL": {"structure": "elevated", "multimodal": False},
+    "SMM": {"structure": "elevated", "multimodal": True},
+}
+
+
+def get_station_attributes():
+    """STATION_ATTRIBUTES as a frame : Station, Station_Name, Structure, Multimodal."""
+    return pd.DataFrame({
+        "Station": list(STATION_ATTRIBUTES),
+        "Station_Name": [get_station_name_from_code(code) for code in STATION_ATTRIBUTES],
+        "Structure": [attributes["structure"] for attributes in STATION_ATTRIBUTES.values()],
+        "Multimodal": [attributes["multimodal"] for attributes in STATION_ATTRIBUTES.values()],
+    })
+
+
 # PHPDT station order mapping (from start to end of each line)
 PHPDT_LINE_STATIONS = {
     1: ["SAP", "SME", "SOT", "SAL", "SGU", "SLM", "SSA", "SCR", "STE", "SGM", "STL", "SLI", "SGE", "SCC", "SHC", "SMA", "SWA", "STC", "STR", "SNW", "STG", "SKP", "STT", "STV", "SWN", "SWD"],
@@ -118,6 +1652,293 @@ PHPDT_LINE_STATIONS = {
 }
 
 
+def get_phpdt_segments(line_num):
+    """Adjacent station pairs of a line in PHPDT order, with the bar position between the two stations."""
+    order = PHPDT_LINE_STATIONS.get(line_num, [])
+    names = [get_station_name_from_code(code) for code in order]
+    return pd.DataFrame({
+        "Position": np.arange(len(order) - 1) + 0.5,
+        "From": order[:-1],
+        "To": order[1:],
+        "UP Label": [f"{a} → {b}" for a, b in zip(names[:-1], names[1:])],
+        "DOWN Label": [f"{b} → {a}" for a, b in zip(names[:-1], names[1:])],
+    })
+
+
+def build_phpdt_corridor(phpdt, line_num, fill_value=0):
+    """
+    Align the PHPDT rows of a line to its ordered segments in one vectorized pass.
+    Returns one row per (Date, segment) with UP (From -> To) and DOWN (To -> From) PHPDT, `fill_value` where missing.
+    Works for a single date or a whole range, pivot on Date x Position for heatmaps.
+    """
+    segments = get_phpdt_segments(line_num)
+    line = phpdt[phpdt["Line"] == line_num]
+    date_codes, dates = pd.factorize(line["Date"], sort=True)
+
+    pairs = pd.Index(line["Start Station"].astype(str) + ">" + line["End Station"].astype(str))
+    up_pos = pd.Index(segments["From"] + ">" + segments["To"]).get_indexer(pairs)
+    down_pos = pd.Index(segments["To"] + ">" + segments["From"]).get_indexer(pairs)
+    direction = line["Direction"].astype(str).to_numpy()
+    values = line["PHPDT"].fillna(0).to_numpy()
+
+    dtype = values.dtype if fill_value == 0 else np.result_type(values.dtype, np.float64)
+    up = np.full((len(dates), len(segments)), fill_value, dtype=dtype)
+    down = np.full((len(dates), len(segments)), fill_value, dtype=dtype)
+    is_up = (direction == "UP") & (up_pos >= 0)
+    is_down = (direction == "DOWN") & (down_pos >= 0)
+    up[date_codes[is_up], up_pos[is_up]] = values[is_up]
+    down[date_codes[is_down], down_pos[is_down]] = values[is_down]
+
+    corridor = segments.iloc[np.tile(np.arange(len(segments)), len(dates))].reset_index(drop=True)
+    corridor.insert(0, "Date", np.repeat(np.asarray(dates), len(segments)))
+    corridor["UP"] = up.ravel()
+    corridor["DOWN"] = down.ravel()
+    return corridor
+
+
+def get_phpdt_corridor(line_num, start=None, end=None, fill_value=0):
+    """
+    Segment-aligned UP / DOWN PHPDT of a line for every date between start and end (inclusive).
+    Segments without a row on a date get `fill_value` (np.nan to tell them apart from a real 0).
+    """
+    return build_phpdt_corridor(query("phpdt_daily", start=start, end=end, lines=[line_num]), line_num, fill_value)
+
+
+# segment geometry : fixed per line, computed once
+PHPDT_PATH_OFFSET_DEGREES = 0.0006  # ~60 m, keeps the UP and DOWN paths of a segment side by side
+_SEGMENT_PATHS = {}
+
+
+def get_phpdt_segment_paths(line_num):
+    """
+    get_phpdt_segments plus "UP Path" / "DOWN Path" : [[lat, lon], [lat, lon]] polylines in the direction of travel,
+    shifted to either side of the track. Segments with a station missing from STATION_COORDINATES are dropped.
+    """
+    paths = _SEGMENT_PATHS.get(line_num)
+    if paths is not None:
+        return paths
+
+    segments = get_phpdt_segments(line_num)
+    segments = segments[segments["From"].isin(STATION_COORDINATES) & segments["To"].isin(STATION_COORDINATES)]
+    start = np.array([STATION_COORDINATES[code] for code in segments["From"]]).reshape(-1, 2)
+    end = np.array([STATION_COORDINATES[code] for code in segments["To"]]).reshape(-1, 2)
+    # unit normal of every segment, UP goes on one side and DOWN on the other
+    direction = end - start
+    normal = np.stack([-direction[:, 1], direction[:, 0]], axis=1)
+    normal /= np.maximum(np.linalg.norm(normal, axis=1, keepdims=True), 1e-12)
+    offset = normal * PHPDT_PATH_OFFSET_DEGREES
+
+    paths = segments.reset_index(drop=True)
+    paths["UP Path"] = [[a.tolist(), b.tolist()] for a, b in zip(start + offset, end + offset)]
+    paths["DOWN Path"] = [[b.tolist(), a.tolist()] for a, b in zip(start - offset, end - offset)]
+    _SEGMENT_PATHS[line_num] = paths
+    return paths
+
+
+# station x date heatmap engine : dense int32 matrices per ridership column, extended as days arrive
+HEATMAP_FREQUENCIES = {"D": None, "W": "week", "M": "month"}
+
+_HEATMAP = {}
+_HEATMAP_LOCK = threading.Lock()
+
+
+def _heatmap_rows(frame, rows):
+    # (line, station) rows in PHPDT line order, stations missing from it are appended as they appear
+    rows = list(rows) if rows is not None else [(line, code) for line, codes in PHPDT_LINE_STATIONS.items() for code in codes]
+    keys = pd.MultiIndex.from_arrays([frame["Line"].to_numpy(), frame["Station"].astype(str).to_numpy()])
+    known = set(rows)
+    rows += [key for key in keys.unique() if key not in known]
+    return rows, pd.MultiIndex.from_tuples(rows, names=["Line", "Station"]).get_indexer(keys)
+
+
+def _heatmap_block(frame, rows):
+    # matrices for the dates in `frame` only, plus the (possibly extended) row list
+    rows, row_pos = _heatmap_rows(frame, rows)
+    date_codes, dates = pd.factorize(frame["Date"], sort=True)
+    values = {}
+    for col in get_count_columns(frame):
+        matrix = np.zeros((len(rows), len(dates)), dtype=np.int32)
+        matrix[row_pos, date_codes] = frame[col].fillna(0).to_numpy().astype(np.int32)
+        values[col] = matrix
+    return rows, pd.DatetimeIndex(dates), values
+
+
+def _update_heatmap():
+    version = get_data_version("ridership_station")
+    state = _HEATMAP.get("ridership_station")
+    if state is not None and state["version"] == version:
+        return state
+
+    new_rows = get_rows_since("ridership_station", state["version"]) if state is not None else None
+    if new_rows is None:
+        rows, dates, values = _heatmap_block(get_dataset("ridership_station"), None)
+    elif new_rows.empty:
+        rows, dates, values = state["rows"], state["dates"], state["values"]
+    else:
+        # appended days are always later than the stored ones, so new columns go on the right
+        rows, new_dates, new_values = _heatmap_block(new_rows, state["rows"])
+        extra_rows = len(rows) - len(state["rows"])
+        dates = state["dates"].append(new_dates)
+        values = {}
+        for col, new_matrix in new_values.items():
+            old_matrix = state["values"].get(col, np.zeros((len(state["rows"]), len(state["dates"])), dtype=np.int32))
+            old_matrix = np.pad(old_matrix, ((0, extra_rows), (0, 0)))
+            values[col] = np.hstack([old_matrix, new_matrix])
+
+    state = {"version": version, "rows": rows, "dates": dates, "values": values}
+    _HEATMAP["ridership_station"] = state
+    return state
+
+
+def get_station_heatmap(column="Total", start=None, end=None, freq="D", lines=None):
+    """
+    Station x date matrix of a station ridership column (Total or a payment method) as a DataFrame.
+    Rows are (Line, Station) in PHPDT line order, columns are dates between start and end (inclusive).
+    freq "W" / "M" turns columns into weeks / months holding the mean daily ridership of each period.
+    """
+    with _HEATMAP_LOCK:
+        state = _update_heatmap()
+
+    dates = state["dates"]
+    lo = 0 if start is None else dates.searchsorted(pd.Timestamp(start), side="left")
+    hi = len(dates) if end is None else dates.searchsorted(pd.Timestamp(end), side="right")
+    matrix = state["values"][column][:, lo:hi]
+    dates = dates[lo:hi]
+
+    period = HEATMAP_FREQUENCIES[freq]
+    if period is not None and len(dates):
+        # dates are sorted, so every period is a contiguous run of columns
+        period_keys = _period_keys(pd.Series(dates), period)
+        boundaries = np.flatnonzero(np.concatenate([[True], period_keys[1:] != period_keys[:-1]]))
+        days = np.diff(np.append(boundaries, len(dates)))
+        matrix = np.add.reduceat(matrix, boundaries, axis=1, dtype=np.int64) / days
+        dates = pd.DatetimeIndex(period_keys[boundaries])
+
+    index = pd.MultiIndex.from_tuples(state["rows"], names=["Line", "Station"])
+    heatmap = pd.DataFrame(matrix, index=index, columns=dates)
+    if lines is not None:
+        heatmap = heatmap[heatmap.index.get_level_values("Line").isin(lines)]
+    return heatmap
+
+
+# hourly x day-of-week profile engine : running sums, counts and squared sums per (dow, hour, column)
+PROFILE_DATASETS = ["ridership_hourly", "parking_hourly"]
+PROFILE_GROUPINGS = {
+    "dow": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+    "daytype": ["Weekday"] * 5 + ["Weekend"] * 2,
+}
+
+# special occasions (README "Miscellaneous") whose hourly curves aren't typical, left out of profiles by default
+PROFILE_EXCLUDED_DATES = {
+    "2026-02-14": "A R Rahman concert, event QRs and extended timings",
+    "2026-02-15": "A R Rahman concert, event QRs and extended timings",
+    "2026-03-07": "Hiphop Tamizha concert, event QRs and extended timings",
+}
+
+_PROFILES = {}
+_PROFILE_LOCKS = {name: threading.Lock() for name in PROFILE_DATASETS}
+
+
+def _profile_block(frame, columns):
+    # (7, 24, columns) sums / counts / squared sums of the rows in `frame`, NaN cells are not counted
+    buckets = frame["Date"].dt.dayofweek.to_numpy() * 24 + frame["HourOfDay"].to_numpy().astype(np.int64)
+    sums, counts, sumsq = (np.zeros((7 * 24, len(columns))) for _ in range(3))
+    for i, col in enumerate(columns):
+        if col not in frame.columns:
+            continue
+        values = frame[col].to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0.0)
+        sums[:, i] = np.bincount(buckets, weights=values, minlength=7 * 24)
+        counts[:, i] = np.bincount(buckets, weights=present.astype(np.float64), minlength=7 * 24)
+        sumsq[:, i] = np.bincount(buckets, weights=values * values, minlength=7 * 24)
+    return [array.reshape(7, 24, len(columns)) for array in (sums, counts, sumsq)]
+
+
+def _update_profile(name):
+    version = get_data_version(name)
+    state = _PROFILES.get(name)
+    if state is not None and state["version"] == version:
+        return state
+
+    new_rows = get_rows_since(name, state["version"]) if state is not None else None
+    if new_rows is None:
+        frame = get_dataset(name)
+        columns = get_count_columns(frame)
+        arrays = _profile_block(frame, columns)
+    elif new_rows.empty:
+        columns, arrays = state["columns"], state["arrays"]
+    else:
+        # payment modes that first appear in the new rows get zero totals for the days before them
+        columns = state["columns"] + [col for col in get_count_columns(new_rows) if col not in state["columns"]]
+        extra = len(columns) - len(state["columns"])
+        arrays = [
+            np.pad(old, ((0, 0), (0, 0), (0, extra))) + new
+            for old, new in zip(state["arrays"], _profile_block(new_rows, columns))
+        ]
+
+    state = {"version": version, "columns": columns, "arrays": arrays}
+    _PROFILES[name] = state
+    return state
+
+
+def get_hourly_profile(name="ridership_hourly", columns=None, by="dow", exclude_dates=None):
+    """
+    Average hourly curves per day of week (by="dow") or weekday / weekend (by="daytype") of an hourly
+    data source over its whole history. Long frame with one row per (Group, HourOfDay, Column) and the
+    Mean, Std and number of Days behind them. exclude_dates defaults to PROFILE_EXCLUDED_DATES, pass ()
+    to keep every day. Running totals are kept per (dow, hour, column) and only extended with appended
+    days, excluded dates are subtracted at query time so any exclusion list is served without a rebuild.
+    """
+    if name not in PROFILE_DATASETS:
+        raise ValueError(f"No hourly profile for {name!r}, expected one of {PROFILE_DATASETS}")
+    if by not in PROFILE_GROUPINGS:
+        raise ValueError(f"Unknown grouping {by!r}, expected one of {list(PROFILE_GROUPINGS)}")
+    exclude_dates = PROFILE_EXCLUDED_DATES if exclude_dates is None else exclude_dates
+
+    with _PROFILE_LOCKS[name]:
+        state = _update_profile(name)
+    all_columns = state["columns"]
+    sums, counts, sumsq = state["arrays"]
+
+    keys = sorted({_date_key(date) for date in exclude_dates})
+    if keys:
+        excluded = cached_derived(
+            name, "profile_excluded", tuple(keys),
+            lambda: _profile_block(_rows_on_dates(name, keys), all_columns),
+        )
+        sums, counts, sumsq = (total - part for total, part in zip((sums, counts, sumsq), excluded))
+
+    columns = all_columns if columns is None else list(columns)
+    missing = [col for col in columns if col not in all_columns]
+    if missing:
+        raise KeyError(f"{name} has no columns {missing}")
+    picked = [all_columns.index(col) for col in columns]
+
+    # pool the weekdays of each group, sums of sums and squares give the exact pooled mean / variance
+    labels = PROFILE_GROUPINGS[by]
+    groups = list(dict.fromkeys(labels))
+    members = [[dow for dow, label in enumerate(labels) if label == group] for group in groups]
+    sums, counts, sumsq = (
+        np.stack([array[dows][:, :, picked].sum(axis=0) for dows in members]) for array in (sums, counts, sumsq)
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = sums / counts
+        variance = np.maximum(sumsq - sums * mean, 0) / (counts - 1)
+    variance[counts < 2] = np.nan
+
+    profile = pd.DataFrame({
+        "Group": np.repeat(groups, 24 * len(columns)),
+        "HourOfDay": np.tile(np.repeat(np.arange(24, dtype=np.int8), len(columns)), len(groups)),
+        "Column": np.tile(columns, 24 * len(groups)),
+        "Mean": mean.ravel(),
+        "Std": np.sqrt(variance).ravel(),
+        "Days": counts.ravel().round().astype(np.int64),
+    })
+    # hours without service have no rows at all
+    return profile[profile["Days"] > 0].reset_index(drop=True)
+
+
 def get_phpdt_bar_color(line_num, direction):
     """Get color for PHPDT bars based on line and direction."""
     if line_num == 1:
@@ -197,19 +2018,27 @@ def get_payment_methods_for_display(agg_data):
     return methods
 
 
-def get_payment_method_color(col_name):
+def get_payment_method_class(col_name):
     """
-    Determine color for a payment method based on its type.
-    QR methods -> purple, Singara/NCMC -> teal, Closed loop cards/passes -> orange, others -> gray
+    Type of a payment method : "singara" (NCMC), "closed_loop" (cards / passes), "qr" or None if unrecognised.
     """
     if col_name == "noOfNCMCcard":
-        return COLOR_SCHEME["singara"]
+        return "singara"
     elif col_name == "noOfCards":
-        return COLOR_SCHEME["closed_loop"]
+        return "closed_loop"
     elif col_name.endswith("QR") or col_name == 'noOfSVP':
-        return COLOR_SCHEME["qr"]
+        return "qr"
     else:
-        return "#808080" # grey for unrecognised
+        return None
+
+
+def get_payment_method_color(col_name):
+    """
+    Determine color for a payment method based on its type.
+    QR methods -> purple, Singara/NCMC -> teal, Closed loop cards/passes -> orange, others -> gray
+    """
+    method_class = get_payment_method_class(col_name)
+    return COLOR_SCHEME[method_class] if method_class else "#808080"  # grey for unrecognised
 
 # parking vehicle type display names mapping
 PARKING_COLUMN_DISPLAY_NAMES = {
@@ -228,24 +2057,15 @@ PARKING_COLUMN_DISPLAY_NAMES = {
 def get_parking_methods_for_display(daily_parking):
     """
     Extract all vehicle types from daily parking data and return as list of (column_name, display_name, value).
-    Ordered by value (descending). Excludes total. Calculates 3-wheeler as (threeWheeler - fourWheeler).
+    Ordered by value (descending). Excludes total. threeWheeler is already 3-wheelers only (see ingest_frame).
     """
     methods = []
     exclude_columns = ["Date", "Total Vehicles"]
     
-    # Calculate 3-wheeler separately
-    three_wheeler_value = int(daily_parking["threeWheeler"].values[0]) - int(daily_parking["fourWheeler"].values[0])
-    
     for col in daily_parking.columns:
         if col not in exclude_columns:
             display_name = PARKING_COLUMN_DISPLAY_NAMES.get(col, col)
-            
-            # Use calculated value for 3-wheeler
-            if col == "threeWheeler":
-                value = three_wheeler_value
-            else:
-                value = int(daily_parking[col].values[0])
-            
+            value = int(daily_parking[col].values[0])
             methods.append((col, display_name, value))
     
     # sort by value descending
@@ -265,4 +2085,13 @@ def get_parking_method_color(col_name):
     elif col_name in ["fourWheeler", "twoWheeler", "threeWheeler", "sixWheeler", "eightWheeler"]:
         return COLOR_SCHEME["ice"]
     else:
-        return "#808080"  # gray for others
\ No newline at end of file
+        return "#808080"  # gray for others
+
+if __name__ == "__main__":
+    # build / refresh the typed snapshots (or the sqlite database) ahead of time, e.g. from a cron job
+    if DATA_BACKEND == "sqlite":
+        for name in sync_sqlite_database():
+            print(f"{name}: {SQLITE_PATH}")
+    else:
+        for name, path in build_snapshots().items():
+            print(f"{name}: {path}")
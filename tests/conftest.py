@@ -0,0 +1,132 @@
+"""
+Shared fixtures : a local HTTP stand-in for the tracker repository and a ridership_tracker_api module
+whose cache, base URL and loaded data are isolated per test.
+"""
+import hashlib
+import http.server
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pandas")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ridership_tracker_api  # noqa: E402
+
+# two days of every data source, enough for ingest to type and validate each one
+SAMPLE_CSVS = {
+    "ridership_daily": "Date,Total,noOfNCMCcard,noOfPaperQR\n2026-03-01,310000,90000,120000\n2026-03-02,325000,95000,118000\n",
+    "ridership_hourly": "Date,Hour,Total,noOfNCMCcard\n2026-03-01,08:00,21000,6000\n2026-03-01,09:00,26000,7100\n2026-03-02,08:00,22000,6200\n",
+    "ridership_station": "Date,Line,Station,Total,noOfNCMCcard\n2026-03-01,1,SCC,15000,4000\n2026-03-01,2,SCC,9000,2500\n2026-03-02,1,SCC,15500,4100\n",
+    "parking_daily": "Date,Total Vehicles,threeWheeler,fourWheeler\n2026-03-01,5200,900,700\n2026-03-02,5400,950,720\n",
+    "parking_hourly": "Date,Hour,Total Vehicles\n2026-03-01,08:00,800\n2026-03-02,08:00,820\n",
+    "parking_station": "Date,Line,Station,Total Vehicles\n2026-03-01,01,SAP,300\n2026-03-02,01,SAP,310\n",
+    "phpdt_daily": "Date,Line,Direction,Start Station,End Station,PHPDT\n2026-03-01,1,UP,SAP,SME,12000\n2026-03-02,1,UP,SAP,SME,12500\n",
+}
+
+
+class StandIn:
+    """
+    Serves `files` ({rel_path: bytes}) like raw.githubusercontent.com : strong ETags, 304s on If-None-Match
+    and open-ended byte ranges (206, or 416 past the end of the file).
+    `statuses` ({rel_path: status}) makes a file answer with that status instead, `latency` delays every response.
+    Every request is recorded as (rel_path, headers), every response as (rel_path, status, body length).
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.statuses = {}
+        self.latency = {}  # rel_path -> seconds
+        self.requests = []
+        self.responses = []
+        stand_in = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                rel_path = self.path.lstrip("/")
+                stand_in.requests.append((rel_path, dict(self.headers)))
+                time.sleep(stand_in.latency.get(rel_path, 0))
+                body = stand_in.files.get(rel_path)
+                status = stand_in.statuses.get(rel_path, 200 if body is not None else 404)
+                headers = {}
+                payload = b""
+                if status == 200:
+                    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                    headers["ETag"] = etag
+                    payload = body
+                    range_header = self.headers.get("Range", "")
+                    if self.headers.get("If-None-Match") == etag:
+                        status, payload = 304, b""
+                    elif range_header.startswith("bytes=") and range_header.endswith("-"):
+                        start = int(range_header[len("bytes="):-1])
+                        if start >= len(body):
+                            status, payload = 416, b""
+                            headers["Content-Range"] = f"bytes */{len(body)}"
+                        else:
+                            status, payload = 206, body[start:]
+                            headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                stand_in.responses.append((rel_path, status, len(payload)))
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def requests_for(self, rel_path):
+        return [headers for path, headers in self.requests if path == rel_path]
+
+    def statuses_for(self, rel_path):
+        return [status for path, status, _ in self.responses if path == rel_path]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    server = StandIn()
+    for name, csv in SAMPLE_CSVS.items():
+        server.files[ridership_tracker_api.DATA_SOURCE_REL_PATHS[name]] = csv.encode()
+    yield server
+    server.close()
+
+
+def isolate(monkeypatch, cache_dir):
+    """Point ridership_tracker_api at an empty cache dir and forget everything it has loaded."""
+    api = ridership_tracker_api
+    monkeypatch.setattr(api, "CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(api, "SNAPSHOT_DIR", os.path.join(str(cache_dir), "snapshots"))
+    monkeypatch.setattr(api, "DATA_SOURCES", api._LazyDataSources())
+    monkeypatch.setattr(api, "_PARSE_STATE", {})
+    monkeypatch.setattr(api, "_GENERATIONS", {})
+    monkeypatch.setattr(api, "_DATE_INDEXES", {})
+    monkeypatch.setattr(api, "LOAD_ERRORS", {})
+    return api
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path, stand_in):
+    """ridership_tracker_api fetching from the stand-in into an empty cache dir, online, with short backoffs."""
+    isolate(monkeypatch, tmp_path / "cache")
+    monkeypatch.setattr(ridership_tracker_api, "DATA_BACKEND", "pandas")
+    monkeypatch.setattr(ridership_tracker_api, "BASE_URL", stand_in.base_url)
+    monkeypatch.setattr(ridership_tracker_api, "OFFLINE_MODE", False)
+    monkeypatch.setattr(ridership_tracker_api, "CACHE_TTL_SECONDS", 15 * 60)
+    monkeypatch.setattr(ridership_tracker_api, "HTTP_BACKOFF_SECONDS", 0.01)
+    return ridership_tracker_api
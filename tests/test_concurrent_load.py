@@ -0,0 +1,111 @@
+"""load_data_sources against the local stand-in with injected latency : failure reporting, time bounds and equivalence."""
+import time
+import urllib.error
+
+import pandas as pd
+
+from conftest import isolate
+
+FAILING_SOURCE = "phpdt_daily"
+SLOW_SOURCE = "ridership_station"
+
+
+def _loaded(api, name):
+    # DATA_SOURCES[name] would load it, ask the dict itself
+    return dict.__contains__(api.DATA_SOURCES, name)
+
+
+def test_failing_source_is_reported_while_the_others_load(api, stand_in):
+    stand_in.statuses[api.DATA_SOURCE_REL_PATHS[FAILING_SOURCE]] = 503
+
+    failures = api.load_data_sources()
+
+    assert list(failures) == [FAILING_SOURCE]
+    assert isinstance(failures[FAILING_SOURCE], urllib.error.HTTPError)
+    assert failures[FAILING_SOURCE].code == 503
+    assert api.LOAD_ERRORS == failures
+    for name in api.DATA_SOURCE_REL_PATHS:
+        if name != FAILING_SOURCE:
+            assert _loaded(api, name)
+            assert len(api.DATA_SOURCES[name]) > 0
+    assert not _loaded(api, FAILING_SOURCE)
+
+
+def test_failed_source_is_cleared_from_load_errors_once_it_loads(api, stand_in):
+    rel_path = api.DATA_SOURCE_REL_PATHS[FAILING_SOURCE]
+    stand_in.statuses[rel_path] = 503
+    assert FAILING_SOURCE in api.load_data_sources([FAILING_SOURCE])
+
+    del stand_in.statuses[rel_path]
+    assert api.load_data_sources([FAILING_SOURCE]) == {}
+    assert FAILING_SOURCE not in api.LOAD_ERRORS
+
+
+def test_slow_source_times_out_within_the_bound(api, stand_in):
+    stand_in.latency[api.DATA_SOURCE_REL_PATHS[SLOW_SOURCE]] = 1.5
+
+    start = time.perf_counter()
+    failures = api.load_data_sources(timeout=0.5)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.2
+    assert list(failures) == [SLOW_SOURCE]
+    assert isinstance(failures[SLOW_SOURCE], TimeoutError)
+    assert isinstance(api.LOAD_ERRORS[SLOW_SOURCE], TimeoutError)
+
+    # it keeps loading in the background and becomes available once done
+    deadline = time.perf_counter() + 10
+    while not _loaded(api, SLOW_SOURCE) and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    assert _loaded(api, SLOW_SOURCE)
+
+
+def test_retries_give_up_within_the_backoff_bound(api, stand_in, monkeypatch):
+    rel_path = api.DATA_SOURCE_REL_PATHS[FAILING_SOURCE]
+    stand_in.statuses[rel_path] = 503
+    monkeypatch.setattr(api, "HTTP_RETRIES", 3)
+    monkeypatch.setattr(api, "HTTP_BACKOFF_SECONDS", 0.1)
+    backoff_total = sum(0.1 * 2 ** attempt for attempt in range(3))  # no sleep after the last attempt
+
+    start = time.perf_counter()
+    failures = api.load_data_sources([FAILING_SOURCE])
+    elapsed = time.perf_counter() - start
+
+    assert FAILING_SOURCE in failures
+    assert len(stand_in.requests_for(rel_path)) == 3 + 1
+    assert backoff_total <= elapsed < backoff_total + 2
+
+
+def test_socket_timeouts_give_up_within_the_timeout_bound(api, stand_in, monkeypatch):
+    rel_path = api.DATA_SOURCE_REL_PATHS[FAILING_SOURCE]
+    stand_in.latency[rel_path] = 1
+    monkeypatch.setattr(api, "HTTP_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(api, "HTTP_RETRIES", 1)
+
+    start = time.perf_counter()
+    failures = api.load_data_sources([FAILING_SOURCE])
+    elapsed = time.perf_counter() - start
+
+    assert isinstance(failures[FAILING_SOURCE], OSError)
+    # two attempts of 0.2s each plus one 0.01s backoff, with room for a slow machine
+    assert elapsed < 1.5
+
+
+def test_concurrent_load_matches_sequential_load(api, stand_in, monkeypatch, tmp_path):
+    for rel_path in api.DATA_SOURCE_REL_PATHS.values():
+        stand_in.latency[rel_path] = 0.3
+
+    start = time.perf_counter()
+    assert api.load_data_sources() == {}
+    concurrent_elapsed = time.perf_counter() - start
+    concurrent = {name: api.DATA_SOURCES[name] for name in api.DATA_SOURCE_REL_PATHS}
+
+    isolate(monkeypatch, tmp_path / "sequential")
+    start = time.perf_counter()
+    sequential = {name: api.DATA_SOURCES[name] for name in api.DATA_SOURCE_REL_PATHS}
+    sequential_elapsed = time.perf_counter() - start
+
+    for name in api.DATA_SOURCE_REL_PATHS:
+        pd.testing.assert_frame_equal(concurrent[name], sequential[name])
+    # seven 0.3s fetches overlap instead of queueing
+    assert concurrent_elapsed < sequential_elapsed
@@ -0,0 +1,228 @@
+"""fetch_csv_to_cache against the local stand-in : conditional GETs, TTL trust, byte-range tails and the cached-copy fallbacks."""
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+
+RIDERSHIP_DAILY = "Ridership/ChennaiMetro_Daily_Ridership.csv"
+
+
+def _meta(api, rel_path):
+    with open(api._cache_paths(rel_path)[1]) as f:
+        return json.load(f)
+
+
+def _age_cache(api, rel_path, seconds):
+    # pretend the local copy was fetched `seconds` ago
+    meta = _meta(api, rel_path)
+    meta["fetched_at"] -= seconds
+    api._write_cache_meta(rel_path, meta)
+    return meta["fetched_at"]
+
+
+def test_200_writes_cache_and_metadata(api, stand_in):
+    csv_path, changed = api.fetch_csv_to_cache(RIDERSHIP_DAILY)
+
+    assert changed
+    with open(csv_path, "rb") as f:
+        assert f.read() == stand_in.files[RIDERSHIP_DAILY]
+    meta = _meta(api, RIDERSHIP_DAILY)
+    assert meta["etag"].startswith('"')
+    assert meta["size"] == len(stand_in.files[RIDERSHIP_DAILY])
+    assert time.time() - meta["fetched_at"] < 5
+
+
+def test_304_keeps_local_copy_and_refreshes_its_age(api, stand_in):
+    csv_path, _ = api.fetch_csv_to_cache(RIDERSHIP_DAILY)
+    etag = _meta(api, RIDERSHIP_DAILY)["etag"]
+    aged_at = _age_cache(api, RIDERSHIP_DAILY, api.CACHE_TTL_SECONDS + 60)
+
+    assert api.fetch_csv_to_cache(RIDERSHIP_DAILY) == (csv_path, False)
+
+    revalidation = stand_in.requests_for(RIDERSHIP_DAILY)[-1]
+    assert revalidation["If-None-Match"] == etag
+    assert _meta(api, RIDERSHIP_DAILY)["fetched_at"] > aged_at
+    with open(csv_path, "rb") as f:
+        assert f.read() == stand_in.files[RIDERSHIP_DAILY]
+
+
+def test_copy_younger_than_ttl_makes_no_request(api, stand_in):
+    api.fetch_csv_to_cache(RIDERSHIP_DAILY)
+    _age_cache(api, RIDERSHIP_DAILY, api.CACHE_TTL_SECONDS - 60)
+
+    assert api.fetch_csv_to_cache(RIDERSHIP_DAILY)[1] is False
+    assert len(stand_in.requests_for(RIDERSHIP_DAILY)) == 1
+
+
+def test_offline_mode_serves_stale_copy(api, stand_in, monkeypatch):
+    csv_path, _ = api.fetch_csv_to_cache(RIDERSHIP_DAILY)
+    original = stand_in.files[RIDERSHIP_DAILY]
+    _age_cache(api, RIDERSHIP_DAILY, api.CACHE_TTL_SECONDS + 60)
+    stand_in.files[RIDERSHIP_DAILY] = original + b"2026-03-03,330000,96000,119000\n"
+    monkeypatch.setattr(api, "OFFLINE_MODE", True)
+
+    assert api.fetch_csv_to_cache(RIDERSHIP_DAILY) == (csv_path, False)
+    assert len(stand_in.requests_for(RIDERSHIP_DAILY)) == 1
+    with open(csv_path, "rb") as f:
+        assert f.read() == original
+
+
+def test_offline_mode_without_cached_copy_raises(api, stand_in, monkeypatch):
+    monkeypatch.setattr(api, "OFFLINE_MODE", True)
+    with pytest.raises(FileNotFoundError):
+        api.fetch_csv_to_cache(RIDERSHIP_DAILY)
+    assert stand_in.requests == []
+
+
+def test_5xx_on_revalidation_falls_back_to_cached_copy(api, stand_in):
+    csv_path, _ = api.fetch_csv_to_cache(RIDERSHIP_DAILY)
+    original = stand_in.files[RIDERSHIP_DAILY]
+    _age_cache(api, RIDERSHIP_DAILY, api.CACHE_TTL_SECONDS + 60)
+    stand_in.statuses[RIDERSHIP_DAILY] = 503
+
+    assert api.fetch_csv_to_cache(RIDERSHIP_DAILY) == (csv_path, False)
+    # the first fetch, then the revalidation and its retries
+    assert len(stand_in.requests_for(RIDERSHIP_DAILY)) == 1 + api.HTTP_RETRIES + 1
+    with open(csv_path, "rb") as f:
+        assert f.read() == original
+
+
+def test_unreachable_remote_on_revalidation_falls_back_to_cached_copy(api, stand_in):
+    csv_path, _ = api.fetch_csv_to_cache(RIDERSHIP_DAILY)
+    _age_cache(api, RIDERSHIP_DAILY, api.CACHE_TTL_SECONDS + 60)
+    stand_in.close()
+    api._HTTP_LOCAL.__dict__.pop("connections", None)  # drop the kept-alive connection as well
+
+    assert api.fetch_csv_to_cache(RIDERSHIP_DAILY) == (csv_path, False)
+    assert len(stand_in.requests_for(RIDERSHIP_DAILY)) == 1
+
+
+def test_5xx_without_cached_copy_raises(api, stand_in):
+    stand_in.statuses[RIDERSHIP_DAILY] = 503
+    with pytest.raises(OSError):
+        api.fetch_csv_to_cache(RIDERSHIP_DAILY)
+
+
+# byte-range revalidation : only the tail past the cached copy is downloaded and spliced onto it
+APPENDED_DAY = b"2026-03-03,330000,96000,119000\n"
+
+
+@pytest.fixture
+def short_overlap(api, monkeypatch):
+    # the sample files are smaller than the default overlap, which would make every range start at 0
+    monkeypatch.setattr(api, "TAIL_OVERLAP_BYTES", 16)
+    return 16
+
+
+def _refetch(api, stand_in, new_body):
+    csv_path, _ = api.fetch_csv_to_cache(RIDERSHIP_DAILY)
+    cached_size = len(stand_in.files[RIDERSHIP_DAILY])
+    stand_in.files[RIDERSHIP_DAILY] = new_body
+    _age_cache(api, RIDERSHIP_DAILY, api.CACHE_TTL_SECONDS + 60)
+    return csv_path, cached_size, api.fetch_csv_to_cache(RIDERSHIP_DAILY)
+
+
+def test_appended_rows_are_spliced_onto_cached_copy(api, stand_in, short_overlap):
+    original = stand_in.files[RIDERSHIP_DAILY]
+    csv_path, cached_size, result = _refetch(api, stand_in, original + APPENDED_DAY)
+
+    assert result == (csv_path, True)
+    assert stand_in.requests_for(RIDERSHIP_DAILY)[-1]["Range"] == f"bytes={cached_size - short_overlap}-"
+    # one tail download, no full refetch
+    assert stand_in.responses[-1] == (RIDERSHIP_DAILY, 206, short_overlap + len(APPENDED_DAY))
+    with open(csv_path, "rb") as f:
+        assert f.read() == original + APPENDED_DAY
+    assert _meta(api, RIDERSHIP_DAILY)["size"] == len(original + APPENDED_DAY)
+    # the spliced copy carries the validator of the whole upstream file
+    _age_cache(api, RIDERSHIP_DAILY, api.CACHE_TTL_SECONDS + 60)
+    assert api.fetch_csv_to_cache(RIDERSHIP_DAILY) == (csv_path, False)
+    assert stand_in.statuses_for(RIDERSHIP_DAILY)[-1] == 304
+
+
+def test_same_length_rewrite_triggers_full_refetch(api, stand_in, short_overlap):
+    original = stand_in.files[RIDERSHIP_DAILY]
+    rewritten = original.replace(b"310000", b"311000")
+    assert len(rewritten) == len(original)
+    csv_path, _, result = _refetch(api, stand_in, rewritten)
+
+    assert result == (csv_path, True)
+    assert stand_in.statuses_for(RIDERSHIP_DAILY) == [200, 206, 200]
+    assert "Range" not in stand_in.requests_for(RIDERSHIP_DAILY)[-1]
+    with open(csv_path, "rb") as f:
+        assert f.read() == rewritten
+
+
+def test_shrunk_file_416_triggers_full_refetch(api, stand_in, short_overlap):
+    original = stand_in.files[RIDERSHIP_DAILY]
+    shrunk = original[:original.rindex(b"2026-03-02")]  # last day dropped upstream
+    csv_path, _, result = _refetch(api, stand_in, shrunk)
+
+    assert result == (csv_path, True)
+    assert stand_in.statuses_for(RIDERSHIP_DAILY) == [200, 416, 200]
+    assert "Range" not in stand_in.requests_for(RIDERSHIP_DAILY)[-1]
+    with open(csv_path, "rb") as f:
+        assert f.read() == shrunk
+    assert _meta(api, RIDERSHIP_DAILY)["size"] == len(shrunk)
+
+
+def test_unchanged_file_304_leaves_cached_copy_alone(api, stand_in, short_overlap):
+    original = stand_in.files[RIDERSHIP_DAILY]
+    csv_path, _ = api.fetch_csv_to_cache(RIDERSHIP_DAILY)
+    mtime = os.stat(csv_path).st_mtime_ns
+    _age_cache(api, RIDERSHIP_DAILY, api.CACHE_TTL_SECONDS + 60)
+
+    assert api.fetch_csv_to_cache(RIDERSHIP_DAILY) == (csv_path, False)
+    assert "Range" in stand_in.requests_for(RIDERSHIP_DAILY)[-1]
+    assert stand_in.statuses_for(RIDERSHIP_DAILY) == [200, 304]
+    assert os.stat(csv_path).st_mtime_ns == mtime
+    with open(csv_path, "rb") as f:
+        assert f.read() == original
+
+
+def _record_parses(api, monkeypatch):
+    parsed = []
+    read_csv_bytes = api._read_csv_bytes
+
+    def recording(name, data):
+        parsed.append(data)
+        return read_csv_bytes(name, data)
+
+    monkeypatch.setattr(api, "_read_csv_bytes", recording)
+    return parsed
+
+
+def test_appended_day_reaches_data_sources_without_full_reparse(api, stand_in, short_overlap, monkeypatch):
+    original = stand_in.files[RIDERSHIP_DAILY]
+    before = api.DATA_SOURCES["ridership_daily"]
+    generation = api.get_data_version("ridership_daily")[0]
+    parsed = _record_parses(api, monkeypatch)
+    stand_in.files[RIDERSHIP_DAILY] = original + APPENDED_DAY
+    _age_cache(api, RIDERSHIP_DAILY, api.CACHE_TTL_SECONDS + 60)
+
+    assert api.refresh_data_sources() == ["ridership_daily"]
+
+    # only the header and the appended day were parsed
+    header = original[:original.index(b"\n") + 1]
+    assert parsed == [header + APPENDED_DAY]
+    after = api.DATA_SOURCES["ridership_daily"]
+    assert len(after) == len(before) + 1
+    assert after["Date"].max() == pd.Timestamp("2026-03-03")
+    assert api._PARSE_STATE["ridership_daily"]["offset"] == len(original + APPENDED_DAY)
+    # an append keeps the generation, derived data is extended rather than rebuilt
+    assert api.get_data_version("ridership_daily")[0] == generation
+
+
+def test_rewritten_day_is_reloaded_in_full(api, stand_in, short_overlap, monkeypatch):
+    original = stand_in.files[RIDERSHIP_DAILY]
+    api.DATA_SOURCES["ridership_daily"]
+    parsed = _record_parses(api, monkeypatch)
+    stand_in.files[RIDERSHIP_DAILY] = original.replace(b"310000", b"311000")
+    _age_cache(api, RIDERSHIP_DAILY, api.CACHE_TTL_SECONDS + 60)
+
+    assert api.refresh_data_sources() == ["ridership_daily"]
+
+    assert parsed == [stand_in.files[RIDERSHIP_DAILY]]
+    daily = api.DATA_SOURCES["ridership_daily"]
+    assert daily.loc[daily["Date"] == pd.Timestamp("2026-03-01"), "Total"].item() == 311000
@@ -0,0 +1,167 @@
+"""
+Weather vs ridership : local hourly weather observations time-aligned with the ridership data.
+
+The weather file (CSV or Parquet) has one row per observation with a Time column and any of
+Temperature (°C), Rainfall (mm in the hour) and Humidity (%). Common export names (e.g. Open-Meteo's
+temperature_2m / precipitation / relative_humidity_2m) are renamed on ingest. Point CMRL_WEATHER_PATH
+at real observations; the bundled data/chennai_weather_sample.csv is synthetic, for development and tests.
+
+Feature tables (ridership rows joined with the weather and the station attributes) are built once per
+data version and weather file, and cached.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ridership_tracker_api import (
+    cached_derived,
+    get_dataset,
+    get_hourly_profile,
+    get_station_attributes,
+)
+
+WEATHER_PATH = os.environ.get(
+    "CMRL_WEATHER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "chennai_weather_sample.csv"),
+)
+WEATHER_COLUMNS = ["Temperature", "Rainfall", "Humidity"]
+
+# export column names -> canonical name
+WEATHER_COLUMN_RENAMES = {
+    "time": "Time", "datetime": "Time", "date_time": "Time", "timestamp": "Time",
+    "temperature": "Temperature", "temperature_2m": "Temperature", "temp": "Temperature", "temperature_c": "Temperature",
+    "rainfall": "Rainfall", "precipitation": "Rainfall", "rain": "Rainfall", "rainfall_mm": "Rainfall",
+    "humidity": "Humidity", "relative_humidity_2m": "Humidity", "relative_humidity": "Humidity",
+}
+
+WEATHER_TOLERANCE = pd.Timedelta(hours=2)  # ridership hours without an observation this close get no weather
+SERVICE_HOURS = (5, 23)  # daily weather is summarized over the hours trains run
+
+_WEATHER = {}
+_WEATHER_LOCK = threading.Lock()
+
+
+# ingest
+def ingest_weather(df):
+    """
+    Turn a raw weather frame into sorted, deduplicated observations : Time plus the WEATHER_COLUMNS present
+    as floats. Rows without a valid Time are dropped, missing rainfall counts as no rain.
+    """
+    df = df.rename(columns={col: WEATHER_COLUMN_RENAMES.get(str(col).strip().lower(), str(col).strip()) for col in df.columns})
+    if "Time" not in df.columns:
+        raise ValueError(f"Weather data needs a time column, got {list(df.columns)}")
+    columns = [col for col in WEATHER_COLUMNS if col in df.columns]
+    if not columns:
+        raise ValueError(f"Weather data has none of {WEATHER_COLUMNS}")
+
+    df = df[["Time"] + columns].copy()
+    # timezone aware exports are turned into Chennai local time, like the tracker's dates and hours
+    times = pd.to_datetime(df["Time"], errors="coerce")
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert("Asia/Kolkata").dt.tz_localize(None)
+    df["Time"] = times
+    for col in columns:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float32)
+    if "Rainfall" in df.columns:
+        df["Rainfall"] = df["Rainfall"].fillna(0)
+
+    df = df[df["Time"].notna()]
+    df = df.drop_duplicates(subset="Time", keep="last").sort_values("Time", kind="stable")
+    return df.reset_index(drop=True)
+
+
+def _weather_key(path):
+    # the file's identity and modification, so an updated file is re-read and its features rebuilt
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def load_weather(path=None):
+    """Ingested weather observations of `path` (default WEATHER_PATH), re-read only when the file changes."""
+    path = path or WEATHER_PATH
+    key = _weather_key(path)
+    with _WEATHER_LOCK:
+        cached = _WEATHER.get(key[0])
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        raw = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+        weather = ingest_weather(raw)
+        _WEATHER[key[0]] = (key, weather)
+        return weather
+
+
+def get_daily_weather(path=None):
+    """
+    Weather per date over SERVICE_HOURS : mean / max temperature, total rainfall, hours with rain and
+    mean humidity (for the columns the file has).
+    """
+    weather = load_weather(path)
+    hours = weather["Time"].dt.hour
+    weather = weather[(hours >= SERVICE_HOURS[0]) & (hours <= SERVICE_HOURS[1])]
+    dates = weather["Time"].dt.normalize().rename("Date")
+    grouped = weather.groupby(dates)
+    daily = pd.DataFrame(index=grouped.size().index)
+    if "Temperature" in weather.columns:
+        daily["Mean Temperature"] = grouped["Temperature"].mean()
+        daily["Max Temperature"] = grouped["Temperature"].max()
+    if "Rainfall" in weather.columns:
+        daily["Rainfall"] = grouped["Rainfall"].sum()
+        daily["Rain Hours"] = (weather["Rainfall"] > 0).groupby(dates).sum()
+    if "Humidity" in weather.columns:
+        daily["Mean Humidity"] = grouped["Humidity"].mean()
+    return daily.reset_index()
+
+
+# feature tables
+def _hourly_features(path):
+    rows = get_dataset("ridership_hourly")
+    rows = rows[["Date", "Hour", "HourOfDay", "Total"]].assign(
+        Time=rows["Date"] + pd.to_timedelta(rows["HourOfDay"].astype(np.int64), unit="h"),
+    ).sort_values("Time", kind="stable")
+
+    # each hour against the nearest observation, so 3-hourly or irregular records still line up
+    features = pd.merge_asof(rows, load_weather(path), on="Time", direction="nearest", tolerance=WEATHER_TOLERANCE)
+
+    # the same hour's usual ridership on that weekday (special days excluded), to compare across seasons
+    profile = get_hourly_profile("ridership_hourly", columns=["Total"], by="dow")
+    expected = pd.Series(profile["Mean"].to_numpy(), index=pd.MultiIndex.from_arrays([profile["Group"], profile["HourOfDay"]]))
+    keys = pd.MultiIndex.from_arrays([features["Date"].dt.day_name(), features["HourOfDay"]])
+    features["Expected Total"] = expected.reindex(keys).to_numpy()
+    features["Relative Total"] = features["Total"] / features["Expected Total"]
+    return features.reset_index(drop=True)
+
+
+def _station_features(path):
+    rows = get_dataset("ridership_station")[["Date", "Line", "Station", "Total"]]
+    rows = rows.assign(Station=rows["Station"].astype(str))
+
+    # station rows are daily, so they take the day's weather summary
+    features = pd.merge_asof(rows, get_daily_weather(path), on="Date", direction="backward", tolerance=pd.Timedelta(0))
+    features = features.merge(get_station_attributes(), on="Station", how="left")
+
+    # each station's usual ridership on that weekday over the whole archive
+    weekday = features["Date"].dt.dayofweek
+    features["Expected Total"] = features.groupby([features["Line"], features["Station"], weekday])["Total"].transform("mean")
+    features["Relative Total"] = features["Total"] / features["Expected Total"]
+    return features
+
+
+WEATHER_FEATURE_BUILDERS = {
+    "ridership_hourly": _hourly_features,
+    "ridership_station": _station_features,
+}
+
+
+def get_weather_features(name="ridership_station", path=None):
+    """
+    Ridership rows of ridership_hourly (per hour, nearest observation within WEATHER_TOLERANCE) or
+    ridership_station (per station and date, the day's summary from get_daily_weather, plus the station
+    attributes) with the weather joined on, and "Relative Total" : Total over the usual ridership of that
+    station / hour on that weekday. Materialized once per data version and weather file.
+    """
+    if name not in WEATHER_FEATURE_BUILDERS:
+        raise ValueError(f"No weather features for {name!r}, expected one of {list(WEATHER_FEATURE_BUILDERS)}")
+    path = path or WEATHER_PATH
+    return cached_derived(name, "weather_features", _weather_key(path), lambda: WEATHER_FEATURE_BUILDERS[name](path))